@@ -0,0 +1,7 @@
+from django.urls import path, include
+
+
+# URLconf of requests under settings.API_PATH_PREFIXES, see core.middleware.SiteMiddleware
+urlpatterns = [
+    path('api/v1/', include('core.urls')),
+]
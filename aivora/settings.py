@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,30 +54,77 @@ AUTH_USER_MODEL = 'core.User'
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.db_router.ReplicaPinningMiddleware',
+    'core.middleware.SiteMiddleware',
+]
+
+# The JWT API needs no sessions, CSRF, messages or frame options: core.middleware.SiteMiddleware
+# runs SITE_MIDDLEWARE only outside API_PATH_PREFIXES, API requests resolve against API_URLCONF
+SITE_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+API_PATH_PREFIXES = ('/api/',)
+API_URLCONF = 'aivora.api_urls'
+# The admin checks look for its middleware in MIDDLEWARE only
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 CORS_ALLOW_ALL_ORIGINS = env_bool(os.getenv('CORS_ALLOW_ALL_ORIGINS'))
 CORS_ALLOWED_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"] if DEBUG else os.getenv('CORS_ALLOWED_ORIGINS').split(',')
 CORS_ALLOW_CREDENTIALS = env_bool(os.getenv('CORS_ALLOW_CREDENTIALS'))
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 CSRF_TRUSTED_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"] if DEBUG else os.getenv('CSRF_TRUSTED_ORIGINS').split(',')
 
+# Redis when REDIS_URL is set (needs the redis package), otherwise every process has its
+# own local-memory cache. SHARED_CACHE_ALIAS is the default of the *_CACHE_ALIAS settings
+# below, which stay process-local while there is no shared cache.
+REDIS_URL = os.getenv('REDIS_URL') or None
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'aivora',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+SHARED_CACHE_ALIAS = 'default' if REDIS_URL else None
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
+    ),
+    # The browsable API renders templates, only worth it while developing
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        *(('rest_framework.renderers.BrowsableAPIRenderer',) if DEBUG else ()),
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Token buckets of core.throttling.AuthRateThrottle, "<burst>/<period>"; empty disables one
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP_RATE', '20/min'),
+        'auth_email': os.getenv('THROTTLE_AUTH_EMAIL_RATE', '5/min'),
+        'auth_global': os.getenv('THROTTLE_AUTH_GLOBAL_RATE', '100/s'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES')) if os.getenv('NUM_PROXIES') else None,
 }
 
+# Buckets live in process memory; set an alias of a shared cache to also enforce them across workers
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+THROTTLE_STORE_SIZE = int(os.getenv('THROTTLE_STORE_SIZE', 100000))
+
 SECURE_COOKIES = not DEBUG
 SESSION_COOKIE_SECURE = SECURE_COOKIES
 CSRF_COOKIE_SECURE = SECURE_COOKIES
@@ -89,8 +137,8 @@ from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-    'ROTATE_REFRESH_TOKENS': False,
-    'BLACKLIST_AFTER_ROTATION': False,
+    'ROTATE_REFRESH_TOKENS': env_bool('JWT_ROTATE_REFRESH_TOKENS'),
+    'BLACKLIST_AFTER_ROTATION': env_bool('JWT_BLACKLIST_AFTER_ROTATION'),
     'UPDATE_LAST_LOGIN': False,
 
     'ALGORITHM': 'HS256',
@@ -126,6 +174,84 @@ SIMPLE_JWT = {
     'CHECK_USER_IS_ACTIVE': True,
 }
 
+# Users resolved by core.authentication.CachedJWTAuthentication
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', 10000))
+JWT_USER_CACHE_TTL = float(os.getenv('JWT_USER_CACHE_TTL', 5))
+JWT_USER_CACHE_ALIAS = os.getenv('JWT_USER_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+JWT_USER_CACHE_SHARED_TTL = int(os.getenv('JWT_USER_CACHE_SHARED_TTL', 300))
+
+# Cache shared by all workers that carries revoked refresh token JTIs (core.revocation).
+# Unset while CACHES is process-local, revocation checks then fall back to the database.
+TOKEN_REVOCATION_CACHE_ALIAS = os.getenv('TOKEN_REVOCATION_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+# A shared cache miss is confirmed in the database, the answer is kept this many seconds
+TOKEN_REVOCATION_NEGATIVE_TTL = float(os.getenv('TOKEN_REVOCATION_NEGATIVE_TTL', 5))
+TOKEN_REVOCATION_NEGATIVE_CACHE_SIZE = int(os.getenv('TOKEN_REVOCATION_NEGATIVE_CACHE_SIZE', 10000))
+
+# Expired outstanding/blacklisted tokens, see `manage.py prune_tokens`.
+# TOKEN_PRUNE_INTERVAL > 0 also prunes from a background thread of every serving process.
+TOKEN_PRUNE_INTERVAL = float(os.getenv('TOKEN_PRUNE_INTERVAL', 0))
+TOKEN_PRUNE_CHUNK_SIZE = int(os.getenv('TOKEN_PRUNE_CHUNK_SIZE', 1000))
+TOKEN_PRUNE_PAUSE = float(os.getenv('TOKEN_PRUNE_PAUSE', 0.05))
+TOKEN_PRUNE_MAX_SECONDS = float(os.getenv('TOKEN_PRUNE_MAX_SECONDS', 30))
+
+# Seconds between pulls of users changed by other processes into the in-memory leaderboards
+# (core.leaderboard); 0 leaves each process with only its own writes after the initial load.
+LEADERBOARD_SYNC_INTERVAL = float(os.getenv('LEADERBOARD_SYNC_INTERVAL', 30))
+# Each sync also re-reads this many seconds before the previous one, covering
+# transactions that were still open when it ran
+LEADERBOARD_SYNC_OVERLAP = float(os.getenv('LEADERBOARD_SYNC_OVERLAP', 60))
+
+# Experience awards are buffered per process and written every XP_FLUSH_INTERVAL seconds
+# (core.experience), or by the same background thread right away once XP_BUFFER_MAX_USERS
+# users have pending points.
+XP_FLUSH_INTERVAL = float(os.getenv('XP_FLUSH_INTERVAL', 1.0))
+XP_BUFFER_MAX_USERS = int(os.getenv('XP_BUFFER_MAX_USERS', 10000))
+
+# Last login/last seen timestamps, buffered like experience (core.activity)
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', 5.0))
+ACTIVITY_BUFFER_MAX_USERS = int(os.getenv('ACTIVITY_BUFFER_MAX_USERS', 10000))
+
+# Login alerts: one per user and device within LOGIN_NOTIFY_WINDOW seconds, later logins are
+# mailed as a digest every LOGIN_NOTIFY_DIGEST_INTERVAL seconds (core.notifications)
+LOGIN_NOTIFY_WINDOW = float(os.getenv('LOGIN_NOTIFY_WINDOW', 3600))
+LOGIN_NOTIFY_DIGEST_INTERVAL = float(os.getenv('LOGIN_NOTIFY_DIGEST_INTERVAL', LOGIN_NOTIFY_WINDOW))
+# Users with a pending digest per process; logins of further users get no digest (counted as dropped)
+LOGIN_NOTIFY_DIGEST_MAX_USERS = int(os.getenv('LOGIN_NOTIFY_DIGEST_MAX_USERS', 10000))
+LOGIN_NOTIFY_CACHE_ALIAS = os.getenv('LOGIN_NOTIFY_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+
+# At most one password reset email per address within PASSWORD_RESET_RESEND_WINDOW seconds,
+# repeats are dropped before any lookup (core.services.request_password_reset)
+PASSWORD_RESET_RESEND_WINDOW = float(os.getenv('PASSWORD_RESET_RESEND_WINDOW', 300))
+PASSWORD_RESET_CACHE_ALIAS = os.getenv('PASSWORD_RESET_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+
+# Threads per process running one-off jobs off the request path, such as reset emails
+# (core.scheduler.BackgroundJobs); 0 runs them inline
+BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', 2))
+
+# Responses to POSTs sent with an Idempotency-Key header, replayed for retries of the same key
+# (core.idempotency)
+IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL', 24 * 3600))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 10000))
+IDEMPOTENCY_CACHE_ALIAS = os.getenv('IDEMPOTENCY_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', 30))
+
+# Serialized account/me payloads with their ETags (core.views.UserMeView), a local LRU of
+# ACCOUNT_ME_CACHE_TTL seconds in front of the shared cache
+ACCOUNT_ME_CACHE_SIZE = int(os.getenv('ACCOUNT_ME_CACHE_SIZE', 10000))
+ACCOUNT_ME_CACHE_TTL = float(os.getenv('ACCOUNT_ME_CACHE_TTL', 30))
+ACCOUNT_ME_CACHE_ALIAS = os.getenv('ACCOUNT_ME_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+ACCOUNT_ME_CACHE_SHARED_TTL = int(os.getenv('ACCOUNT_ME_CACHE_SHARED_TTL', 3600))
+
+# Largest invitee list accepted by the bulk invite endpoint
+INVITE_MAX_BATCH = int(os.getenv('INVITE_MAX_BATCH', 1000))
+
+# Rows fetched per round trip by the user export (`manage.py export_users`, users/export/)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Process pool hashing passwords for the async auth views (core.hash_pool)
+HASH_POOL_WORKERS = int(os.getenv('HASH_POOL_WORKERS', os.cpu_count() or 1))
+HASH_POOL_MAX_PENDING = int(os.getenv('HASH_POOL_MAX_PENDING', HASH_POOL_WORKERS * 4))
+
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
@@ -133,6 +259,24 @@ EMAIL_PORT = os.getenv('EMAIL_PORT')
 EMAIL_BACKEND = 'core.email_backend.EmailBackend'
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS')
 
+# Per-process pool of authenticated SMTP connections used by core.email_backend.EmailBackend
+EMAIL_POOL_ENABLED = env_bool('EMAIL_POOL_ENABLED', True)
+EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', 4))
+EMAIL_POOL_MAX_MESSAGES = int(os.getenv('EMAIL_POOL_MAX_MESSAGES', 100))
+EMAIL_POOL_KEEPALIVE = float(os.getenv('EMAIL_POOL_KEEPALIVE', 30))
+EMAIL_POOL_MAX_IDLE = float(os.getenv('EMAIL_POOL_MAX_IDLE', 300))
+EMAIL_POOL_TIMEOUT = float(os.getenv('EMAIL_POOL_TIMEOUT', 10))
+
+# Outbox mode: send_email_core only stores the message, `manage.py run_email_outbox` delivers it
+EMAIL_OUTBOX_ENABLED = env_bool('EMAIL_OUTBOX_ENABLED')
+EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', 2))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', 1.0))
+EMAIL_OUTBOX_LEASE = int(os.getenv('EMAIL_OUTBOX_LEASE', 300))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+EMAIL_OUTBOX_BACKOFF_BASE = int(os.getenv('EMAIL_OUTBOX_BACKOFF_BASE', 30))
+EMAIL_OUTBOX_BACKOFF_MAX = int(os.getenv('EMAIL_OUTBOX_BACKOFF_MAX', 3600))
+
 
 ROOT_URLCONF = 'aivora.urls'
 
@@ -178,6 +322,19 @@ if DB_NAME == DB_USER:
         UserWarning
     )
 
+# Connections. DB_POOL gives every worker a connection pool (needs psycopg 3 with psycopg[pool]):
+# DB_POOL_MIN_SIZE connections are kept open even when idle, up to DB_POOL_MAX_SIZE under load,
+# each replaced after DB_POOL_MAX_LIFETIME seconds; a request waits at most DB_POOL_TIMEOUT
+# seconds for one. Without a pool a connection is reused for DB_CONN_MAX_AGE seconds and
+# checked before each request that reuses it. See the db_connections metrics gauge.
+DB_POOL = env_bool('DB_POOL')
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 30 * 60))
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', 10 * 60))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -188,6 +345,54 @@ DATABASES = {
         'PORT': DB_PORT,
     }
 }
+if DB_POOL:
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'max_lifetime': DB_POOL_MAX_LIFETIME,
+            'max_idle': DB_POOL_MAX_IDLE,
+            'timeout': DB_POOL_TIMEOUT,
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Read replicas, "host[:port]" separated by commas, with the primary's name and credentials.
+# core.db_router sends reads of requests to them, background jobs and commands read the primary.
+# A credential that wrote keeps reading from the primary for REPLICA_STICKY_SECONDS, long enough
+# for replication to catch up.
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+for _index, _host in enumerate(DB_REPLICA_HOSTS, start=1):
+    _host, _, _port = _host.partition(':')
+    DATABASES[f'replica_{_index}'] = {**DATABASES['default'], 'HOST': _host, 'PORT': _port or DB_PORT}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+REPLICA_STICKY_CACHE_ALIAS = os.getenv('REPLICA_STICKY_CACHE_ALIAS') or SHARED_CACHE_ALIAS
+
+
+# Password hashing. PASSWORD_HASHER picks the algorithm for new hashes (pbkdf2, scrypt or
+# argon2, the latter needs argon2-cffi); the others stay enabled to verify existing hashes.
+# Tune costs per host with `manage.py calibrate_hasher`.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+_PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 0))  # 0 keeps Django's default
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv('PASSWORD_SCRYPT_PARALLELISM', 1))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', 64 * 1024))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 1))
 
 
 # Password validation
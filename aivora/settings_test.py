@@ -4,6 +4,8 @@ import os
 # Allow importing aivora.settings without real DB credentials
 for key in ("DB_NAME", "DB_USER", "DB_PASSWORD"):
     os.environ.setdefault(key, "test")
+# Local-memory CACHES and process-local stores, whatever the environment points at
+os.environ["REDIS_URL"] = ""
 
 from aivora.settings import *  # noqa: F401, F403
 
@@ -11,6 +13,23 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # A separate database standing in for a lagging replica, routing tests enable it
+    # with DATABASE_REPLICAS = ["replica"]
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
 }
+DATABASE_REPLICAS = []
 SECRET_KEY = os.getenv("TEST_SECRET_KEY", "test-secret-key-for-pytest")
+
+# Single process, the local-memory cache is shared by everything under test
+TOKEN_REVOCATION_CACHE_ALIAS = "default"
+
+# No background threads against the in-memory database
+LEADERBOARD_SYNC_INTERVAL = 0
+XP_FLUSH_INTERVAL = 0
+ACTIVITY_FLUSH_INTERVAL = 0
+LOGIN_NOTIFY_DIGEST_INTERVAL = 0
+BACKGROUND_WORKERS = 0
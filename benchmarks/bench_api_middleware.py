@@ -0,0 +1,76 @@
+"""
+Per-request cost of account/me through the full middleware stack that used to
+serve every URL, against the API pipeline of core.middleware.SiteMiddleware.
+
+    python -m benchmarks.bench_api_middleware --requests 5000
+
+Both run through the WSGI handler against the in-memory test settings; the
+user and payload caches are warm, so the difference is middleware overhead.
+"""
+import argparse
+import json
+
+from benchmarks.common import Stopwatch, report, setup_django, wsgi_request
+
+
+FULL_MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'core.db_router.ReplicaPinningMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def run(handler, requests: int, headers: dict) -> float:
+    with Stopwatch() as watch:
+        for _ in range(requests):
+            status, content = wsgi_request(handler, "GET", "/api/v1/account/me/", headers=headers)
+            assert status == 200, content
+    return watch.wall / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+    from core.models import User
+
+    User.objects.create_user(first_name="Bench", last_name="Lean", email="bench-lean@example.com",
+                             password="benchpassword", country="UA", is_active=True, is_email_verified=True)
+    lean = WSGIHandler()
+    with override_settings(MIDDLEWARE=FULL_MIDDLEWARE):
+        full = WSGIHandler()
+
+    status, content = wsgi_request(lean, "POST", "/api/v1/auth/login/",
+                                   {"email": "bench-lean@example.com", "password": "benchpassword"})
+    assert status == 200, content
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {json.loads(content)['access']}"}
+
+    # Warm up caches and imports, then alternate so drift hits both alike
+    run(full, 100, headers), run(lean, 100, headers)
+    timings = {"full": [], "lean": []}
+    for _ in range(args.rounds):
+        timings["full"].append(run(full, args.requests, headers))
+        timings["lean"].append(run(lean, args.requests, headers))
+
+    before, after = min(timings["full"]), min(timings["lean"])
+    report(f"account/me per request, best of {args.rounds} x {args.requests}", [
+        (f"full stack ({len(FULL_MIDDLEWARE)} middleware)", before, "us"),
+        ("API pipeline", after, "us"),
+        ("saved", before - after, "us"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
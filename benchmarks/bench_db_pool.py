@@ -0,0 +1,120 @@
+"""
+Request latency of account/me and auth/login/ with a connection per request,
+persistent health-checked connections and a psycopg pool, served through the
+WSGI handler so connections are closed and reused as in production.
+
+    DB_NAME=aivora_bench DB_USER=... DB_PASSWORD=... DB_HOST=localhost \\
+        python -m benchmarks.bench_db_pool --requests 300
+
+Needs a PostgreSQL server (and psycopg[pool] for the pooled run); the database
+is migrated and gets one benchmark user, so point it at a scratch database.
+Every mode runs in its own process because the connection settings are read
+at startup. The JWT user cache is disabled so each account/me request queries.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import PROJECT_ROOT, report, setup_django, wsgi_request
+
+
+EMAIL = "bench-db-pool@example.com"
+PASSWORD = "benchpassword"
+MODES = {
+    "connection per request": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "0"},
+    "persistent + health checks": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "60"},
+    "psycopg pool": {"DB_POOL": "1"},
+}
+
+
+def configure():
+    os.environ["DJANGO_SETTINGS_MODULE"] = "aivora.settings"
+    os.environ.setdefault("JWT_USER_CACHE_TTL", "0")
+    os.environ.setdefault("EMAIL_OUTBOX_ENABLED", "1")
+
+
+def measure(handler, requests: int, *args, **kwargs) -> list:
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        status, content = wsgi_request(handler, *args, **kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert status == 200, content
+    return timings
+
+
+def run_mode(requests: int):
+    configure()
+    setup_django(migrate=False)
+    from django.core.handlers.wsgi import WSGIHandler
+    from core.db_pool import connection_stats
+
+    handler = WSGIHandler()
+    login = {"email": EMAIL, "password": PASSWORD}
+    status, content = wsgi_request(handler, "POST", "/api/v1/auth/login/", login)
+    assert status == 200, content
+    bearer = {"HTTP_AUTHORIZATION": f"Bearer {json.loads(content)['access']}"}
+
+    me = measure(handler, requests, "GET", "/api/v1/account/me/", headers=bearer)
+    logins = measure(handler, max(requests // 10, 1), "POST", "/api/v1/auth/login/", login)
+    print(json.dumps({"me": me, "login": logins, "connections": connection_stats()["default"]}))
+
+
+def prepare():
+    configure()
+    setup_django()
+    from core.models import User
+
+    User.objects.filter(email=EMAIL).delete()
+    User.objects.create_user(first_name="Bench", last_name="Pool", email=EMAIL, password=PASSWORD,
+                             country="UA", is_active=True, is_email_verified=True)
+
+
+def cleanup():
+    from core.models import User
+
+    User.objects.filter(email=EMAIL).delete()
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        os.environ.update(MODES[args.mode])
+        return run_mode(args.requests)
+
+    prepare()
+    try:
+        for mode, env in MODES.items():
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_db_pool", "--requests", str(args.requests), "--mode", mode],
+                cwd=PROJECT_ROOT, env={**os.environ, **env}, capture_output=True, text=True,
+            )
+            if completed.returncode:
+                print(f"\n{mode}: failed\n{completed.stderr.strip().splitlines()[-1]}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            report(f"{mode} ({result['connections']['mode']})", [
+                ("account/me p50", statistics.median(result["me"]), "ms"),
+                ("account/me p95", percentile(result["me"], 0.95), "ms"),
+                ("auth/login/ p50", statistics.median(result["login"]), "ms"),
+                ("auth/login/ p95", percentile(result["login"], 0.95), "ms"),
+            ])
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Leaderboard queries at scale: in-memory boards against ORDER BY/COUNT on the table.
+
+    python -m benchmarks.bench_leaderboard --users 1000000
+
+The boards are built from a stream sorted like the load query, then hit with
+experience updates, top-10 reads and "my position" lookups. The SQL side runs
+the queries the boards replace on a SQLite table with the same rows
+(``--db-users 0`` skips it).
+"""
+import argparse
+import random
+import time
+import uuid
+
+from benchmarks.common import Stopwatch, report, setup_django
+
+
+COUNTRIES = [f"C{index:02d}" for index in range(20)]
+ROLES = ["student", "curator", "manager", "owner", "admin"]
+
+
+def generate(count: int, rng: random.Random) -> list:
+    rows = [
+        (uuid.UUID(int=rng.getrandbits(128)), rng.randrange(100_000), rng.choice(COUNTRIES), rng.choice(ROLES))
+        for _ in range(count)
+    ]
+    rows.sort(key=lambda row: (-row[1], row[0].int))
+    return rows
+
+
+def insert_rows(rows: list):
+    from django.db import connection
+    from django.utils import timezone
+
+    now = timezone.now().isoformat()
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO core_user (uuid, password, first_name, last_name, email, country, experience, role, rank,"
+            " is_email_verified, is_active, is_staff, is_superuser, created_at, updated_at)"
+            " VALUES (%s, '!', 'Bench', 'User', %s, %s, %s, %s, 'noob', 1, 1, 0, 0, %s, %s)",
+            [(row[0].hex, f"{row[0].hex}@example.com", row[2], row[1], row[3], now, now) for row in rows],
+        )
+
+
+def per_call(func, args: list) -> float:
+    started = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return (time.perf_counter() - started) / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--db-users", type=int, default=None, help="Rows for the SQL baseline, default --users")
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from core.leaderboard import leaderboard
+
+    rng = random.Random(1)
+    rows = generate(args.users, rng)
+    sample = [row[0] for row in rng.sample(rows, args.queries)]
+
+    with Stopwatch() as build:
+        leaderboard.build(rows)
+
+    updates = [rng.choice(rows) for _ in range(args.updates)]
+    with Stopwatch() as update:
+        for user_uuid, experience, country, role in updates:
+            leaderboard.update(user_uuid, experience + rng.randrange(1, 500), country, role)
+
+    top = per_call(lambda board: leaderboard.top(board, 10), ["global"] * args.queries)
+    position = per_call(leaderboard.position, sample)
+    country_position = per_call(lambda user_uuid: leaderboard.position(user_uuid, "country:C07"), sample)
+
+    results = [
+        ("build from sorted stream", build.wall, "s"),
+        ("experience updates", args.updates / update.wall, "ops/s"),
+        ("top 10", top * 1e6, "us"),
+        ("position, global board", position * 1e6, "us"),
+        ("position, country board", country_position * 1e6, "us"),
+    ]
+
+    db_users = args.users if args.db_users is None else args.db_users
+    if db_users:
+        insert_rows(rows[:db_users])
+        experiences = [experience for _, experience, _, _ in rng.sample(rows[:db_users], min(args.queries, 100))]
+        with connection.cursor() as cursor:
+            sql_top = per_call(
+                lambda _: cursor.execute(
+                    "SELECT uuid, experience FROM core_user WHERE is_active ORDER BY experience DESC, uuid LIMIT 10"
+                ) or cursor.fetchall(),
+                range(100),
+            )
+            sql_position = per_call(
+                lambda experience: cursor.execute(
+                    "SELECT COUNT(*) FROM core_user WHERE is_active AND experience > %s", [experience]
+                ) or cursor.fetchone(),
+                experiences,
+            )
+        results += [
+            (f"SQL top 10 ({db_users:,} rows)", sql_top * 1e6, "us"),
+            (f"SQL position ({db_users:,} rows)", sql_position * 1e6, "us"),
+        ]
+
+    report(f"Leaderboard with {args.users:,} users", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Throughput of rejecting forged confirmation/reset links.
+
+    python -m benchmarks.bench_link_reject --links 20000
+
+Before: decode uid64, load the user, then check a default_token_generator token.
+After: MailConfirmation.verify_email, which checks the signature before any lookup.
+"""
+import argparse
+
+from benchmarks.common import Stopwatch, report, setup_django
+
+
+def legacy_reject(token, uid64):
+    from django.contrib.auth.tokens import default_token_generator
+    from django.utils.encoding import force_str
+    from django.utils.http import urlsafe_base64_decode
+    from core.models import User
+
+    try:
+        user = User.objects.get(uuid=force_str(urlsafe_base64_decode(uid64)))
+    except User.DoesNotExist:
+        return False
+    return default_token_generator.check_token(user, token)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from core.models import User
+    from core.services import MailConfirmation
+
+    user = User.objects.create_user(
+        first_name="Bench", last_name="User", email="bench@example.com",
+        password="benchpassword", country="UA",
+    )
+    _, uid64 = MailConfirmation(user).create_token()
+    forged = [f"c{index:x}-{'0' * 32}" for index in range(args.links)]
+
+    before_queries, after_queries = QueryCounter(), QueryCounter()
+    with connection.execute_wrapper(before_queries), Stopwatch() as before:
+        for token in forged:
+            assert not legacy_reject(token, uid64)
+
+    with connection.execute_wrapper(after_queries), Stopwatch() as after:
+        for token in forged:
+            assert MailConfirmation.verify_email(token, uid64)["status"] == 400
+
+    report(f"Forged links rejected ({args.links} links)", [
+        ("lookup then check", args.links / before.wall, "links/s"),
+        ("signature first", args.links / after.wall, "links/s"),
+        ("queries before", before_queries.count, "queries"),
+        ("queries after", after_queries.count, "queries"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
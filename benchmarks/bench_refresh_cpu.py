@@ -0,0 +1,75 @@
+"""
+CPU per active user-hour for keeping a session alive, before and after the
+refresh endpoint.
+
+    python -m benchmarks.bench_refresh_cpu --users 3
+
+With a 5 minute access token an active client needs a new one 12 times an
+hour. Before: every expiry re-runs auth/login/ (a full password hash). After:
+one login followed by auth/token/refresh/ calls.
+"""
+import argparse
+from datetime import timedelta
+
+from benchmarks.common import Stopwatch, report, setup_django
+
+
+def create_users(count: int) -> list:
+    from core.models import User
+
+    return [
+        User.objects.create_user(
+            first_name="Bench", last_name=str(index), email=f"bench{index}@example.com",
+            password="benchpassword", country="UA", is_active=True, is_email_verified=True,
+        )
+        for index in range(count)
+    ]
+
+
+def relogin_hour(client, users, renewals):
+    for user in users:
+        for _ in range(renewals):
+            response = client.post("/api/v1/auth/login/", {"email": user.email, "password": "benchpassword"},
+                                   content_type="application/json")
+            assert response.status_code == 200, response.content
+
+
+def refresh_hour(client_class, users, renewals):
+    for user in users:
+        client = client_class()
+        response = client.post("/api/v1/auth/login/", {"email": user.email, "password": "benchpassword"},
+                               content_type="application/json")
+        assert response.status_code == 200, response.content
+        for _ in range(renewals - 1):
+            response = client.post("/api/v1/auth/token/refresh/")
+            assert response.status_code == 200, response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    renewals = int(timedelta(hours=1) / settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"])
+    users = create_users(args.users)
+
+    with Stopwatch() as before:
+        relogin_hour(Client(), users, renewals)
+    with Stopwatch() as after:
+        refresh_hour(Client, users, renewals)
+
+    report(f"CPU per active user-hour ({renewals} access token renewals, {args.users} users)", [
+        ("re-login on every expiry", before.cpu / args.users * 1000, "ms CPU"),
+        ("login + refresh endpoint", after.cpu / args.users * 1000, "ms CPU"),
+        ("reduction", before.cpu / after.cpu if after.cpu else 0.0, "x"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Objects serialized per second by the user directory and account/me serializers:
+DRF's ``many=True`` serializer with JSONRenderer against the compiled plan over
+model instances and over ``values_list()`` rows, encoded with ``dumps``.
+
+    python -m benchmarks.bench_serializers --users 5000 --rounds 5
+
+Query time is included in every run. ``dumps`` uses orjson when it is installed.
+"""
+import argparse
+
+from benchmarks.common import Stopwatch, report, setup_django
+
+
+def create_users(count: int):
+    from core.models import User
+
+    User.objects.bulk_create([
+        User(first_name="Bench", last_name=f"User {index}", email=f"bench{index}@example.com", password="!",
+             country="UA", city="Kyiv", phone=f"+380{index:09d}", experience=index, photo=f"users/photos/{index}.png")
+        for index in range(count)
+    ], batch_size=1000)
+
+
+def best_rate(func, count: int, rounds: int) -> float:
+    fastest = None
+    for _ in range(rounds):
+        with Stopwatch() as watch:
+            func()
+        fastest = watch.wall if fastest is None else min(fastest, watch.wall)
+    return count / fastest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from core.fast_serializers import compile_serializer, dumps, orjson
+    from core.models import User
+    from core.serializers import UserDirectorySerializer, UserMeSerializer
+
+    create_users(args.users)
+    renderer = JSONRenderer()
+    queryset = User.objects.order_by("pk")
+
+    for serializer_class in (UserDirectorySerializer, UserMeSerializer):
+        plan = compile_serializer(serializer_class)
+        assert dumps(plan.rows(queryset)) == renderer.render(serializer_class(queryset, many=True).data)
+
+        runs = [
+            ("DRF + JSONRenderer", lambda: renderer.render(serializer_class(queryset.all(), many=True).data)),
+            ("compiled, instances", lambda: dumps(plan.many(queryset.all()))),
+            ("compiled, values_list rows", lambda: dumps(plan.rows(queryset))),
+        ]
+        report(f"{serializer_class.__name__}, {args.users} users (orjson: {'yes' if orjson else 'no'})", [
+            (label, best_rate(func, args.users, args.rounds), "objects/s") for label, func in runs
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Messages per second through core.email_backend.EmailBackend with and without the
+connection pool, against a local stand-in relay.
+
+    python -m benchmarks.bench_smtp_pool --messages 500 --connect-delay 0.02
+
+``--connect-delay`` emulates the TCP + STARTTLS + AUTH cost of a real relay.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import Stopwatch, report, setup_django
+
+
+def run(port: int, messages: int, concurrency: int, use_pool: bool) -> float:
+    from django.core.mail import EmailMessage
+    from core.email_backend import EmailBackend
+
+    def send(index):
+        backend = EmailBackend(host="127.0.0.1", port=port, username="", password="",
+                               use_tls=False, use_ssl=False, use_pool=use_pool)
+        EmailMessage("Benchmark", f"Message {index}", "bench@example.com", ["user@example.com"],
+                     connection=backend).send()
+
+    with Stopwatch() as watch, ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(send, range(messages)))
+    return messages / watch.wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--connect-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    setup_django(migrate=False)
+    from core.smtp_pool import close_pools
+    from core.tests.smtp_server import StubSMTPServer
+
+    rows = []
+    for use_pool in (False, True):
+        with StubSMTPServer(connect_delay=args.connect_delay) as server:
+            rate = run(server.port, args.messages, args.concurrency, use_pool)
+            close_pools()
+        label = "pooled" if use_pool else "connection per send_mail"
+        rows.append((f"{label} ({server.connections} connections)", rate, "msg/s"))
+
+    report(f"SMTP throughput, {args.messages} messages, {args.concurrency} threads", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(migrate: bool = True):
+    """Configure Django against the in-memory test settings so benchmarks need no services."""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aivora.settings_test")
+    os.environ.setdefault("DEBUG", "1")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+    for key in ("CORS_ALLOW_ALL_ORIGINS", "CORS_ALLOW_CREDENTIALS"):
+        os.environ.setdefault(key, "0")
+    # Benchmarks replay many requests from one client, the auth rate limits would shed them
+    for key in ("THROTTLE_AUTH_IP_RATE", "THROTTLE_AUTH_EMAIL_RATE", "THROTTLE_AUTH_GLOBAL_RATE"):
+        os.environ.setdefault(key, "")
+
+    import django
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0)
+
+
+class Stopwatch:
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._wall
+        self.cpu = time.process_time() - self._cpu
+
+
+def report(title: str, rows: list):
+    """Print ``rows`` of (label, value, unit) as an aligned table."""
+    print(f"\n{title}")
+    print("-" * len(title))
+    width = max(len(label) for label, *_ in rows)
+    for label, value, unit in rows:
+        print(f"  {label:<{width}}  {value:>12,.1f} {unit}")
+
+
+def wsgi_request(handler, method: str, path: str, body: dict = None, headers: dict = None) -> tuple:
+    """(status code, body) of a request served by a WSGI ``handler``, closed like a server would."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(payload)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(payload),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        **(headers or {}),
+    }
+    statuses = []
+    response = handler(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+    try:
+        content = b"".join(response)
+    finally:
+        # Fires request_finished, which closes or returns the connection
+        response.close()
+    return int(statuses[0].split()[0]), content
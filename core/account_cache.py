@@ -0,0 +1,67 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from .cache import TieredCache
+from .fast_serializers import compile_serializer, dumps
+from .metrics import metrics
+from .models import User
+from .serializers import UserMeSerializer
+
+
+account_cache = TieredCache(
+    "account_me",
+    settings.ACCOUNT_ME_CACHE_SIZE,
+    settings.ACCOUNT_ME_CACHE_TTL,
+    "ACCOUNT_ME_CACHE_ALIAS",
+    settings.ACCOUNT_ME_CACHE_SHARED_TTL,
+)
+metrics.gauge("account_me_cache", account_cache.stats)
+account_plan = compile_serializer(UserMeSerializer)
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def user_version(user: User) -> str:
+    return user.updated_at.isoformat() if user.updated_at else ""
+
+
+def store_payload(user: User, data: dict) -> tuple:
+    body = dumps(data)
+    etag = make_etag(body)
+    account_cache.set(user.pk, (user_version(user), etag, body))
+    return etag, body
+
+
+def account_payload(user: User) -> tuple:
+    """
+    (etag, encoded JSON body) of ``user``'s account/me payload. Entries are
+    stored with the user's updated_at and dropped on User save/delete (see
+    core.signals); a version mismatch, as after a bulk update, re-serializes.
+    """
+    entry = account_cache.get(user.pk)
+    if entry is not None and entry[0] == user_version(user):
+        return entry[1], entry[2]
+
+    metrics.incr("account_me.serialized")
+    return store_payload(user, account_plan.to_representation(user))
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def add_validators(response, etag: str):
+    response["ETag"] = etag
+    # Per user and always revalidated, intermediaries must not serve it to anyone else
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Authorization", "Cookie"))
+    return response
@@ -0,0 +1,58 @@
+from datetime import datetime
+from uuid import UUID
+
+from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .metrics import metrics
+from .models import User
+from .write_behind import WriteBehindBuffer
+
+
+FLUSH_CHUNK_SIZE = 500
+
+
+def latest(first: datetime, second: datetime):
+    if first is None or second is None:
+        return first or second
+    return max(first, second)
+
+
+class ActivityBuffer(WriteBehindBuffer):
+    """
+    Last login and last seen timestamps, coalesced per user in memory and
+    written with one UPDATE per flush (per FLUSH_CHUNK_SIZE users), so logins
+    and authenticated requests never wait on a write.
+    """
+
+    name = "activity"
+
+    def record_login(self, user_id: UUID):
+        now = timezone.now()
+        self.add(user_id, (now, now))
+
+    def record_seen(self, user_id: UUID):
+        self.add(user_id, (None, timezone.now()))
+
+    def merge(self, current: tuple, value: tuple) -> tuple:
+        return latest(current[0], value[0]), latest(current[1], value[1])
+
+    def write(self, pending: dict):
+        items = list(pending.items())
+        for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+            chunk = items[start:start + FLUSH_CHUNK_SIZE]
+            changes = {
+                "last_seen": Case(
+                    *[When(pk=user_id, then=Value(seen)) for user_id, (_, seen) in chunk],
+                    default=F("last_seen"),
+                ),
+            }
+            logins = [When(pk=user_id, then=Value(login)) for user_id, (login, _) in chunk if login is not None]
+            if logins:
+                changes["last_logined"] = Case(*logins, default=F("last_logined"))
+            User.objects.filter(pk__in=[user_id for user_id, _ in chunk]).update(**changes)
+
+
+activity_buffer = ActivityBuffer(settings.ACTIVITY_FLUSH_INTERVAL, settings.ACTIVITY_BUFFER_MAX_USERS)
+metrics.gauge("activity_buffer", activity_buffer.stats)
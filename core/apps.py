@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import db_pool, signals  # noqa: F401
+
+        if settings.TOKEN_PRUNE_INTERVAL > 0:
+            from .pruning import start_prune_scheduler
+            request_started.connect(start_prune_scheduler, dispatch_uid="core.start_prune_scheduler")
+
+        if settings.LEADERBOARD_SYNC_INTERVAL > 0:
+            from .leaderboard import start_leaderboard_sync
+            request_started.connect(start_leaderboard_sync, dispatch_uid="core.start_leaderboard_sync")
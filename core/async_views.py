@@ -0,0 +1,140 @@
+import json
+import logging
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from .activity import activity_buffer
+from .authentication import CachedJWTAuthentication
+from .hash_pool import HashPoolSaturated, hash_pool
+from .hashers import password_needs_rehash
+from .models import User
+from .serializers import ChangePasswordSerializer
+from .services import notify_login
+from .throttling import AuthRateThrottle
+from .tokens import RefreshToken
+from .views import set_auth_cookies
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_data(request) -> dict:
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST.dict()
+
+
+def saturated_response() -> JsonResponse:
+    response = JsonResponse(
+        {'detail': 'Server is busy, try again later'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+def throttled_response(wait: float) -> JsonResponse:
+    response = JsonResponse(
+        {'detail': 'Request was throttled.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+class AsyncAPIView(View):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated like the DRF views, which are CSRF exempt as well
+        return csrf_exempt(super().as_view(**initkwargs))
+
+
+class AsyncLoginView(AsyncAPIView):
+    """Same contract as LoginView, with the password check awaited on the hash pool."""
+
+    async def post(self, request):
+        data = read_data(request)
+        email, password = data.get('email'), data.get('password')
+
+        throttle = AuthRateThrottle()
+        if not throttle.allow("login", throttle.get_ident(request), email):
+            return throttled_response(throttle.wait())
+
+        if not email or password is None:
+            return JsonResponse({'detail': 'User doesn\'t exist'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        user = await User.objects.filter(email=email).afirst()
+        try:
+            if user is None:
+                # Spend the same hashing time as for a real account (see ModelBackend)
+                await hash_pool.make_password(password)
+                valid = False
+            else:
+                valid = await hash_pool.check_password(password, user.password)
+        except HashPoolSaturated:
+            return saturated_response()
+
+        if not valid or not user.is_active:
+            return JsonResponse({'detail': 'User doesn\'t exist'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        if not user.is_email_verified:
+            return JsonResponse({'detail': 'Email not verified'}, status=status.HTTP_403_FORBIDDEN)
+
+        if password_needs_rehash(user.password):
+            try:
+                user.password = await hash_pool.make_password(password)
+            except HashPoolSaturated:
+                pass
+            else:
+                await user.asave(update_fields=["password"])
+
+        activity_buffer.record_login(user.pk)
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
+        access = refresh.access_token
+        response = JsonResponse({"access": str(access), "refresh": str(refresh)}, status=status.HTTP_200_OK)
+        set_auth_cookies(response, access, refresh)
+
+        try:
+            await sync_to_async(notify_login)(user, request)
+        except Exception:
+            logger.exception("Could not send the login notification to %s", user.email)
+
+        return response
+
+
+class AsyncChangePasswordView(AsyncAPIView):
+    async def post(self, request):
+        try:
+            auth = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            return JsonResponse(detail, status=status.HTTP_401_UNAUTHORIZED)
+        if auth is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                                status=status.HTTP_401_UNAUTHORIZED)
+        user: User = auth[0]
+
+        serializer = ChangePasswordSerializer(data=read_data(request))
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if not await hash_pool.check_password(serializer.validated_data['old_password'], user.password):
+                return JsonResponse({'detail': 'Old password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
+            user.password = await hash_pool.make_password(serializer.validated_data['new_password'])
+        except HashPoolSaturated:
+            return saturated_response()
+
+        await user.asave(update_fields=["password", "updated_at"])
+
+        return JsonResponse({'detail': 'Password changed successfully'})
@@ -0,0 +1,80 @@
+import copy
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .activity import activity_buffer
+from .cache import MISSING, TieredCache
+from .db_router import use_primary
+from .metrics import metrics
+
+
+class UserCache(TieredCache):
+    """
+    Authenticated users in a TieredCache. Entries are dropped on User
+    save/delete (see core.signals), so the local TTL only bounds how long other
+    processes may serve a stale copy.
+    """
+
+    def __init__(self):
+        super().__init__(
+            "jwt_user",
+            settings.JWT_USER_CACHE_SIZE,
+            settings.JWT_USER_CACHE_TTL,
+            "JWT_USER_CACHE_ALIAS",
+            settings.JWT_USER_CACHE_SHARED_TTL,
+        )
+
+    def get(self, user_id):
+        user = super().get(user_id)
+        # Callers may mutate request.user (set_password), never hand out the cached instance
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user, generation=MISSING) -> bool:
+        return super().set(user.pk, user, local_value=copy.copy(user), generation=generation)
+
+    def invalidate(self, user_id):
+        self.delete(user_id)
+
+    def invalidate_many(self, user_ids):
+        self.delete_many(user_ids)
+
+
+user_cache = UserCache()
+metrics.gauge("jwt_user_cache", user_cache.stats)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user through ``user_cache``."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # Taken before the read, a save invalidating the user meanwhile keeps this copy out
+            generation = user_cache.generation(user_id)
+            try:
+                # Every worker is served this copy, a lagging replica's could still be active
+                with use_primary():
+                    user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user, generation)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        activity_buffer.record_seen(user.pk)
+        return user
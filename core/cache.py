@@ -0,0 +1,206 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe, process-local LRU with a per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is not MISSING:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class RecentKeys:
+    """
+    Keys remembered for ``window`` seconds; ``add`` is true only for a key not
+    seen within the window. Uses ``cache.add`` on the cache named by the
+    ``alias_setting`` setting, or a process-local LRU when that is unset.
+    """
+
+    def __init__(self, prefix: str, window: float, alias_setting: str, max_size: int = 100000):
+        self.prefix = prefix
+        self.window = window
+        self.alias_setting = alias_setting
+        self.local = LRUCache(max_size, window)
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        alias = getattr(settings, self.alias_setting)
+        return caches[alias] if alias else None
+
+    def add(self, key: str) -> bool:
+        key = f"{self.prefix}:{key}"
+        if self.shared is not None:
+            return self.shared.add(key, 1, max(int(self.window), 1))
+        with self._lock:
+            if self.local.get(key) is not None:
+                return False
+            self.local.set(key, 1)
+            return True
+
+    def mark(self, key: str):
+        """Remember ``key`` for a full window from now, whether or not it is already known."""
+        key = f"{self.prefix}:{key}"
+        if self.shared is not None:
+            self.shared.set(key, 1, max(int(self.window), 1))
+        else:
+            self.local.set(key, 1)
+
+    def seen(self, key: str) -> bool:
+        key = f"{self.prefix}:{key}"
+        if self.shared is not None:
+            return self.shared.get(key) is not None
+        return self.local.get(key) is not None
+
+    def clear(self):
+        self.local.clear()
+
+
+class TieredCache:
+    """
+    Process-local LRU in front of the shared Django cache named by the
+    ``alias_setting`` setting, used alone while that setting is unset. Shared
+    hits are copied into the local tier, so ``ttl`` bounds how long a process
+    may serve an entry deleted elsewhere.
+
+    Every delete also changes the key's ``generation``. A caller filling the
+    cache from a read takes the generation before the read and passes it to
+    ``set``, which then refuses to store the value if the key was deleted
+    meanwhile, so a copy read before a concurrent save is not written back
+    after that save's invalidation.
+    """
+
+    def __init__(self, prefix: str, max_size: int, ttl: float, alias_setting: str, shared_ttl: float):
+        self.prefix = prefix
+        self.alias_setting = alias_setting
+        self.shared_ttl = shared_ttl
+        self.local = LRUCache(max_size, ttl)
+        self.generations = LRUCache(max_size, shared_ttl)
+        self.shared_hits = 0
+        self.stale_sets = 0
+
+    @property
+    def shared(self):
+        alias = getattr(settings, self.alias_setting)
+        return caches[alias] if alias else None
+
+    def make_key(self, key) -> str:
+        return f"{self.prefix}:{key}"
+
+    def generation(self, key):
+        """Token that changes on every delete of ``key``, None while it was never deleted."""
+        key = f"{self.make_key(key)}:generation"
+        if self.shared is not None:
+            return self.shared.get(key)
+        return self.generations.get(key)
+
+    def get(self, key):
+        key = self.make_key(key)
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.shared_hits += 1
+                self.local.set(key, value)
+        return value
+
+    def set(self, key, value, local_value=None, generation=MISSING) -> bool:
+        """Store ``value``; with ``generation``, only if ``key`` was not deleted since it was taken."""
+        if generation is not MISSING and self.generation(key) != generation:
+            self.stale_sets += 1
+            return False
+        cache_key = self.make_key(key)
+        self.local.set(cache_key, value if local_value is None else local_value)
+        if self.shared is not None:
+            self.shared.set(cache_key, value, int(self.shared_ttl))
+        if generation is not MISSING and self.generation(key) != generation:
+            # Deleted between the check and the write
+            self.discard([cache_key])
+            self.stale_sets += 1
+            return False
+        return True
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        self.discard([self.make_key(key) for key in keys])
+        generations = {f"{self.make_key(key)}:generation": uuid.uuid4().hex for key in keys}
+        if self.shared is not None:
+            self.shared.set_many(generations, int(self.shared_ttl))
+        else:
+            for key, token in generations.items():
+                self.generations.set(key, token)
+
+    def discard(self, cache_keys):
+        for cache_key in cache_keys:
+            self.local.delete(cache_key)
+        if self.shared is not None:
+            self.shared.delete_many(cache_keys)
+
+    def clear(self):
+        self.local.clear()
+        self.generations.clear()
+        self.shared_hits = 0
+        self.stale_sets = 0
+
+    def stats(self) -> dict:
+        local = self.local.stats()
+        return {
+            "size": local["size"],
+            "local_hits": local["hits"],
+            "shared_hits": self.shared_hits,
+            "misses": local["misses"] - self.shared_hits,
+            "stale_sets": self.stale_sets,
+        }
@@ -0,0 +1,49 @@
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import metrics
+
+
+def pool_summary(stats: dict) -> dict:
+    """Saturation and wait figures out of psycopg_pool's ``get_stats()``."""
+    size, available, maximum = stats.get("pool_size", 0), stats.get("pool_available", 0), stats.get("pool_max", 0)
+    requests = stats.get("requests_num", 0)
+    return {
+        "size": size,
+        "available": available,
+        "max": maximum,
+        "saturation": round((size - available) / maximum, 4) if maximum else 0.0,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "wait_ms_avg": round(stats.get("requests_wait_ms", 0) / requests, 3) if requests else 0.0,
+        "timeouts": stats.get("requests_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def connection_stats() -> dict:
+    """Per database alias: pool figures when it is pooled, otherwise its persistent connection settings."""
+    result = {}
+    for alias in connections:
+        # Only pools already opened by this process, reading stats must not create one
+        pool = getattr(type(connections[alias]), "_connection_pools", {}).get(alias)
+        if pool is not None:
+            result[alias] = {"mode": "pool", **pool_summary(pool.get_stats())}
+        else:
+            settings_dict = connections.settings[alias]
+            result[alias] = {
+                "mode": "persistent" if settings_dict.get("CONN_MAX_AGE") else "per_request",
+                "conn_max_age": settings_dict.get("CONN_MAX_AGE"),
+                "health_checks": settings_dict.get("CONN_HEALTH_CHECKS", False),
+            }
+    return result
+
+
+metrics.gauge("db_connections", connection_stats)
+
+
+@receiver(connection_created, dispatch_uid="core.count_db_connections")
+def count_connection(sender, connection, **kwargs):
+    # New connections, or with a pool connections checked out of it
+    metrics.incr(f"db.connects.{connection.alias}")
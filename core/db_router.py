@@ -0,0 +1,199 @@
+import hashlib
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import RecentKeys
+from .metrics import metrics
+
+
+CONSISTENCY_HEADER = "X-Read-Consistency"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingState:
+    """
+    Read routing of one request or ``use_replicas`` block: ``pinned`` sends
+    every read to the primary, ``wrote`` is set by the first write. Code
+    running without one (background threads, management commands) reads the
+    primary.
+    """
+
+    def __init__(self, pinned: bool = False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state: ContextVar = ContextVar("db_routing", default=None)
+
+
+@contextmanager
+def routing(pinned: bool):
+    outer, inner = _state.get(), RoutingState(pinned)
+    token = _state.set(inner)
+    try:
+        yield inner
+    finally:
+        _state.reset(token)
+        if outer is not None and inner.wrote:
+            outer.wrote = True
+
+
+def use_primary():
+    """Read from the primary inside the block, e.g. right before a write that depends on the read."""
+    return routing(pinned=True)
+
+
+def use_replicas():
+    """Let reads inside the block go to replicas until the block writes, for code that tolerates lag."""
+    return routing(pinned=False)
+
+
+class ReadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.primary = 0
+        self.replica = 0
+
+    def record(self, replica: bool):
+        with self._lock:
+            if replica:
+                self.replica += 1
+            else:
+                self.primary += 1
+
+    def reset(self):
+        with self._lock:
+            self.primary = self.replica = 0
+
+    def stats(self) -> dict:
+        reads = self.primary + self.replica
+        return {
+            "replicas": len(settings.DATABASE_REPLICAS),
+            "primary_reads": self.primary,
+            "replica_reads": self.replica,
+            "replica_hit_rate": round(self.replica / reads, 4) if reads else 0.0,
+        }
+
+
+read_stats = ReadStats()
+metrics.gauge("db_router", read_stats.stats)
+
+# Credentials that wrote recently, their reads stay on the primary until replicas catch up
+recent_writers = RecentKeys("db_pin", settings.REPLICA_STICKY_SECONDS, "REPLICA_STICKY_CACHE_ALIAS")
+
+
+class ReplicaRouter:
+    """
+    Sends reads of requests (see ReplicaPinningMiddleware) and ``use_replicas``
+    blocks to DATABASE_REPLICAS in turn, writes to the primary. Reads stay on
+    the primary once the request has written, for pinned requests, inside
+    ``use_primary`` and everywhere outside a request, where background jobs
+    re-read their own writes. Replicas get their schema through replication,
+    never through migrate.
+    """
+
+    def __init__(self):
+        self._replicas = ()
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def next_replica(self) -> str:
+        replicas = tuple(settings.DATABASE_REPLICAS)
+        with self._lock:
+            if replicas != self._replicas:
+                self._replicas, self._cycle = replicas, itertools.cycle(replicas)
+            return next(self._cycle)
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        state = _state.get()
+        if state is None or state.pinned or state.wrote:
+            read_stats.record(replica=False)
+            return DEFAULT_DB_ALIAS
+        read_stats.record(replica=True)
+        return self.next_replica()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def credential_key(request):
+    """Stable key of the credential a request carries, the bearer token or the session cookie."""
+    credential = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return hashlib.sha256(credential.encode()).hexdigest()[:32]
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pins reads of a request to the primary when it is not a safe method, asks
+    for it with ``X-Read-Consistency: strong``, or carries a credential that
+    wrote within REPLICA_STICKY_SECONDS, so a PATCH followed by a GET reads
+    its own write.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def is_pinned(request, key) -> bool:
+        pinned = (
+            request.method not in SAFE_METHODS
+            or request.headers.get(CONSISTENCY_HEADER, "").lower() == "strong"
+            or (key is not None and recent_writers.seen(key))
+        )
+        if pinned:
+            metrics.incr("db_router.pinned_requests")
+        return pinned
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = credential_key(request)
+        with routing(self.is_pinned(request, key)) as state:
+            response = self.get_response(request)
+
+        if state.wrote and key is not None:
+            recent_writers.mark(key)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        # ORM calls of async views run in threads with a copy of this context,
+        # they share the RoutingState object and its ``wrote`` flag
+        key = credential_key(request)
+        with routing(self.is_pinned(request, key)) as state:
+            response = await self.get_response(request)
+
+        if state.wrote and key is not None:
+            recent_writers.mark(key)
+        return response
@@ -1,17 +1,116 @@
+import smtplib
 import ssl
+from functools import lru_cache
+from django.conf import settings
 from django.core.mail.backends.smtp import EmailBackend as DjangoEmailCore
-from django.utils.functional import cached_property
+from django.core.mail.utils import DNS_NAME
+from .smtp_pool import ResumableSMTP, ResumableSMTP_SSL, SMTPConnectionPool, get_pool
+
+
+@lru_cache(maxsize=None)
+def shared_ssl_context(ssl_certfile=None, ssl_keyfile=None):
+    # One context per process so TLS sessions can be resumed across connections
+    if ssl_certfile or ssl_keyfile:
+        ssl_context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLS_CLIENT)
+        ssl_context.load_cert_chain(ssl_certfile, ssl_keyfile)
+        return ssl_context
+    else:
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        return ssl_context
 
 
 class EmailBackend(DjangoEmailCore):
-    @cached_property
+    def __init__(self, *args, use_pool=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_pool = settings.EMAIL_POOL_ENABLED if use_pool is None else use_pool
+        self._connection_broken = False
+
+    @property
     def ssl_context(self):
-        if self.ssl_certfile or self.ssl_keyfile:
-            ssl_context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLS_CLIENT)
-            ssl_context.load_cert_chain(self.ssl_certfile, self.ssl_keyfile)
-            return ssl_context
+        return shared_ssl_context(self.ssl_certfile, self.ssl_keyfile)
+
+    @property
+    def pool(self) -> SMTPConnectionPool:
+        key = (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+        return get_pool(key, lambda: SMTPConnectionPool(
+            connect=self._connect,
+            max_size=settings.EMAIL_POOL_SIZE,
+            max_messages=settings.EMAIL_POOL_MAX_MESSAGES,
+            keepalive=settings.EMAIL_POOL_KEEPALIVE,
+            max_idle=settings.EMAIL_POOL_MAX_IDLE,
+            timeout=settings.EMAIL_POOL_TIMEOUT,
+        ))
+
+    def _connect(self, tls_session=None):
+        connection_params = {"local_hostname": DNS_NAME.get_fqdn(), "session": tls_session}
+        if self.timeout is not None:
+            connection_params["timeout"] = self.timeout
+        if self.use_ssl:
+            connection = ResumableSMTP_SSL(self.host, self.port, context=self.ssl_context, **connection_params)
         else:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            return ssl_context
+            connection = ResumableSMTP(self.host, self.port, **connection_params)
+
+        try:
+            if not self.use_ssl and self.use_tls:
+                connection.starttls(context=self.ssl_context)
+            if self.username and self.password:
+                connection.login(self.username, self.password)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def open(self):
+        if not self.use_pool:
+            return super().open()
+        if self.connection:
+            return False
+
+        try:
+            self.connection = self.pool.acquire()
+            self._connection_broken = False
+            return True
+        except (OSError, smtplib.SMTPException):
+            if not self.fail_silently:
+                raise
+
+    def close(self):
+        if not self.use_pool or self.connection is None:
+            return super().close()
+
+        try:
+            self.pool.release(self.connection, broken=self._connection_broken)
+        finally:
+            self.connection = None
+
+    def _send(self, email_message):
+        if not self.use_pool:
+            return super()._send(email_message)
+
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            try:
+                sent = super()._send(email_message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Pooled connection went away between health checks, retry once on a fresh one
+                self.pool.discard(self.connection)
+                self.connection = None
+                self.connection = self.pool.acquire()
+                sent = super()._send(email_message)
+        except smtplib.SMTPRecipientsRefused:
+            if not fail_silently:
+                raise
+            return False
+        except (OSError, smtplib.SMTPException):
+            self._connection_broken = True
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
+
+        if sent:
+            self.connection.pool_messages += 1
+        return sent
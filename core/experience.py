@@ -0,0 +1,88 @@
+from collections import defaultdict
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from .authentication import user_cache
+from .leaderboard import leaderboard
+from .metrics import metrics
+from .models import User
+from .models.choice import RANK_THRESHOLDS
+from .write_behind import WriteBehindBuffer
+
+
+FLUSH_CHUNK_SIZE = 500
+
+
+def rank_for(experience):
+    """Rank expression for ``experience`` (a value or an expression), following RANK_THRESHOLDS."""
+    *promotions, (lowest, _) = RANK_THRESHOLDS
+    return Case(
+        *[When(GreaterThanOrEqual(experience, threshold), then=Value(rank)) for rank, threshold in promotions],
+        default=Value(lowest),
+    )
+
+
+class ExperienceBuffer(WriteBehindBuffer):
+    """
+    Write-behind accumulator for experience awards. ``award`` only adds to an
+    in-memory counter; a flush writes every pending user with
+    ``experience = experience + n`` and the rank recomputed from the new value in
+    the same UPDATE, one statement per distinct increment, so concurrent awards
+    from other processes are never overwritten.
+    """
+
+    name = "xp"
+
+    def award(self, user_id: UUID, points: int):
+        if points <= 0:
+            raise ValueError("Experience awards must be positive")
+        metrics.incr("xp.awarded", points)
+        self.add(user_id, points)
+
+    def merge(self, current: int, points: int) -> int:
+        return current + points
+
+    def write(self, pending: dict):
+        by_points = defaultdict(list)
+        for user_id, points in pending.items():
+            by_points[points].append(user_id)
+
+        now = timezone.now()
+        with transaction.atomic():
+            for points, user_ids in by_points.items():
+                experience = F("experience") + points
+                for start in range(0, len(user_ids), FLUSH_CHUNK_SIZE):
+                    User.objects.filter(pk__in=user_ids[start:start + FLUSH_CHUNK_SIZE]).update(
+                        experience=experience,
+                        rank=rank_for(experience),
+                        updated_at=now,
+                    )
+
+    def after_flush(self, pending: dict):
+        user_cache.invalidate_many(pending)
+        if not leaderboard.stats()["loaded"]:
+            return
+        user_ids = list(pending)
+        for start in range(0, len(user_ids), FLUSH_CHUNK_SIZE):
+            rows = User.objects.filter(pk__in=user_ids[start:start + FLUSH_CHUNK_SIZE]).values_list(
+                "uuid", "experience", "country", "role", "is_active"
+            )
+            for row in rows:
+                leaderboard.update(*row)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending_users": len(self.pending), "pending_points": sum(self.pending.values())}
+
+
+experience_buffer = ExperienceBuffer(settings.XP_FLUSH_INTERVAL, settings.XP_BUFFER_MAX_USERS)
+metrics.gauge("xp_buffer", experience_buffer.stats)
+
+
+def award_experience(user_id: UUID, points: int):
+    experience_buffer.award(user_id, points)
@@ -0,0 +1,171 @@
+import json
+from functools import cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+try:
+    import orjson
+except ImportError:  # optional, json.dumps through DRF's renderer otherwise
+    orjson = None
+
+
+json_renderer = JSONRenderer()
+# orjson always writes compact UTF-8 and refuses nothing DRF would refuse for plain data
+ORJSON_COMPATIBLE = not json_renderer.ensure_ascii and json_renderer.compact and json_renderer.strict
+
+
+def dumps(data) -> bytes:
+    """``data`` (plain JSON types only) encoded byte for byte as JSONRenderer would."""
+    if orjson is None or not ORJSON_COMPATIBLE:
+        return json_renderer.render(data)
+    body = orjson.dumps(data)
+    if b"\xe2\x80\xa8" in body or b"\xe2\x80\xa9" in body:
+        # JSONRenderer escapes U+2028/U+2029 to stay a JavaScript subset
+        body = body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return body
+
+
+class EncodedJSONResponse(Response):
+    """
+    Response carrying a JSON body encoded up front. The JSON renderer sends
+    it as is; other renderers (the browsable API) and ``.data`` decode it.
+    """
+
+    def __init__(self, body: bytes, status=None, headers=None):
+        self.body = body
+        self._data = None
+        super().__init__(None, status=status, headers=headers)
+
+    @property
+    def data(self):
+        if self._data is None and self.body:
+            self._data = json.loads(self.body)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, "accepted_renderer", None)
+        if type(renderer) is JSONRenderer and "indent" not in (self.accepted_media_type or ""):
+            self["Content-Type"] = renderer.media_type
+            return self.body
+        return super().rendered_content
+
+
+def file_url(model_field):
+    def convert(value):
+        if not value:
+            return None
+        # A FieldFile off an instance, or the stored name out of values_list()
+        if isinstance(value, str):
+            return model_field.storage.url(value)
+        return value.url
+
+    return convert
+
+
+def choice_value(field):
+    choices = field.choice_strings_to_values
+
+    def convert(value):
+        return choices.get(str(value), value)
+
+    return convert
+
+
+class CompiledSerializer:
+    """
+    Read-only plan of a ModelSerializer, built once per class: for every field
+    the model attribute or column it reads and a plain converter replacing its
+    ``to_representation``. Fields without a fast converter keep DRF's, fields
+    that are not plain columns go through DRF entirely. Output equals the
+    serializer's ``.data`` without a request in the context (no absolute URLs).
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        model = serializer.Meta.model
+        self.serializer_class = serializer_class
+        self.names, self.columns, self.converters = [], [], []
+        self.fallbacks = {}
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            self.names.append(name)
+            model_field = self.model_field(model, field)
+            if model_field is None:
+                self.columns.append(None)
+                self.converters.append(None)
+                self.fallbacks[name] = field
+            else:
+                self.columns.append(model_field.name)
+                self.converters.append(self.converter(field, model_field))
+
+        self.plan = list(zip(self.names, self.columns, self.converters))
+        self.reads_rows = not self.fallbacks
+
+    @staticmethod
+    def model_field(model, field):
+        if len(field.source_attrs) != 1:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.is_relation:
+            return None
+        return model_field
+
+    @staticmethod
+    def converter(field, model_field):
+        if isinstance(field, serializers.FileField):
+            if getattr(field, "use_url", True):
+                return file_url(model_field)
+            return field.to_representation
+        if isinstance(field, serializers.ChoiceField):
+            return choice_value(field)
+        if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+            return str
+        if type(field) in (serializers.CharField, serializers.EmailField):
+            return str
+        if type(field) is serializers.IntegerField:
+            return int
+        return field.to_representation
+
+    def to_representation(self, instance) -> dict:
+        data = {}
+        for name, column, convert in self.plan:
+            if column is None:
+                field = self.fallbacks[name]
+                value = field.get_attribute(instance)
+                data[name] = None if value is None else field.to_representation(value)
+                continue
+            value = getattr(instance, column)
+            data[name] = None if value is None else convert(value)
+        return data
+
+    def many(self, instances) -> list:
+        return [self.to_representation(instance) for instance in instances]
+
+    def rows(self, queryset) -> list:
+        """Represent ``queryset`` straight from ``values_list()`` tuples, no model instances."""
+        if not self.reads_rows:
+            return self.many(queryset)
+        converters = self.converters
+        return [
+            dict(zip(self.names, [None if value is None else convert(value)
+                                  for value, convert in zip(row, converters)]))
+            for row in queryset.values_list(*self.columns)
+        ]
+
+
+@cache
+def compile_serializer(serializer_class) -> CompiledSerializer:
+    return CompiledSerializer(serializer_class)
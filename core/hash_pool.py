@@ -0,0 +1,92 @@
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+from .metrics import metrics
+
+
+class HashPoolSaturated(Exception):
+    pass
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _check_password(password: str, encoded: str, submitted_at: float) -> tuple:
+    from django.contrib.auth.hashers import check_password
+
+    started_at = time.time()
+    return check_password(password, encoded), started_at - submitted_at, time.time() - started_at
+
+
+def _make_password(password: str, submitted_at: float) -> tuple:
+    from django.contrib.auth.hashers import make_password
+
+    started_at = time.time()
+    return make_password(password), started_at - submitted_at, time.time() - started_at
+
+
+class HashPool:
+    """
+    Bounded process pool for password hashing, awaited from async views. At most
+    ``max_pending`` hashes may be queued or running; beyond that callers get
+    HashPoolSaturated instead of waiting behind the backlog.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                atexit.register(self.shutdown)
+            return self._executor
+
+    async def check_password(self, password: str, encoded: str) -> bool:
+        return await self._submit(_check_password, password, encoded)
+
+    async def make_password(self, password: str) -> str:
+        return await self._submit(_make_password, password)
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                metrics.incr("hash_pool.rejected")
+                raise HashPoolSaturated("Password hashing queue is full")
+            self.pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, queue_wait, hash_time = await loop.run_in_executor(self.executor, func, *args, time.time())
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+        metrics.observe("hash_pool.queue_wait", queue_wait)
+        metrics.observe("hash_pool.hash_time", hash_time)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "max_pending": self.max_pending}
+
+
+hash_pool = HashPool(settings.HASH_POOL_WORKERS, settings.HASH_POOL_MAX_PENDING)
+metrics.gauge("hash_pool", hash_pool.stats)
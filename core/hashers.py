@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+# Cost parameters come from settings on every use, so `manage.py calibrate_hasher`
+# output can be applied through the environment. The algorithm names are Django's,
+# stored hashes keep verifying and must_update() upgrades them on the next login.
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * N * r * p bytes, leave headroom over OpenSSL's 32MB default
+        return scrypt_maxmem(self.work_factor, self.block_size, self.parallelism)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+def scrypt_maxmem(n: int, r: int, p: int) -> int:
+    return max(2 * 128 * n * r * p, 32 * 1024 * 1024)
+
+
+def password_needs_rehash(encoded: str) -> bool:
+    """Same decision Django's check_password() makes before calling its setter."""
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = hashers.get_hasher("default")
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import LRUCache
+from .metrics import metrics
+
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request, args, kwargs) -> str:
+    body = json.dumps([request.path, args, kwargs, request.data], sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    First responses to requests carrying an Idempotency-Key, kept for
+    IDEMPOTENCY_TTL seconds in the shared cache under IDEMPOTENCY_CACHE_ALIAS,
+    or in a process-local LRU without one. Duplicates of a key wait on a
+    per-key lock while the first request runs and then get its response
+    replayed; across processes an in-flight key is marked with ``cache.add``
+    and a concurrent duplicate gets 409.
+    """
+
+    key_prefix = "idempotency"
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.local = LRUCache(max_size, ttl)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        alias = settings.IDEMPOTENCY_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def get(self, key: str):
+        if self.shared is not None:
+            return self.shared.get(key)
+        return self.local.get(key)
+
+    def set(self, key: str, entry: dict):
+        if self.shared is not None:
+            self.shared.set(key, entry, int(self.ttl))
+        else:
+            self.local.set(key, entry)
+
+    @contextmanager
+    def key_lock(self, key: str):
+        with self._lock:
+            lock, users = self._locks.get(key, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._locks[key]
+                if users == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, users - 1)
+
+    def run(self, key: str, fingerprint: str, handler):
+        key = f"{self.key_prefix}:{hashlib.sha256(key.encode()).hexdigest()}"
+        entry = self.get(key)
+        if entry is not None:
+            return self.replay(entry, fingerprint)
+
+        with self.key_lock(key):
+            # A duplicate in this process may have finished while we waited
+            entry = self.get(key)
+            if entry is not None:
+                return self.replay(entry, fingerprint)
+
+            shared = self.shared
+            in_flight = f"{key}:lock"
+            if shared is not None:
+                if not shared.add(in_flight, 1, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                    metrics.incr("idempotency.conflicts")
+                    return Response({'detail': 'A request with this Idempotency-Key is in progress'},
+                                    status=status.HTTP_409_CONFLICT)
+                # Another process may have stored its response and released the
+                # key between our read and the add
+                entry = self.get(key)
+                if entry is not None:
+                    shared.delete(in_flight)
+                    return self.replay(entry, fingerprint)
+            try:
+                response = handler()
+                if self.cacheable(response):
+                    self.set(key, {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                    })
+                    metrics.incr("idempotency.stored")
+            finally:
+                if shared is not None:
+                    shared.delete(in_flight)
+        return response
+
+    @staticmethod
+    def cacheable(response) -> bool:
+        # Server errors and throttling are worth retrying for real. Responses
+        # setting cookies carry credentials, those are never kept or replayed.
+        return (
+            isinstance(response, Response)
+            and response.status_code < 500
+            and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+            and not response.cookies
+        )
+
+    @staticmethod
+    def replay(entry: dict, fingerprint: str) -> Response:
+        if entry["fingerprint"] != fingerprint:
+            metrics.incr("idempotency.mismatches")
+            return Response({'detail': 'Idempotency-Key was already used for a different request'},
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        metrics.incr("idempotency.replayed")
+        response = Response(entry["data"], status=entry["status"])
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def clear(self):
+        self.local.clear()
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_TTL, settings.IDEMPOTENCY_CACHE_SIZE)
+metrics.gauge("idempotency_cache", idempotency_store.local.stats)
+
+
+def idempotent(method):
+    """
+    Handle duplicates of an APIView method by Idempotency-Key. Keys are scoped
+    to the view and the authenticated user, requests without one run as usual.
+    Not for views issuing tokens: their answer depends on credentials outside
+    ``request.data`` (cookies) and must never be replayed to another client.
+    """
+
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return method(view, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'detail': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def handler():
+            try:
+                return method(view, request, *args, **kwargs)
+            except Exception as exc:
+                # Validation errors are answers too, store them like returned responses
+                return view.handle_exception(exc)
+
+        user_id = request.user.pk if request.user.is_authenticated else ""
+        return idempotency_store.run(
+            f"{type(view).__name__}:{user_id}:{key}",
+            request_fingerprint(request, args, kwargs),
+            handler,
+        )
+
+    return wrapper
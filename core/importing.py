@@ -0,0 +1,203 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import User
+
+
+IMPORT_FIELDS = ("first_name", "last_name", "email", "phone", "country", "city", "appointment", "role")
+REQUIRED_FIELDS = ("first_name", "last_name", "email", "country")
+REPORT_FIELDS = ("line", "email", "phone", "reason")
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def read_rows(path: str, fmt: str = None):
+    """Yield (line number, row dict) from a CSV or JSONL file without loading it."""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            # Line 1 is the header
+            for line, row in enumerate(csv.DictReader(source), start=2):
+                yield line, row
+        else:
+            for line, text in enumerate(source, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError:
+                    row = None
+                yield line, row if isinstance(row, dict) else {}
+
+
+def taken_contacts(emails: set, phones: set) -> tuple:
+    """Emails and phones out of the given ones that already belong to a user."""
+    taken_emails = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+    taken_phones = set(User.objects.filter(phone__in=phones).values_list("phone", flat=True)) if phones else set()
+    return taken_emails, taken_phones
+
+
+def invalid_fields(row: dict) -> list:
+    """Fields of ``row`` its User model field rejects (format, max_length, choices), values are cleaned in place."""
+    invalid = []
+    for field in IMPORT_FIELDS:
+        if field not in row:
+            continue
+        try:
+            row[field] = User._meta.get_field(field).clean(row[field], None)
+        except ValidationError:
+            invalid.append(field)
+    return invalid
+
+
+def read_checkpoint(path: str) -> int:
+    try:
+        with open(path) as checkpoint:
+            return int(checkpoint.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path: str, line: int):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as checkpoint:
+        checkpoint.write(str(line))
+    os.replace(tmp, path)
+
+
+class UserImporter:
+    """
+    Create users from a CSV/JSONL stream in ``batch_size`` chunks. Per batch,
+    rows that are invalid or collide on email/phone with the database or an
+    earlier row are reported and skipped, passwords of the rest are hashed in a
+    process pool and the users are inserted with one bulk_create. After each
+    committed batch the last consumed source line is written to ``checkpoint``,
+    a rerun resumes after it.
+    """
+
+    def __init__(self, batch_size: int = 1000, workers: int = 0, activate: bool = False,
+                 checkpoint: str = None, report=None, progress=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.activate = activate
+        self.checkpoint = checkpoint
+        self.report = csv.DictWriter(report, REPORT_FIELDS) if report else None
+        self.progress = progress
+        self.result = {"read": 0, "created": 0, "duplicates": 0, "invalid": 0}
+
+    def run(self, rows) -> dict:
+        resume_after = read_checkpoint(self.checkpoint) if self.checkpoint else 0
+        rows = ((line, row) for line, row in rows if line > resume_after)
+        started = time.perf_counter()
+
+        executor = ProcessPoolExecutor(self.workers, initializer=_init_worker) if self.workers else None
+        try:
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(batch, executor)
+                if self.checkpoint:
+                    write_checkpoint(self.checkpoint, batch[-1][0])
+                if self.progress:
+                    self.progress(self.stats(started))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return self.stats(started)
+
+    def import_batch(self, batch: list, executor=None):
+        self.result["read"] += len(batch)
+        rows = self.filter_duplicates(self.validate(batch))
+        if not rows:
+            return
+
+        passwords = [row.pop("password", None) or None for _, row in rows]
+        if executor is not None:
+            chunksize = max(len(passwords) // (self.workers * 4), 1)
+            hashes = list(executor.map(make_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [make_password(password) for password in passwords]
+
+        users = [self.build_user(row, encoded) for (_, row), encoded in zip(rows, hashes)]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            self.result["created"] += len(users)
+        except IntegrityError:
+            # Lost a race with another writer, find the offending rows one by one
+            for (line, row), user in zip(rows, users):
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                    self.result["created"] += 1
+                except IntegrityError:
+                    self.skip(line, row, "duplicate", "duplicates")
+
+    def validate(self, batch: list) -> list:
+        valid = []
+        for line, row in batch:
+            row = {
+                key: str(row[key]).strip()
+                for key in (*IMPORT_FIELDS, "password")
+                if row.get(key) not in (None, "")
+            }
+            missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+            if missing:
+                self.skip(line, row, f"missing {', '.join(missing)}", "invalid")
+                continue
+            row["email"] = User.objects.normalize_email(row["email"])
+            # Caught here rather than as a DataError, which would abort the whole batch
+            invalid = invalid_fields(row)
+            if invalid:
+                self.skip(line, row, f"invalid {', '.join(invalid)}", "invalid")
+                continue
+            valid.append((line, row))
+        return valid
+
+    def filter_duplicates(self, rows: list) -> list:
+        emails = {row["email"] for _, row in rows}
+        phones = {row["phone"] for _, row in rows if row.get("phone")}
+        taken_emails, taken_phones = taken_contacts(emails, phones)
+
+        unique = []
+        for line, row in rows:
+            if row["email"] in taken_emails:
+                self.skip(line, row, "duplicate email", "duplicates")
+            elif row.get("phone") in taken_phones:
+                self.skip(line, row, "duplicate phone", "duplicates")
+            else:
+                taken_emails.add(row["email"])
+                if row.get("phone"):
+                    taken_phones.add(row["phone"])
+                unique.append((line, row))
+        return unique
+
+    def build_user(self, row: dict, encoded: str) -> User:
+        user = User(**row, password=encoded)
+        if self.activate:
+            user.is_active = True
+            user.is_email_verified = True
+        return user
+
+    def skip(self, line: int, row: dict, reason: str, counter: str):
+        self.result[counter] += 1
+        if self.report:
+            self.report.writerow({"line": line, "email": row.get("email"), "phone": row.get("phone"), "reason": reason})
+
+    def stats(self, started: float) -> dict:
+        elapsed = time.perf_counter() - started
+        return {
+            **self.result,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.result["read"] / elapsed, 1) if elapsed else 0.0,
+        }
@@ -0,0 +1,324 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from uuid import UUID
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .metrics import metrics
+from .models import User
+from .scheduler import PeriodicTask
+
+
+UUID_BITS = 128
+UUID_MASK = (1 << UUID_BITS) - 1
+
+
+def make_key(uuid_int: int, experience: int) -> int:
+    """Single int ordering by experience descending, then uuid ascending."""
+    return (-experience << UUID_BITS) | uuid_int
+
+
+def split_key(key: int) -> tuple:
+    return key & UUID_MASK, -(key >> UUID_BITS)
+
+
+class RankedList:
+    """
+    Sorted list of ints split into blocks of about ``load`` items, with a
+    Fenwick tree over the block lengths. Locating a key is a bisect over the
+    block maxima plus one inside the block; turning a block offset into a
+    global position, or a position into a block, walks the Fenwick tree. Both
+    are O(log n); inserts and removals additionally shift at most 2 * load
+    items inside one block.
+    """
+
+    def __init__(self, load: int = 512):
+        self.load = load
+        self.blocks = []
+        self.maxes = []
+        self.tree = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, key: int):
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            self.size = 1
+            self.rebuild_tree()
+            return
+
+        index = min(bisect_left(self.maxes, key), len(self.blocks) - 1)
+        block = self.blocks[index]
+        insort(block, key)
+        self.maxes[index] = block[-1]
+        self.size += 1
+        self.tree_add(index, 1)
+
+        if len(block) > 2 * self.load:
+            self.blocks[index:index + 1] = [block[:self.load], block[self.load:]]
+            self.maxes[index:index + 1] = [block[self.load - 1], block[-1]]
+            self.rebuild_tree()
+
+    def append(self, key: int):
+        """Add a key not smaller than any present, as during a sorted load."""
+        if self.blocks and key < self.maxes[-1]:
+            return self.add(key)
+        if not self.blocks or len(self.blocks[-1]) >= self.load:
+            self.blocks.append([])
+            self.maxes.append(key)
+            self.tree = None
+        self.blocks[-1].append(key)
+        self.maxes[-1] = key
+        self.size += 1
+        if self.tree is not None:
+            self.tree_add(len(self.blocks) - 1, 1)
+
+    def remove(self, key: int) -> bool:
+        index = bisect_left(self.maxes, key)
+        if index == len(self.blocks):
+            return False
+        block = self.blocks[index]
+        offset = bisect_left(block, key)
+        if offset == len(block) or block[offset] != key:
+            return False
+
+        del block[offset]
+        self.size -= 1
+        if block:
+            self.maxes[index] = block[-1]
+            self.tree_add(index, -1)
+        else:
+            del self.blocks[index]
+            del self.maxes[index]
+            self.rebuild_tree()
+        return True
+
+    def index(self, key: int):
+        """0-based position of ``key``, or None when absent."""
+        index = bisect_left(self.maxes, key)
+        if index == len(self.blocks):
+            return None
+        block = self.blocks[index]
+        offset = bisect_left(block, key)
+        if offset == len(block) or block[offset] != key:
+            return None
+        return self.prefix(index) + offset
+
+    def slice(self, start: int, count: int) -> list:
+        if start >= self.size or count <= 0:
+            return []
+        index, offset = self.locate(start)
+        result = []
+        while index < len(self.blocks) and len(result) < count:
+            result.extend(self.blocks[index][offset:offset + count - len(result)])
+            index, offset = index + 1, 0
+        return result
+
+    def clear(self):
+        self.blocks, self.maxes, self.tree, self.size = [], [], [], 0
+
+    # Fenwick tree over block lengths
+
+    def rebuild_tree(self):
+        tree = [0] * (len(self.blocks) + 1)
+        for index, block in enumerate(self.blocks, start=1):
+            tree[index] += len(block)
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def ensure_tree(self):
+        if self.tree is None or len(self.tree) != len(self.blocks) + 1:
+            self.rebuild_tree()
+
+    def tree_add(self, index: int, delta: int):
+        self.ensure_tree()
+        index += 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Total length of the blocks before ``index``."""
+        self.ensure_tree()
+        total = 0
+        while index:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def locate(self, position: int) -> tuple:
+        """(block, offset) holding the item at ``position``."""
+        self.ensure_tree()
+        index, step = 0, 1 << (len(self.tree).bit_length())
+        while step:
+            following = index + step
+            if following < len(self.tree) and self.tree[following] <= position:
+                index = following
+                position -= self.tree[following]
+            step >>= 1
+        return index, position
+
+
+class Leaderboard:
+    """
+    Experience leaderboards kept in process memory: one global board plus one
+    per country and per role. Filled from the database in a single streaming
+    pass ordered like the boards, then maintained incrementally through
+    ``update``/``remove`` (called from the User signals and the XP writer).
+    Top-N and position queries never touch the database.
+    """
+
+    def __init__(self):
+        self.boards = {}
+        self.members = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.synced_at = None
+
+    @staticmethod
+    def board_names(country: str, role: str) -> tuple:
+        return "global", f"country:{country}", f"role:{role}"
+
+    def load(self, chunk_size: int = 5000):
+        started = time.perf_counter()
+        synced_at = timezone.now()
+        self.build(
+            User.objects.filter(is_active=True)
+            .order_by("-experience", "uuid")
+            .values_list("uuid", "experience", "country", "role")
+            .iterator(chunk_size=chunk_size)
+        )
+        self.synced_at = synced_at
+        metrics.observe("leaderboard.load", time.perf_counter() - started)
+
+    def build(self, rows):
+        """Replace the boards with (uuid, experience, country, role) rows, fastest when sorted like the boards."""
+        boards, members = {}, {}
+        for uuid, experience, country, role in rows:
+            key = make_key(uuid.int, experience)
+            members[uuid.int] = (key, country, role)
+            for name in self.board_names(country, role):
+                board = boards.get(name)
+                if board is None:
+                    board = boards[name] = RankedList()
+                board.append(key)
+
+        with self._lock:
+            self.boards, self.members = boards, members
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+
+    def update(self, uuid: UUID, experience: int, country: str, role: str, is_active: bool = True):
+        if not self._loaded:
+            return
+        if not is_active:
+            return self.remove(uuid)
+
+        key = make_key(uuid.int, experience)
+        with self._lock:
+            previous = self.members.get(uuid.int)
+            if previous == (key, country, role):
+                return
+            if previous is not None:
+                self._discard(previous)
+            self.members[uuid.int] = (key, country, role)
+            for name in self.board_names(country, role):
+                board = self.boards.get(name)
+                if board is None:
+                    board = self.boards[name] = RankedList()
+                board.add(key)
+
+    def remove(self, uuid: UUID):
+        with self._lock:
+            previous = self.members.pop(uuid.int, None)
+            if previous is not None:
+                self._discard(previous)
+
+    def _discard(self, member: tuple):
+        key, country, role = member
+        for name in self.board_names(country, role):
+            board = self.boards.get(name)
+            if board is not None:
+                board.remove(key)
+
+    def top(self, board: str = "global", limit: int = 10, offset: int = 0) -> list:
+        """[(position, uuid, experience)] for ``limit`` entries from ``offset``, positions are 1-based."""
+        self.ensure_loaded()
+        with self._lock:
+            ranked = self.boards.get(board)
+            keys = ranked.slice(offset, limit) if ranked is not None else []
+        return [
+            (offset + index + 1, UUID(int=uuid_int), experience)
+            for index, (uuid_int, experience) in enumerate(map(split_key, keys))
+        ]
+
+    def position(self, uuid: UUID, board: str = "global"):
+        """(1-based position, board size), or None when the user is not on ``board``."""
+        self.ensure_loaded()
+        with self._lock:
+            member = self.members.get(uuid.int)
+            ranked = self.boards.get(board)
+            if member is None or ranked is None:
+                return None
+            index = ranked.index(member[0])
+            return None if index is None else (index + 1, len(ranked))
+
+    def sync(self):
+        """
+        Apply users changed by other processes since the last load or sync.
+        updated_at is set before commit, so a write committing just after the
+        previous sync can carry an earlier timestamp: every sync re-reads the
+        last LEADERBOARD_SYNC_OVERLAP seconds as well, re-applying is harmless.
+        """
+        if not self._loaded:
+            return self.load()
+        since, synced_at = self.synced_at, timezone.now()
+        rows = (
+            User.objects.filter(updated_at__gte=since - timedelta(seconds=settings.LEADERBOARD_SYNC_OVERLAP))
+            .values_list("uuid", "experience", "country", "role", "is_active")
+            .iterator()
+        )
+        for uuid, experience, country, role, is_active in rows:
+            self.update(uuid, experience, country, role, is_active)
+        self.synced_at = synced_at
+
+    def reset(self):
+        with self._lock:
+            self.boards, self.members = {}, {}
+            self._loaded = False
+
+    def stats(self) -> dict:
+        return {"loaded": self._loaded, "members": len(self.members), "boards": len(self.boards)}
+
+
+leaderboard = Leaderboard()
+metrics.gauge("leaderboard", leaderboard.stats)
+
+def _scheduled_sync():
+    close_old_connections()
+    try:
+        leaderboard.sync()
+    finally:
+        close_old_connections()
+
+
+leaderboard_sync = PeriodicTask(settings.LEADERBOARD_SYNC_INTERVAL, _scheduled_sync, name="leaderboard-sync")
+
+
+def start_leaderboard_sync(**kwargs):
+    # Connected to request_started, so only serving processes sync
+    leaderboard_sync.start()
@@ -0,0 +1,117 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand, CommandError
+
+from core.hashers import scrypt_maxmem
+
+
+PASSWORD = "calibration-password"
+
+
+def build_hasher(algorithm: str, params: dict):
+    hasher = {
+        "pbkdf2": hashers.PBKDF2PasswordHasher,
+        "scrypt": hashers.ScryptPasswordHasher,
+        "argon2": hashers.Argon2PasswordHasher,
+    }[algorithm]()
+    for name, value in params.items():
+        setattr(hasher, name, value)
+    if algorithm == "scrypt":
+        hasher.maxmem = scrypt_maxmem(hasher.work_factor, hasher.block_size, hasher.parallelism)
+    return hasher
+
+
+def hash_once(algorithm: str, params: dict) -> float:
+    hasher = build_hasher(algorithm, params)
+    started = time.perf_counter()
+    hasher.encode(PASSWORD, hasher.salt())
+    return time.perf_counter() - started
+
+
+def best_of(algorithm: str, params: dict, samples: int) -> float:
+    return min(hash_once(algorithm, params) for _ in range(samples))
+
+
+class Command(BaseCommand):
+    help = "Benchmark password hashing on this host and recommend cost parameters for a latency budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=["pbkdf2", "scrypt", "argon2", "all"],
+                            default=settings.PASSWORD_HASHER)
+        parser.add_argument("--target-ms", type=float, default=250.0,
+                            help="Latency budget of a single hash on an idle core")
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                            help="Concurrent hashing processes for the loaded measurement")
+        parser.add_argument("--samples", type=int, default=3)
+        parser.add_argument("--argon2-memory", type=int, default=settings.PASSWORD_ARGON2_MEMORY_COST,
+                            help="Argon2 memory cost in KiB")
+
+    def handle(self, *args, **options):
+        algorithms = ["pbkdf2", "scrypt", "argon2"] if options["algorithm"] == "all" else [options["algorithm"]]
+        target = options["target_ms"] / 1000
+        samples = options["samples"]
+
+        recommendations = []
+        for algorithm in algorithms:
+            try:
+                params = getattr(self, f"calibrate_{algorithm}")(target, samples, options)
+            except ValueError as e:
+                # Argon2 without argon2-cffi installed
+                self.stderr.write(f"{algorithm}: skipped, {e}")
+                continue
+
+            single = best_of(algorithm, params, samples)
+            loaded, throughput = self.measure_loaded(algorithm, params, options["processes"], samples)
+            self.stdout.write(
+                f"{algorithm:<7} {self.format_params(params):<48} "
+                f"idle {single * 1000:7.1f} ms  loaded {loaded * 1000:7.1f} ms  "
+                f"{throughput / options['processes']:6.1f} hashes/s/core  {throughput:7.1f} hashes/s host"
+            )
+            recommendations.append((algorithm, params))
+
+        if not recommendations:
+            raise CommandError("No algorithm could be calibrated")
+
+        calibrated = dict(recommendations)
+        algorithm = settings.PASSWORD_HASHER if settings.PASSWORD_HASHER in calibrated else recommendations[0][0]
+        params = calibrated[algorithm]
+        self.stdout.write(f"\nRecommended settings for a {options['target_ms']:.0f} ms budget:")
+        self.stdout.write(f"  PASSWORD_HASHER={algorithm}")
+        for name, value in params.items():
+            self.stdout.write(f"  PASSWORD_{algorithm.upper()}_{name.upper()}={value}")
+
+    def calibrate_pbkdf2(self, target, samples, options) -> dict:
+        probe = 100_000
+        per_iteration = best_of("pbkdf2", {"iterations": probe}, samples) / probe
+        iterations = max(int(target / per_iteration) // 10_000 * 10_000, 10_000)
+        return {"iterations": iterations}
+
+    def calibrate_scrypt(self, target, samples, options) -> dict:
+        params = {"work_factor": 2 ** 12, "block_size": 8, "parallelism": 1}
+        while best_of("scrypt", {**params, "work_factor": params["work_factor"] * 2}, samples) <= target:
+            params["work_factor"] *= 2
+        return params
+
+    def calibrate_argon2(self, target, samples, options) -> dict:
+        params = {"time_cost": 1, "memory_cost": options["argon2_memory"], "parallelism": 1}
+        while params["memory_cost"] > 8 * 1024 and best_of("argon2", params, samples) > target:
+            params["memory_cost"] //= 2
+        while best_of("argon2", {**params, "time_cost": params["time_cost"] + 1}, samples) <= target:
+            params["time_cost"] += 1
+        return params
+
+    def measure_loaded(self, algorithm, params, processes, samples) -> tuple:
+        jobs = processes * samples
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            started = time.perf_counter()
+            latencies = list(executor.map(hash_once, [algorithm] * jobs, [params] * jobs))
+            elapsed = time.perf_counter() - started
+        return sum(latencies) / len(latencies), jobs / elapsed
+
+    @staticmethod
+    def format_params(params: dict) -> str:
+        return " ".join(f"{name}={value}" for name, value in params.items())
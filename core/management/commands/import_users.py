@@ -0,0 +1,56 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importing import REPORT_FIELDS, UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk create users from a CSV or JSONL file, hashing passwords in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                            help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Password hashing processes, 0 hashes in this process")
+        parser.add_argument("--activate", action="store_true",
+                            help="Mark imported users active with a verified email")
+        parser.add_argument("--checkpoint", default=None,
+                            help="File recording the last imported line, reused to resume")
+        parser.add_argument("--report", default=None,
+                            help="CSV file receiving skipped duplicate and invalid rows")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["path"]):
+            raise CommandError(f"{options['path']} does not exist")
+
+        report = None
+        if options["report"]:
+            new_report = not os.path.exists(options["report"])
+            report = open(options["report"], "a", newline="", encoding="utf-8")
+            if new_report:
+                report.write(",".join(REPORT_FIELDS) + "\r\n")
+
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            activate=options["activate"],
+            checkpoint=options["checkpoint"],
+            report=report,
+            progress=self.progress if options["verbosity"] else None,
+        )
+        try:
+            result = importer.run(read_rows(options["path"], options["format"]))
+        finally:
+            if report is not None:
+                report.close()
+
+        self.stdout.write(
+            f"Read {result['read']} rows: created {result['created']}, skipped {result['duplicates']} duplicates "
+            f"and {result['invalid']} invalid in {result['seconds']}s ({result['rows_per_second']} rows/s)"
+        )
+
+    def progress(self, stats: dict):
+        self.stdout.write(f"  {stats['read']} rows, {stats['created']} created, {stats['rows_per_second']} rows/s")
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.pruning import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted JWT refresh tokens in throttled chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=settings.TOKEN_PRUNE_CHUNK_SIZE)
+        parser.add_argument("--pause", type=float, default=settings.TOKEN_PRUNE_PAUSE,
+                            help="Seconds to sleep between chunks")
+        parser.add_argument("--max-seconds", type=float, default=None,
+                            help="Stop after this many seconds, the next run continues")
+
+    def handle(self, *args, **options):
+        result = prune_expired_tokens(
+            chunk_size=options["chunk_size"],
+            pause=options["pause"],
+            max_seconds=options["max_seconds"],
+        )
+        self.stdout.write(
+            f"Deleted {result['outstanding']} outstanding and {result['blacklisted']} blacklisted tokens "
+            f"in {result['chunks']} chunks, {result['seconds']}s ({result['rows_per_second']} rows/s)"
+        )
@@ -0,0 +1,72 @@
+import json
+import logging
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_main(batch_size, poll_interval, report_interval):
+    import django
+    django.setup()
+
+    from core.outbox import OutboxWorker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [outbox %(process)d] %(message)s")
+    worker = OutboxWorker(batch_size=batch_size, poll_interval=poll_interval, report_interval=report_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+class Command(BaseCommand):
+    help = "Drain the email outbox with a pool of delivery worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.EMAIL_OUTBOX_WORKERS)
+        parser.add_argument("--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument("--poll-interval", type=float, default=settings.EMAIL_OUTBOX_POLL_INTERVAL)
+        parser.add_argument("--report-interval", type=float, default=60.0)
+        parser.add_argument("--once", action="store_true", help="Deliver a single batch in this process and exit")
+        parser.add_argument("--stats", action="store_true", help="Print queue depth and send latency and exit")
+
+    def handle(self, *args, **options):
+        from core.outbox import OutboxWorker, outbox_stats
+
+        if options["stats"]:
+            self.stdout.write(json.dumps(outbox_stats(), indent=2))
+            return
+
+        if options["once"]:
+            worker = OutboxWorker(batch_size=options["batch_size"])
+            self.stdout.write(json.dumps(worker.run_once()))
+            return
+
+        # Children must not inherit the parent's open database sockets.
+        connections.close_all()
+
+        processes = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(options["batch_size"], options["poll_interval"], options["report_interval"]),
+                name=f"email-outbox-{index}",
+            )
+            for index in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} outbox workers")
+
+        def shutdown(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        for process in processes:
+            process.join()
+        self.stdout.write("Outbox workers stopped")
@@ -0,0 +1,65 @@
+import threading
+from collections import defaultdict
+from typing import Callable
+
+
+class Timer:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+        }
+
+
+class MetricsRegistry:
+    """Process-local counters, timers and gauges exposed through the metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._timers = defaultdict(Timer)
+        self._gauges: dict[str, Callable[[], object]] = {}
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self._timers[name].observe(seconds)
+
+    def gauge(self, name: str, collector: Callable[[], object]):
+        self._gauges[name] = collector
+
+    def snapshot(self, gauges: bool = True) -> dict:
+        with self._lock:
+            data = {
+                "counters": dict(self._counters),
+                "timers": {name: timer.snapshot() for name, timer in self._timers.items()},
+            }
+        if gauges:
+            data["gauges"] = {name: collector() for name, collector in self._gauges.items()}
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,121 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.module_loading import import_string
+
+
+def adapt(method, is_async: bool, method_is_async: bool = None):
+    """``method`` callable in the given mode, as BaseHandler.adapt_method_mode does."""
+    if method_is_async is None:
+        method_is_async = iscoroutinefunction(method)
+    if is_async and not method_is_async:
+        return sync_to_async(method, thread_sensitive=True)
+    if not is_async and method_is_async:
+        return async_to_sync(method)
+    return method
+
+
+class SiteMiddleware:
+    """
+    Splits the middleware stack by path. Requests under API_PATH_PREFIXES go
+    straight on with API_URLCONF, which holds only the API routes; everything
+    else, the admin above all, first runs SITE_MIDDLEWARE (sessions, CSRF,
+    auth, messages, clickjacking) as if it were listed in MIDDLEWARE, view,
+    exception and template response hooks included. Runs in the mode of the
+    handler below it, so an ASGI stack stays async end to end.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            # Django awaits these hooks on an async stack, sync ones would cost a thread hop per request
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+        self.view_hooks, self.exception_hooks, self.template_hooks = [], [], []
+
+        # The chain is built like BaseHandler.load_middleware builds MIDDLEWARE
+        handler, handler_is_async = get_response, self.is_async
+        for path in reversed(settings.SITE_MIDDLEWARE):
+            middleware = import_string(path)
+            if not handler_is_async and getattr(middleware, "sync_capable", True):
+                middleware_is_async = False
+            else:
+                middleware_is_async = getattr(middleware, "async_capable", False)
+            adapted = adapt(handler, middleware_is_async, handler_is_async)
+            try:
+                instance = middleware(adapted)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(instance, "process_view"):
+                self.view_hooks.insert(0, adapt(instance.process_view, self.is_async))
+            if hasattr(instance, "process_exception"):
+                # Django runs exception hooks synchronously in either mode
+                self.exception_hooks.append(adapt(instance.process_exception, False))
+            if hasattr(instance, "process_template_response"):
+                self.template_hooks.append(adapt(instance.process_template_response, self.is_async))
+            handler, handler_is_async = instance, middleware_is_async
+        self.site_response = adapt(handler, self.is_async, handler_is_async)
+
+    @staticmethod
+    def is_api(request) -> bool:
+        return request.path_info.startswith(settings.API_PATH_PREFIXES)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if self.is_api(request):
+            request.urlconf = settings.API_URLCONF
+            return self.get_response(request)
+        return self.site_response(request)
+
+    async def __acall__(self, request):
+        if self.is_api(request):
+            request.urlconf = settings.API_URLCONF
+            return await self.get_response(request)
+        return await self.site_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for hook in self.view_hooks:
+            response = await hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_api(request):
+            return response
+        for hook in self.template_hooks:
+            response = hook(request, response)
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        if self.is_api(request):
+            return response
+        for hook in self.template_hooks:
+            response = await hook(request, response)
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+# Expired tokens are pruned by expiry range (core.pruning). Rows are inserted in
+# roughly expires_at order, so on Postgres a BRIN index makes that range scan
+# cheap at a tiny fraction of a btree's size and insert cost. The table belongs to
+# simplejwt and is referenced by a FK on its id plus a unique jti, which Postgres
+# does not allow on a table partitioned by expires_at.
+CREATE_SQL = (
+    "CREATE INDEX IF NOT EXISTS token_outstanding_expires_brin "
+    "ON token_blacklist_outstandingtoken USING brin (expires_at) WITH (pages_per_range = 32)"
+)
+DROP_SQL = "DROP INDEX IF EXISTS token_outstanding_expires_brin"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_email_outbox'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0006_user_export_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_role_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at', '-uuid'], name='user_created_uuid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', '-created_at', '-uuid'], name='user_role_created_uuid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['rank', '-created_at', '-uuid'], name='user_rank_created_uuid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['country', '-created_at', '-uuid'], name='user_country_created_uuid_idx'),
+        ),
+    ]
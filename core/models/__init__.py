@@ -1 +1,2 @@
 from .user import User
+from .outbox import EmailOutbox
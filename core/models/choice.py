@@ -14,4 +14,19 @@ class UserRankChoice(models.TextChoices):
     JUNIOR = 'junior', 'Junior'
     MIDDLE = 'middle', 'Middle'
     SENIOR = 'senior', 'Senior'
-    GOD = 'god', 'God'
\ No newline at end of file
+    GOD = 'god', 'God'
+
+# Least experience needed for each rank, highest first
+RANK_THRESHOLDS = (
+    (UserRankChoice.GOD, 50000),
+    (UserRankChoice.SENIOR, 15000),
+    (UserRankChoice.MIDDLE, 5000),
+    (UserRankChoice.JUNIOR, 1000),
+    (UserRankChoice.NOOB, 0),
+)
+
+class EmailStatusChoice(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    SENDING = 'sending', 'Sending'
+    SENT = 'sent', 'Sent'
+    FAILED = 'failed', 'Failed'
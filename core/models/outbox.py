@@ -0,0 +1,33 @@
+from django.utils import timezone
+from .base import models, uuid
+from .abs import AbstractTimeStampModel
+from .choice import EmailStatusChoice
+
+
+class EmailOutbox(AbstractTimeStampModel):
+    uuid = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
+    subject = models.CharField(max_length=255, verbose_name="Subject")
+    message = models.TextField(verbose_name="Message")
+    from_email = models.CharField(max_length=254, blank=True, null=True, verbose_name="From email")
+    recipients = models.JSONField(default=list, verbose_name="Recipients")
+    status = models.CharField(
+        max_length=16,
+        verbose_name="Status",
+        choices=EmailStatusChoice.choices,
+        default=EmailStatusChoice.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Delivery attempts")
+    available_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Available at",
+        help_text="Entry is not picked up by workers before this moment"
+    )
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Sent at")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Last error")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="outbox_status_available_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
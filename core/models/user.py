@@ -56,6 +56,7 @@ class User(AbstractBaseUser, AbstractTimeStampModel, PermissionsMixin):
     )
     is_email_verified = models.BooleanField(default=False, verbose_name="Veryfied Email")
     last_logined = models.DateTimeField(null=True, blank=True, verbose_name="Last logined at")
+    last_seen = models.DateTimeField(null=True, blank=True, verbose_name="Last seen at")
 
     is_active = models.BooleanField(
         default=False, verbose_name="Is active user",
@@ -69,5 +70,20 @@ class User(AbstractBaseUser, AbstractTimeStampModel, PermissionsMixin):
 
     objects = CustomUserManager()
 
+    class Meta:
+        indexes = [
+            # Keyset pages of the user directory, newest first, and the export filters
+            models.Index(fields=["-created_at", "-uuid"], name="user_created_uuid_idx"),
+            models.Index(fields=["role", "-created_at", "-uuid"], name="user_role_created_uuid_idx"),
+            models.Index(fields=["rank", "-created_at", "-uuid"], name="user_rank_created_uuid_idx"),
+            models.Index(fields=["country", "-created_at", "-uuid"], name="user_country_created_uuid_idx"),
+            models.Index(fields=["is_email_verified", "created_at"], name="user_verified_created_idx"),
+            # Leaderboard load and sync
+            models.Index(fields=["-experience", "uuid"], name="user_experience_idx"),
+            models.Index(fields=["updated_at"], name="user_updated_idx"),
+            # Stale account lookups
+            models.Index(fields=["last_seen"], name="user_last_seen_idx"),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
\ No newline at end of file
@@ -0,0 +1,106 @@
+import hashlib
+import logging
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+from .cache import RecentKeys
+from .metrics import metrics
+from .write_behind import WriteBehindBuffer
+
+
+logger = logging.getLogger(__name__)
+
+
+def device_fingerprint(request) -> str:
+    if request is None:
+        return "unknown"
+    agent = request.META.get("HTTP_USER_AGENT", "")
+    ident = BaseThrottle().get_ident(request)
+    return hashlib.sha256(f"{agent}|{ident}".encode()).hexdigest()[:16]
+
+
+class LoginDigestBuffer(WriteBehindBuffer):
+    """
+    Logins whose alert was suppressed, mailed as one digest per user on each
+    scheduled flush. Digests are never sent from a login request: once
+    ``max_users`` users are pending, logins of other users are dropped and counted.
+    """
+
+    name = "login_digest"
+    drop_when_full = True
+
+    def merge(self, current: dict, value: dict) -> dict:
+        for fingerprint, (count, first, last, agent) in value["devices"].items():
+            seen = current["devices"].get(fingerprint)
+            if seen is None:
+                current["devices"][fingerprint] = (count, first, last, agent)
+            else:
+                current["devices"][fingerprint] = (seen[0] + count, min(seen[1], first), max(seen[2], last), agent)
+        return current
+
+    def write(self, pending: dict):
+        from .services import send_email_core
+
+        sent = 0
+        for entry in pending.values():
+            try:
+                send_email_core(
+                    subject="Recent logins into your account",
+                    message=self.digest_message(entry),
+                    recipient=entry["email"],
+                )
+            except Exception:
+                metrics.incr("login_notify.digest_failures")
+                logger.exception("Could not send login digest to %s", entry["email"])
+            else:
+                sent += 1
+        metrics.incr("login_notify.digests", sent)
+
+    @staticmethod
+    def digest_message(entry: dict) -> str:
+        lines = [f"Dear {entry['first_name']},", "There were more logins into your account:"]
+        for count, first, last, agent in entry["devices"].values():
+            lines.append(
+                f"  {count} from {agent or 'an unknown device'} between "
+                f"{first.strftime('%Y-%m-%d %H:%M')} and {last.strftime('%H:%M')} UTC"
+            )
+        return "\n".join(lines)
+
+
+class LoginNotifier:
+    """
+    Decides per (user, device) whether a login gets its own alert. The first
+    login in LOGIN_NOTIFY_WINDOW seconds does; the rest are collected for the
+    digest. Decisions are a cache ``add`` on the shared cache under
+    LOGIN_NOTIFY_CACHE_ALIAS, or on a process-local LRU without one, never the database.
+    """
+
+    def __init__(self, window: float, digest_interval: float, digest_max_users: int):
+        self.window = window
+        self.recent = RecentKeys("login_notify", window, "LOGIN_NOTIFY_CACHE_ALIAS")
+        self.digests = LoginDigestBuffer(digest_interval, digest_max_users)
+
+    def should_alert(self, user_id, fingerprint: str) -> bool:
+        if self.window <= 0:
+            return True
+        return self.recent.add(f"{user_id}:{fingerprint}")
+
+    def suppress(self, user, fingerprint: str, agent: str):
+        now = timezone.now()
+        metrics.incr("login_notify.suppressed")
+        self.digests.add(user.pk, {
+            "email": user.email,
+            "first_name": user.first_name,
+            "devices": {fingerprint: (1, now, now, agent[:120])},
+        })
+
+    def reset(self):
+        self.recent.clear()
+        self.digests.pending.clear()
+
+
+login_notifier = LoginNotifier(
+    settings.LOGIN_NOTIFY_WINDOW, settings.LOGIN_NOTIFY_DIGEST_INTERVAL, settings.LOGIN_NOTIFY_DIGEST_MAX_USERS,
+)
+metrics.gauge("login_digest", login_notifier.digests.stats)
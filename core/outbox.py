@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Union
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min
+from django.utils import timezone
+
+from .metrics import metrics
+from .models import EmailOutbox
+from .models.choice import EmailStatusChoice
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject: str, message: str, recipient: Union[list, str], from_email: str = None) -> EmailOutbox:
+    return EmailOutbox.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipients=recipient if isinstance(recipient, list) else [recipient],
+    )
+
+
+def enqueue_emails(messages: list, from_email: str = None) -> list:
+    """Store many (subject, message, recipient) tuples with a single insert."""
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipients=recipient if isinstance(recipient, list) else [recipient],
+        )
+        for subject, message, recipient in messages
+    ])
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    delay = settings.EMAIL_OUTBOX_BACKOFF_BASE * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_BACKOFF_MAX))
+
+
+def claim_batch(batch_size: int) -> list:
+    """
+    Lease up to ``batch_size`` due entries to the calling worker. Entries left in
+    SENDING by a crashed worker become due again once their lease expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                status__in=[EmailStatusChoice.PENDING, EmailStatusChoice.SENDING],
+                available_at__lte=now,
+            )
+            .order_by("available_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+
+        EmailOutbox.objects.filter(pk__in=ids).update(
+            status=EmailStatusChoice.SENDING,
+            available_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+            attempts=F("attempts") + 1,
+        )
+
+    return list(EmailOutbox.objects.filter(pk__in=ids))
+
+
+def deliver_batch(entries: list) -> dict:
+    result = {"sent": 0, "retried": 0, "failed": 0}
+    if not entries:
+        return result
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for entry in entries:
+            result[_mark_failure(entry, e)] += 1
+        return result
+
+    try:
+        for entry in entries:
+            message = EmailMessage(
+                subject=entry.subject,
+                body=entry.message,
+                from_email=entry.from_email or settings.EMAIL_HOST_USER,
+                to=entry.recipients,
+                connection=connection,
+            )
+            try:
+                message.send(fail_silently=False)
+            except Exception as e:
+                result[_mark_failure(entry, e)] += 1
+            else:
+                _mark_sent(entry)
+                result["sent"] += 1
+    finally:
+        connection.close()
+
+    return result
+
+
+def _mark_sent(entry: EmailOutbox):
+    entry.status = EmailStatusChoice.SENT
+    entry.sent_at = timezone.now()
+    entry.last_error = None
+    entry.save(update_fields=["status", "sent_at", "last_error", "updated_at"])
+
+    metrics.incr("email_outbox.sent")
+    metrics.observe("email_outbox.send_latency", (entry.sent_at - entry.created_at).total_seconds())
+
+
+def _mark_failure(entry: EmailOutbox, error: Exception) -> str:
+    entry.last_error = f"{type(error).__name__}: {error}"
+    if entry.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        entry.status = EmailStatusChoice.FAILED
+        outcome = "failed"
+    else:
+        entry.status = EmailStatusChoice.PENDING
+        entry.available_at = timezone.now() + backoff_delay(entry.attempts)
+        outcome = "retried"
+    entry.save(update_fields=["status", "available_at", "last_error", "updated_at"])
+
+    metrics.incr(f"email_outbox.{outcome}")
+    logger.warning("Outbox delivery of %s failed (attempt %s): %s", entry.pk, entry.attempts, entry.last_error)
+    return outcome
+
+
+def outbox_stats() -> dict:
+    now = timezone.now()
+    depth = dict.fromkeys(EmailStatusChoice.values, 0)
+    for status_value, total in EmailOutbox.objects.order_by().values_list("status").annotate(total=Count("pk")):
+        depth[status_value] = total
+
+    oldest = (
+        EmailOutbox.objects
+        .filter(status__in=[EmailStatusChoice.PENDING, EmailStatusChoice.SENDING])
+        .aggregate(oldest=Min("created_at"))["oldest"]
+    )
+    latency = (
+        EmailOutbox.objects
+        .filter(status=EmailStatusChoice.SENT, sent_at__gte=now - timedelta(minutes=15))
+        .aggregate(avg=Avg(ExpressionWrapper(F("sent_at") - F("created_at"), output_field=DurationField())))["avg"]
+    )
+
+    return {
+        "depth": depth,
+        "oldest_pending_seconds": round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+        "avg_send_latency_seconds": round(latency.total_seconds(), 3) if latency else 0.0,
+    }
+
+
+metrics.gauge("email_outbox", outbox_stats)
+
+
+class OutboxWorker:
+    def __init__(self, batch_size: int = None, poll_interval: float = None, report_interval: float = 60.0):
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.EMAIL_OUTBOX_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.report_interval = report_interval
+        self.stopped = threading.Event()
+
+    def stop(self, *args):
+        self.stopped.set()
+
+    def run_once(self) -> dict:
+        close_old_connections()
+        return deliver_batch(claim_batch(self.batch_size))
+
+    def run(self):
+        last_report = time.monotonic()
+        while not self.stopped.is_set():
+            result = self.run_once()
+            if time.monotonic() - last_report >= self.report_interval:
+                self.report()
+                last_report = time.monotonic()
+            if not any(result.values()):
+                self.stopped.wait(self.poll_interval)
+
+    def report(self):
+        stats = outbox_stats()
+        latency = metrics.snapshot(gauges=False)["timers"].get("email_outbox.send_latency", {})
+        logger.info(
+            "Outbox depth=%s oldest_pending=%ss avg_latency=%ss worker_latency=%s",
+            stats["depth"], stats["oldest_pending_seconds"], stats["avg_send_latency_seconds"], latency,
+        )
@@ -0,0 +1,92 @@
+import base64
+import json
+from uuid import UUID
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pages over (created_at, uuid). The cursor is the key of the
+    last row served; the next page is a range scan below it on an index ending
+    in (created_at, uuid), so page N costs the same as page 1 and no COUNT is run.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    page_size = 50
+    max_page_size = 200
+    ordering = ("-created_at", "-uuid")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        limit = self.get_limit(request)
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        page = list(self.after(queryset, cursor)[:limit + 1])
+        self.has_next = len(page) > limit
+        self.page = page[:limit]
+        return self.page
+
+    def after(self, queryset, cursor):
+        """Rows following ``cursor`` (created_at, uuid) in page order."""
+        queryset = queryset.order_by(*self.ordering)
+        if cursor is None:
+            return queryset
+        created_at, uuid = cursor
+        # The leading created_at <= bound is what turns this into an index range
+        return queryset.filter(
+            Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(uuid__lt=uuid))
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last.created_at, last.uuid))
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, self.page_size))
+        except ValueError:
+            raise ValidationError({self.limit_query_param: "A positive integer is required."})
+        if limit < 1:
+            raise ValidationError({self.limit_query_param: "A positive integer is required."})
+        return min(limit, self.max_page_size)
+
+    @staticmethod
+    def encode_cursor(created_at, uuid) -> str:
+        raw = json.dumps([created_at.isoformat(), str(uuid)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, uuid = json.loads(raw)
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return created_at, UUID(uuid)
+        except (ValueError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
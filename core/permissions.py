@@ -0,0 +1,13 @@
+from rest_framework import permissions
+
+from .models.choice import UserRoleChoice
+
+
+class IsOwnerOrManager(permissions.BasePermission):
+    """Organization owners and managers, plus staff."""
+
+    roles = (UserRoleChoice.OWNER, UserRoleChoice.MANAGER, UserRoleChoice.ADMIN)
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_staff or user.role in self.roles))
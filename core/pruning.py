@@ -0,0 +1,71 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .metrics import metrics
+from .scheduler import PeriodicTask
+
+
+logger = logging.getLogger(__name__)
+
+
+def prune_expired_tokens(chunk_size: int = None, pause: float = None, max_seconds: float = None) -> dict:
+    """
+    Delete expired outstanding tokens and their blacklist entries in short
+    transactions of at most ``chunk_size`` rows, sleeping ``pause`` seconds in
+    between so concurrent logins never wait on a long lock.
+    """
+    chunk_size = chunk_size or settings.TOKEN_PRUNE_CHUNK_SIZE
+    pause = settings.TOKEN_PRUNE_PAUSE if pause is None else pause
+    cutoff = timezone.now()
+    started = time.perf_counter()
+    result = {"outstanding": 0, "blacklisted": 0, "chunks": 0}
+
+    while max_seconds is None or time.perf_counter() - started < max_seconds:
+        with transaction.atomic():
+            ids = list(
+                OutstandingToken.objects
+                .filter(expires_at__lt=cutoff)
+                .order_by()
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            result["blacklisted"] += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+            result["outstanding"] += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+
+        result["chunks"] += 1
+        if len(ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - started
+    deleted = result["outstanding"] + result["blacklisted"]
+    result["seconds"] = round(elapsed, 3)
+    result["rows_per_second"] = round(deleted / elapsed, 1) if elapsed else 0.0
+
+    metrics.incr("token_prune.rows", deleted)
+    metrics.observe("token_prune.run", elapsed)
+    return result
+
+
+def _scheduled_prune():
+    close_old_connections()
+    try:
+        result = prune_expired_tokens(max_seconds=settings.TOKEN_PRUNE_MAX_SECONDS)
+        logger.info("Pruned expired tokens: %s", result)
+    finally:
+        close_old_connections()
+
+
+prune_scheduler = PeriodicTask(settings.TOKEN_PRUNE_INTERVAL, _scheduled_prune, name="token-prune")
+
+
+def start_prune_scheduler(**kwargs):
+    # Connected to request_started, so only serving processes prune, not migrate or shell
+    prune_scheduler.start()
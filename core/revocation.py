@@ -0,0 +1,135 @@
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .cache import LRUCache
+from .metrics import metrics
+
+
+class RevocationIndex:
+    """
+    In-process set of blacklisted refresh token JTIs, each kept until the token
+    itself expires. Revocations are published to the shared cache under
+    TOKEN_REVOCATION_CACHE_ALIAS so other workers see them without touching the
+    token_blacklist tables. The shared cache can lose keys (eviction, flush,
+    restart), so a miss there is confirmed against the database, and the answer
+    kept for TOKEN_REVOCATION_NEGATIVE_TTL. Without a shared cache every local
+    miss goes to the database, as simplejwt does.
+    """
+
+    key_prefix = "revoked_jti"
+
+    def __init__(self):
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.not_revoked = LRUCache(settings.TOKEN_REVOCATION_NEGATIVE_CACHE_SIZE, settings.TOKEN_REVOCATION_NEGATIVE_TTL)
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.db_checks = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        alias = settings.TOKEN_REVOCATION_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def make_key(self, jti: str) -> str:
+        return f"{self.key_prefix}:{jti}"
+
+    def load(self):
+        """Seed the index with every unexpired blacklisted token in one streaming pass."""
+        rows = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=timezone.now())
+            .values_list("token__jti", "token__expires_at")
+            .iterator(chunk_size=2000)
+        )
+        for jti, expires_at in rows:
+            self._add(jti, expires_at.timestamp())
+        self._loaded = True
+
+    def revoke(self, jti: str, exp: float):
+        remaining = exp - time.time()
+        if remaining <= 0:
+            # An expired token is rejected by its exp claim already
+            return
+        self._add(jti, exp)
+        self.not_revoked.delete(jti)
+        if self.shared is not None:
+            self.shared.set(self.make_key(jti), exp, max(int(remaining), 1))
+
+    def is_revoked(self, jti: str) -> bool:
+        if not self._loaded:
+            self.load()
+        self._prune()
+
+        if jti in self._expiry:
+            self.local_hits += 1
+            return True
+
+        if self.shared is not None:
+            exp = self.shared.get(self.make_key(jti))
+            if exp is not None:
+                self.shared_hits += 1
+                self._add(jti, exp)
+                return True
+            if self.not_revoked.get(jti):
+                self.misses += 1
+                return False
+
+        self.db_checks += 1
+        expires_at = (
+            BlacklistedToken.objects
+            .filter(token__jti=jti)
+            .values_list("token__expires_at", flat=True)
+            .first()
+        )
+        if expires_at is not None:
+            self._add(jti, expires_at.timestamp())
+            return True
+        if self.shared is not None:
+            # Revocations by other workers still arrive through the shared cache meanwhile
+            self.not_revoked.set(jti, True)
+        return False
+
+    def reset(self):
+        with self._lock:
+            self._expiry.clear()
+            self._heap.clear()
+            self._loaded = False
+        self.not_revoked.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._expiry),
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "db_checks": self.db_checks,
+            "misses": self.misses,
+        }
+
+    def _add(self, jti: str, exp: float):
+        with self._lock:
+            if jti not in self._expiry:
+                heapq.heappush(self._heap, (exp, jti))
+            self._expiry[jti] = exp
+
+    def _prune(self):
+        now = time.time()
+        if not self._heap or self._heap[0][0] > now:
+            return
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, jti = heapq.heappop(self._heap)
+                self._expiry.pop(jti, None)
+
+
+revocation_index = RevocationIndex()
+metrics.gauge("token_revocation", revocation_index.stats)
@@ -0,0 +1,94 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs ``func`` every ``interval`` seconds in a daemon thread of the current
+    process, and right away on ``wake``. With ``interval`` None it only runs
+    when woken.
+    """
+
+    def __init__(self, interval: float, func: Callable[[], object], name: str):
+        self.interval = interval
+        self.func = func
+        self.name = name
+        self._thread = None
+        self._stopped = threading.Event()
+        self._woken = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._woken.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Runs ``func`` on the task's thread now, starting the thread if needed; never blocks."""
+        self.start()
+        self._woken.set()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        self._woken.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            self._woken.wait(self.interval)
+            self._woken.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
+
+
+class BackgroundJobs:
+    """
+    One-off jobs run on a small thread pool, off the request path. With
+    ``workers`` = 0 jobs run inline, which is what tests want.
+    """
+
+    def __init__(self, workers: int, name: str):
+        self.workers = workers
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=self.name)
+        self._executor.submit(self._run, func, *args)
+
+    @staticmethod
+    def _run(func: Callable, *args):
+        close_old_connections()
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Background job %s failed", getattr(func, "__name__", func))
+        finally:
+            close_old_connections()
@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models.user import User
+from .models.choice import UserRoleChoice, UserRankChoice
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -38,3 +40,80 @@ class UserMeSerializer(serializers.ModelSerializer):
         fields = (
             "uuid", "first_name", "last_name", "email", "phone", "country", "city", "photo", "appointment", "rank", "experience", "role"
         )
+
+
+class InviteSerializer(serializers.Serializer):
+    """One invitee of a bulk invite. Uniqueness is checked for the whole batch at once."""
+    email = serializers.EmailField(max_length=64)
+    first_name = serializers.CharField(max_length=32)
+    last_name = serializers.CharField(max_length=32)
+    country = serializers.CharField(max_length=32)
+    phone = serializers.CharField(max_length=13, required=False, allow_blank=True)
+    role = serializers.ChoiceField(
+        choices=[UserRoleChoice.STUDENT, UserRoleChoice.СURATOR],
+        default=UserRoleChoice.STUDENT,
+    )
+
+
+class BulkInviteSerializer(serializers.Serializer):
+    invitees = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.INVITE_MAX_BATCH,
+    )
+
+
+class UserExportSerializer(serializers.Serializer):
+    # Not "format", DRF reserves that query parameter for renderer selection
+    output = serializers.ChoiceField(choices=["csv", "jsonl"], default="csv")
+    gzip = serializers.BooleanField(default=False)
+    role = serializers.ChoiceField(choices=UserRoleChoice.choices, required=False)
+    verified = serializers.BooleanField(required=False, allow_null=True, default=None)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+
+class UserDirectorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = (
+            "uuid", "first_name", "last_name", "email", "country", "role", "rank", "experience", "created_at"
+        )
+        read_only_fields = fields
+
+
+class UserDirectoryFilterSerializer(serializers.Serializer):
+    role = serializers.ChoiceField(choices=UserRoleChoice.choices, required=False)
+    rank = serializers.ChoiceField(choices=UserRankChoice.choices, required=False)
+    country = serializers.CharField(max_length=32, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    country = serializers.CharField(max_length=32, required=False)
+    role = serializers.ChoiceField(choices=UserRoleChoice.choices, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    offset = serializers.IntegerField(min_value=0, default=0)
+
+    def validate(self, attrs):
+        if "country" in attrs and "role" in attrs:
+            raise serializers.ValidationError("Pick either a country or a role board")
+        return attrs
+
+    @property
+    def board(self) -> str:
+        if "country" in self.validated_data:
+            return f"country:{self.validated_data['country']}"
+        if "role" in self.validated_data:
+            return f"role:{self.validated_data['role']}"
+        return "global"
+
+
+class ExperienceAwardSerializer(serializers.Serializer):
+    user = serializers.UUIDField()
+    points = serializers.IntegerField(min_value=1, max_value=100000)
+
+
+class BulkExperienceAwardSerializer(serializers.Serializer):
+    awards = ExperienceAwardSerializer(many=True, allow_empty=False, max_length=1000)
@@ -1,36 +1,174 @@
-from django.core.mail import send_mail
+import hashlib
+import logging
+
+from django.core.mail import send_mail, send_mass_mail
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.encoding import force_bytes, force_str
-from django.contrib.auth.tokens import default_token_generator
+from django.core.signing import BadSignature, TimestampSigner
+from django.utils.crypto import constant_time_compare, salted_hmac
 from .models import User
 from django.urls import reverse
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from functools import wraps
 from django.core.mail import send_mail
 from django.conf import settings
+from django.utils.timezone import now
 from typing import Union
+from uuid import UUID
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from .importing import taken_contacts
+from .outbox import enqueue_email, enqueue_emails
+from .serializers import InviteSerializer
+from .activity import activity_buffer
+from .cache import RecentKeys
+from .metrics import metrics
+from .scheduler import BackgroundJobs
+from .notifications import device_fingerprint, login_notifier
+from .revocation import revocation_index
+from .tokens import RefreshToken
+
+
+logger = logging.getLogger(__name__)
 
+password_reset_requests = RecentKeys(
+    "password_reset", settings.PASSWORD_RESET_RESEND_WINDOW, "PASSWORD_RESET_CACHE_ALIAS"
+)
+mail_jobs = BackgroundJobs(settings.BACKGROUND_WORKERS, name="mail")
 
 def send_email_core(subject: str, message: str, recipient: Union[list, str]):
+    if settings.EMAIL_OUTBOX_ENABLED:
+        enqueue_email(subject, message, recipient, from_email=settings.EMAIL_HOST_USER)
+        return
+
     send_mail(
             subject=subject,
             message=message,
-            from_email="settings.EMAIL_HOST_USER",
+            from_email=settings.EMAIL_HOST_USER,
             recipient_list= recipient if isinstance(recipient, list) else [recipient],
             auth_password=settings.EMAIL_HOST_PASSWORD,
             fail_silently=False
         )
 
 
+def notify_login(user: User, request=None):
+    """Alert about a login, unless this device already triggered one within the coalescing window."""
+    fingerprint = device_fingerprint(request)
+    if not login_notifier.should_alert(user.pk, fingerprint):
+        agent = request.META.get("HTTP_USER_AGENT", "") if request is not None else ""
+        login_notifier.suppress(user, fingerprint, agent)
+        return
+
+    send_email_core(
+        subject="New login into accout",
+        message=(
+                f"Dear {user.first_name},\n"
+                f"New login detected at {now().strftime('%H:%M')} UTC"
+            ),
+        recipient=user.email
+    )
+
+
+def refresh_tokens(raw_refresh: str) -> tuple[AccessToken, Union[RefreshToken, None]]:
+    """
+    Issue a new access token (and a rotated refresh token when ROTATE_REFRESH_TOKENS
+    is on) without password hashing. Revocation is answered by the in-memory
+    revocation index, leaving a single primary key lookup of the user.
+    """
+    refresh = RefreshToken(raw_refresh)
+
+    user = User.objects.filter(
+        **{jwt_settings.USER_ID_FIELD: refresh.get(jwt_settings.USER_ID_CLAIM)}
+    ).first()
+    if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+        raise TokenError("No active account found for the given token")
+    activity_buffer.record_seen(user.pk)
+
+    if not jwt_settings.ROTATE_REFRESH_TOKENS:
+        return refresh.access_token, None
+
+    if jwt_settings.BLACKLIST_AFTER_ROTATION:
+        jti = refresh[jwt_settings.JTI_CLAIM]
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                "user": user,
+                "token": raw_refresh,
+                "created_at": refresh.current_time,
+                "expires_at": datetime_from_epoch(refresh["exp"]),
+            },
+        )
+        BlacklistedToken.objects.get_or_create(token=outstanding)
+        revocation_index.revoke(jti, refresh["exp"])
+
+    rotated = RefreshToken.for_user(user)
+    return rotated.access_token, rotated
+
+
+def request_password_reset(email):
+    """
+    Start a password reset for ``email``. Repeats of an address within
+    PASSWORD_RESET_RESEND_WINDOW return before touching the database; the lookup
+    and send of the first request run as a background job, so callers see the
+    same work whether or not the account exists.
+    """
+    if not isinstance(email, str) or not email.strip():
+        return
+    email = User.objects.normalize_email(email.strip())
+    digest = hashlib.sha256(email.lower().encode()).hexdigest()
+    if settings.PASSWORD_RESET_RESEND_WINDOW > 0 and not password_reset_requests.add(digest):
+        metrics.incr("password_reset.coalesced")
+        return
+
+    metrics.incr("password_reset.requested")
+    mail_jobs.submit(send_password_reset, email)
+
+
+def send_password_reset(email: str):
+    # Case-insensitive like the coalescing key, an exact match wins over others differing in case
+    users = list(User.objects.filter(email__iexact=email))
+    user = next((user for user in users if user.email == email), users[0] if len(users) == 1 else None)
+    if user is None:
+        metrics.incr("password_reset.unknown")
+        return
+    try:
+        PasswordReset(user).send_email(user.email)
+    except Exception:
+        logger.exception("Could not send password reset email")
+        return
+    metrics.incr("password_reset.sent")
+
+
 class TokenManager:
+    """
+    Links carry ``<token>/<uid64>`` where the token is a TimestampSigner signature
+    over the uid and a hash of the user's state. Signature and age are checked
+    without the database; the state hash is compared after the user is loaded,
+    so a link dies once the password or verification status changes.
+    """
+    salt = "core.services.TokenManager"
+
     def __init__(self, user: User):
         self.user = user
 
+    @classmethod
+    def signer(cls) -> TimestampSigner:
+        return TimestampSigner(salt=cls.salt, sep=".")
+
+    @classmethod
+    def user_state(cls, user: User) -> str:
+        value = f"{user.pk}{user.password}{user.email}{user.is_email_verified}"
+        return salted_hmac(cls.salt, value, algorithm="sha256").hexdigest()[::2]
+
     def create_token(self) -> tuple:
-        token = default_token_generator.make_token(self.user)
         uid64 = urlsafe_base64_encode(force_bytes(self.user.uuid))
+        signed = self.signer().sign(f"{uid64}.{self.user_state(self.user)}")
+        token = signed[len(uid64) + 1:]
         return token, uid64
 
     def send_email(self, user_email: str) -> str:
@@ -51,12 +189,21 @@ def base64_decoder(func):
         @wraps(func)
         def wrapper(cls, token, uid64, *args, **kwargs):
             try:
-                uid = force_str(urlsafe_base64_decode(uid64))
-                user: User = User.objects.get(uuid=uid)
-            except User.DoesNotExist:
+                value = cls.signer().unsign(f"{uid64}.{token}", max_age=settings.PASSWORD_RESET_TIMEOUT)
+            except BadSignature:
+                return {'detail': 'Invalid Token or expired', 'status': 400}
+
+            uid64, state = value.split(".")
+            try:
+                uid = UUID(force_str(urlsafe_base64_decode(uid64)))
+            except (ValueError, TypeError):
                 return {'detail': 'Invalid link', 'status': 400}
 
-            if not default_token_generator.check_token(user, token):
+            user = User.objects.filter(uuid=uid).first()
+            if user is None:
+                return {'detail': 'Invalid link', 'status': 400}
+
+            if not constant_time_compare(state, cls.user_state(user)):
                 return {'detail': 'Invalid Token or expired', 'status': 400}
 
             return func(cls, user, *args, **kwargs)
@@ -65,6 +212,8 @@ def base64_decoder(func):
 
 
 class PasswordReset(TokenManager):
+    salt = "core.services.PasswordReset"
+
     def get_link(self, token, uid64):
         link = reverse(
             'password_reset_confirm',
@@ -91,6 +240,8 @@ class PasswordReset(TokenManager):
 
 
 class MailConfirmation(TokenManager):
+    salt = "core.services.MailConfirmation"
+
     def get_link(self, token, uid64):
         link = reverse(
             'email_confirmation',
@@ -107,7 +258,107 @@ class MailConfirmation(TokenManager):
         user.save(update_fields=["is_active", "is_email_verified"])
 
         return {'detail': 'Email confirmed', 'status': 200}
-        
 
 
+class Invitation(TokenManager):
+    salt = "core.services.Invitation"
 
+    def get_link(self, token, uid64):
+        link = reverse(
+            'invitation_accept',
+            kwargs={'uid64': uid64, 'token': token}
+        )
+
+        return f"{settings.DOMAIN}{link}"
+
+    def build_email(self, invited_by: User) -> tuple:
+        return (
+            "AIvora invitation",
+            (
+                f"Dear {self.user.first_name},\n"
+                f"{invited_by.first_name} {invited_by.last_name} invited you to AIvora. "
+                f"To join please set your password at {self.get_link(*self.create_token())}"
+            ),
+            self.user.email,
+        )
+
+    @classmethod
+    @base64_decoder
+    def accept(cls, user: User, password) -> dict:
+        if not password:
+            return {'detail': 'Password is required', 'status': 400}
+
+        try:
+            validate_password(password, user)
+        except ValidationError as e:
+            return {
+                "detail": "Password validation failed",
+                "errors": e.messages
+            }
+
+        user.set_password(password)
+        user.is_active = True
+        user.is_email_verified = True
+        user.save(update_fields=["password", "is_active", "is_email_verified", "updated_at"])
+
+        return {'detail': 'Invitation accepted', 'status': 200}
+
+
+def invite_users(invitees: list, invited_by: User) -> list:
+    """
+    Create inactive users with unusable passwords for every valid, unused
+    invitee and queue their invitation emails in the outbox, all in one
+    transaction. Without the outbox the emails go out in a background job
+    once the users are committed. Returns one result per invitee, in input order.
+    """
+    results, rows = [], []
+    for index, data in enumerate(invitees):
+        serializer = InviteSerializer(data=data)
+        if serializer.is_valid():
+            row = {key: value for key, value in serializer.validated_data.items() if value != ""}
+            row["email"] = User.objects.normalize_email(row["email"])
+            results.append({"index": index, "email": row["email"], "status": "invited"})
+            rows.append((results[-1], row))
+        else:
+            results.append({"index": index, "email": data.get("email"), "status": "invalid",
+                            "errors": serializer.errors})
+
+    taken_emails, taken_phones = taken_contacts(
+        {row["email"] for _, row in rows},
+        {row["phone"] for _, row in rows if row.get("phone")},
+    )
+    users = []
+    for result, row in rows:
+        if row["email"] in taken_emails or row.get("phone") in taken_phones:
+            result["status"] = "duplicate"
+            continue
+        taken_emails.add(row["email"])
+        if row.get("phone"):
+            taken_phones.add(row["phone"])
+
+        user = User(**row, is_active=False, is_email_verified=False)
+        user.set_unusable_password()
+        users.append(user)
+
+    if users:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            messages = [Invitation(user).build_email(invited_by) for user in users]
+            if settings.EMAIL_OUTBOX_ENABLED:
+                enqueue_emails(messages, from_email=settings.EMAIL_HOST_USER)
+            else:
+                transaction.on_commit(lambda: mail_jobs.submit(send_invitations, messages))
+
+    return results
+
+
+def send_invitations(messages: list):
+    """Send (subject, message, recipient) invitations over one SMTP connection."""
+    try:
+        send_mass_mail(
+            [(subject, message, settings.EMAIL_HOST_USER, [recipient]) for subject, message, recipient in messages],
+            auth_password=settings.EMAIL_HOST_PASSWORD,
+            fail_silently=False,
+        )
+    except Exception:
+        logger.exception("Could not send %s invitation emails", len(messages))
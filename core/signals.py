@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .account_cache import account_cache
+from .authentication import user_cache
+from .leaderboard import leaderboard
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid="core.invalidate_user_cache_on_save")
+@receiver(post_delete, sender=User, dispatch_uid="core.invalidate_user_cache_on_delete")
+def invalidate_user_cache(sender, instance: User, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User, dispatch_uid="core.invalidate_account_cache_on_save")
+@receiver(post_delete, sender=User, dispatch_uid="core.invalidate_account_cache_on_delete")
+def invalidate_account_cache(sender, instance: User, **kwargs):
+    account_cache.delete(instance.pk)
+
+
+@receiver(post_save, sender=User, dispatch_uid="core.update_leaderboard_on_save")
+def update_leaderboard(sender, instance: User, **kwargs):
+    leaderboard.update(instance.uuid, instance.experience, instance.country, instance.role, instance.is_active)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="core.remove_from_leaderboard_on_delete")
+def remove_from_leaderboard(sender, instance: User, **kwargs):
+    leaderboard.remove(instance.uuid)
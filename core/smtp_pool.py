@@ -0,0 +1,213 @@
+import os
+import smtplib
+import ssl
+import threading
+import time
+
+from .metrics import metrics
+from .scheduler import PeriodicTask
+
+
+class ResumableSMTP(smtplib.SMTP):
+    """SMTP client that offers a previous TLS session to the server on STARTTLS."""
+
+    def __init__(self, *args, session=None, **kwargs):
+        self.tls_session = session
+        self.pool_messages = 0
+        self.pool_last_used = time.monotonic()
+        super().__init__(*args, **kwargs)
+
+    def starttls(self, *, context=None):
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn("starttls"):
+            raise smtplib.SMTPNotSupportedError("STARTTLS extension not supported by server.")
+        resp, reply = self.docmd("STARTTLS")
+        if resp != 220:
+            raise smtplib.SMTPResponseException(resp, reply)
+
+        self.sock = context.wrap_socket(self.sock, server_hostname=self._host, session=self.tls_session)
+        self.tls_session = self.sock.session
+        # RFC 3207: forget everything learned from the server before TLS
+        self.file = None
+        self.helo_resp = None
+        self.ehlo_resp = None
+        self.esmtp_features = {}
+        self.does_esmtp = False
+        return resp, reply
+
+
+class ResumableSMTP_SSL(smtplib.SMTP_SSL):
+    def __init__(self, *args, session=None, **kwargs):
+        self.tls_session = session
+        self.pool_messages = 0
+        self.pool_last_used = time.monotonic()
+        super().__init__(*args, **kwargs)
+
+    def _get_socket(self, host, port, timeout):
+        new_socket = smtplib.SMTP._get_socket(self, host, port, timeout)
+        new_socket = self.context.wrap_socket(new_socket, server_hostname=self._host, session=self.tls_session)
+        self.tls_session = new_socket.session
+        return new_socket
+
+
+class PoolTimeout(smtplib.SMTPException):
+    pass
+
+
+class SMTPConnectionPool:
+    """
+    Per-process pool of authenticated SMTP connections. ``connect`` receives the
+    last TLS session seen by the pool and returns a ready-to-use connection.
+    """
+
+    def __init__(self, connect, max_size: int, max_messages: int, keepalive: float, max_idle: float,
+                 timeout: float = 10.0):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.keepalive = keepalive
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.tls_session = None
+
+        self._idle = []
+        self._size = 0
+        self._condition = threading.Condition()
+        self._keepalive_task = PeriodicTask(keepalive, self.ping_idle, name="smtp-pool-keepalive")
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout("Timed out waiting for a pooled SMTP connection")
+                    self._condition.wait(remaining)
+
+                if self._idle:
+                    connection = self._idle.pop()
+                else:
+                    connection = None
+                    self._size += 1
+
+            if connection is None:
+                return self._open()
+
+            if time.monotonic() - connection.pool_last_used < self.keepalive or self._is_healthy(connection):
+                metrics.incr("smtp_pool.reused")
+                return connection
+
+            self._drop(connection)
+
+    def release(self, connection, broken: bool = False):
+        connection.pool_last_used = time.monotonic()
+        if connection.tls_session is not None:
+            self.tls_session = connection.tls_session
+
+        if broken or connection.pool_messages >= self.max_messages:
+            self._drop(connection)
+            return
+
+        with self._condition:
+            self._idle.append(connection)
+            self._condition.notify()
+        self._keepalive_task.start()
+
+    def discard(self, connection):
+        self._drop(connection)
+
+    def ping_idle(self):
+        """Keep idle connections warm with NOOP and close the ones idle for too long."""
+        now = time.monotonic()
+        with self._condition:
+            stale = [conn for conn in self._idle if now - conn.pool_last_used >= self.keepalive]
+            self._idle = [conn for conn in self._idle if conn not in stale]
+
+        for connection in stale:
+            if now - connection.pool_last_used >= self.max_idle or not self._is_healthy(connection):
+                self._drop(connection)
+                continue
+            connection.pool_last_used = time.monotonic()
+            with self._condition:
+                self._idle.append(connection)
+                self._condition.notify()
+
+    def close_all(self):
+        with self._condition:
+            connections, self._idle = self._idle, []
+        for connection in connections:
+            self._drop(connection)
+        self._keepalive_task.stop()
+
+    def _open(self):
+        try:
+            connection = self.connect(self.tls_session)
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        metrics.incr("smtp_pool.opened")
+        return connection
+
+    def _drop(self, connection):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, ssl.SSLError, OSError):
+            connection.close()
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        metrics.incr("smtp_pool.closed")
+
+    @staticmethod
+    def _is_healthy(connection) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(key: tuple, factory) -> SMTPConnectionPool:
+    """Return the pool for ``key``, dropping pools inherited from a parent process."""
+    global _pools, _pools_pid
+
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools, _pools_pid = {}, os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+        return pool
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+def pool_stats() -> dict:
+    return {
+        f"{key[0]}:{key[1]}": {"size": pool.size, "idle": pool.idle}
+        for key, pool in list(_pools.items())
+    }
+
+
+metrics.gauge("smtp_pool", pool_stats)
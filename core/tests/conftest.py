@@ -4,6 +4,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 import django
+import pytest
 
 # Project root must be on path so "aivora" can be imported
 _project_root = Path(__file__).resolve().parent.parent.parent
@@ -16,3 +17,78 @@ load_dotenv()
 def pytest_configure():
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aivora.settings_test")
     django.setup()
+
+
+@pytest.fixture
+def user_fields():
+    """Overrides for ``active_user``, redefine in a module or parametrize to change them."""
+    return {}
+
+
+@pytest.fixture
+def active_user(user_fields):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(**{
+        "first_name": "Test",
+        "last_name": "User",
+        "email": "user@example.com",
+        "password": "testpassword",
+        "country": "UA",
+        "is_active": True,
+        "is_email_verified": True,
+        **user_fields,
+    })
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    """Every test starts with full auth rate limit buckets."""
+    from core.throttling import local_buckets
+
+    local_buckets.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_leaderboard():
+    """The in-memory leaderboard is reloaded from each test's database."""
+    from core.leaderboard import leaderboard
+
+    leaderboard.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_activity():
+    """Activity recorded by one test is never flushed into another test's database."""
+    from core.activity import activity_buffer
+
+    yield
+    activity_buffer.pending.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_login_notifier():
+    from core.notifications import login_notifier
+
+    login_notifier.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_password_reset_requests():
+    from core.services import password_reset_requests
+
+    password_reset_requests.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_idempotency():
+    from core.idempotency import idempotency_store
+
+    idempotency_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_account_cache():
+    from core.account_cache import account_cache
+
+    account_cache.clear()
@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.metrics import metrics
+from core.notifications import login_notifier
+
+
+def login(user, agent='MobileApp/1.0', address='10.0.0.1'):
+    response = APIClient().post(
+        '/api/v1/auth/login/',
+        {'email': user.email, 'password': 'testpassword'},
+        format='json',
+        HTTP_USER_AGENT=agent,
+        REMOTE_ADDR=address,
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestLoginNotifications:
+
+    def test_repeat_logins_from_device_are_coalesced(self, active_user, mailoutbox):
+        for _ in range(4):
+            login(active_user)
+
+        assert len(mailoutbox) == 1
+        assert mailoutbox[0].subject == 'New login into accout'
+
+        login_notifier.digests.flush()
+
+        assert len(mailoutbox) == 2
+        assert mailoutbox[1].subject == 'Recent logins into your account'
+        assert '3 from MobileApp/1.0' in mailoutbox[1].body
+
+    def test_new_device_alerts_immediately(self, active_user, mailoutbox):
+        login(active_user)
+        login(active_user, agent='Firefox')
+        login(active_user, address='10.0.0.2')
+
+        assert len(mailoutbox) == 3
+
+    def test_window_expiry(self, active_user, mailoutbox):
+        login(active_user)
+        login_notifier.recent.clear()  # the window has passed
+        login(active_user)
+
+        assert len(mailoutbox) == 2
+
+    def test_shared_index(self, settings, active_user, mailoutbox):
+        settings.LOGIN_NOTIFY_CACHE_ALIAS = 'default'
+        login(active_user)
+        login_notifier.recent.clear()  # another worker
+        login(active_user)
+
+        assert len(mailoutbox) == 1
+
+    def test_suppression_needs_no_query(self, active_user):
+        login_notifier.should_alert(active_user.pk, 'device')
+        metrics.reset()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert not login_notifier.should_alert(active_user.pk, 'device')
+            login_notifier.suppress(active_user, 'device', 'agent')
+
+        assert len(queries) == 0
+        assert metrics.snapshot(gauges=False)['counters']['login_notify.suppressed'] == 1
+
+    def test_full_digest_buffer_drops_new_users(self, active_user, mailoutbox, monkeypatch):
+        """Logins never send digests themselves; users beyond the buffer size get none."""
+        monkeypatch.setattr(login_notifier.digests, 'max_users', 1)
+        other = get_user_model().objects.create_user(
+            first_name='Other', last_name='User', email='other@example.com', password='testpassword', country='UA',
+            is_active=True, is_email_verified=True,
+        )
+        metrics.reset()
+
+        for user in (active_user, other):
+            login(user)
+            login(user)
+
+        assert len(mailoutbox) == 2
+        assert list(login_notifier.digests.pending) == [active_user.pk]
+        assert metrics.snapshot(gauges=False)['counters']['login_digest.dropped'] == 1
+
+        login_notifier.digests.flush()
+        assert [message.to for message in mailoutbox[2:]] == [[active_user.email]]
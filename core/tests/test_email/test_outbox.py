@@ -0,0 +1,64 @@
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from core.models import EmailOutbox
+from core.models.choice import EmailStatusChoice
+from core.outbox import OutboxWorker, outbox_stats
+from core.services import send_email_core
+
+
+@pytest.fixture
+def outbox_settings(settings):
+    settings.EMAIL_OUTBOX_ENABLED = True
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    settings.EMAIL_OUTBOX_BACKOFF_BASE = 30
+    return settings
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_send_email_core_enqueues(self, outbox_settings):
+        """In outbox mode nothing is sent inside the request, a pending row is stored."""
+        send_email_core("Subject", "Body", "user@example.com")
+
+        assert len(mail.outbox) == 0
+        entry = EmailOutbox.objects.get()
+        assert entry.status == EmailStatusChoice.PENDING
+        assert entry.recipients == ["user@example.com"]
+
+    def test_worker_delivers_batch(self, outbox_settings):
+        """Worker drains pending entries and records delivery status."""
+        for index in range(3):
+            send_email_core("Subject", "Body", f"user{index}@example.com")
+
+        result = OutboxWorker(batch_size=10).run_once()
+
+        assert result == {"sent": 3, "retried": 0, "failed": 0}
+        assert len(mail.outbox) == 3
+        assert EmailOutbox.objects.filter(status=EmailStatusChoice.SENT, sent_at__isnull=False).count() == 3
+        assert outbox_stats()["depth"][EmailStatusChoice.SENT] == 3
+
+    def test_failed_delivery_backs_off_then_gives_up(self, outbox_settings, monkeypatch):
+        """Failures are retried after a backoff and marked failed after the last attempt."""
+        def broken_send(self, fail_silently=False):
+            raise ConnectionError("relay is down")
+
+        monkeypatch.setattr(EmailMessage, "send", broken_send)
+        send_email_core("Subject", "Body", "user@example.com")
+        worker = OutboxWorker(batch_size=10)
+
+        assert worker.run_once() == {"sent": 0, "retried": 1, "failed": 0}
+        entry = EmailOutbox.objects.get()
+        assert entry.status == EmailStatusChoice.PENDING
+        assert entry.available_at > timezone.now()
+        assert "relay is down" in entry.last_error
+
+        # Not due yet, so the next pass leaves it alone
+        assert worker.run_once() == {"sent": 0, "retried": 0, "failed": 0}
+
+        EmailOutbox.objects.update(available_at=timezone.now())
+        assert worker.run_once() == {"sent": 0, "retried": 0, "failed": 1}
+        assert EmailOutbox.objects.get().status == EmailStatusChoice.FAILED
@@ -0,0 +1,69 @@
+import socket
+
+import pytest
+from django.core.mail import EmailMessage
+
+from core.tests.smtp_server import StubSMTPServer
+from core.email_backend import EmailBackend
+from core.smtp_pool import close_pools
+
+
+@pytest.fixture
+def smtp_server():
+    with StubSMTPServer() as server:
+        yield server
+    close_pools()
+
+
+def send(server, index=0):
+    backend = EmailBackend(host="127.0.0.1", port=server.port, username="", password="",
+                           use_tls=False, use_ssl=False, use_pool=True)
+    EmailMessage("Subject", f"Body {index}", "from@example.com", ["to@example.com"], connection=backend).send()
+    return backend
+
+
+class TestSMTPConnectionPool:
+
+    def test_connection_is_reused(self, smtp_server):
+        """Sequential send_mail calls share one authenticated connection."""
+        for index in range(5):
+            send(smtp_server, index)
+
+        assert smtp_server.messages == 5
+        assert smtp_server.connections == 1
+
+    def test_max_messages_per_connection(self, smtp_server, settings):
+        """A connection is retired once it has carried EMAIL_POOL_MAX_MESSAGES messages."""
+        settings.EMAIL_POOL_MAX_MESSAGES = 2
+        for index in range(5):
+            send(smtp_server, index)
+
+        assert smtp_server.messages == 5
+        assert smtp_server.connections == 3
+
+    def test_reconnect_after_dropped_connection(self, smtp_server):
+        """A pooled connection that died while idle is replaced transparently."""
+        backend = send(smtp_server)
+        pool = backend.pool
+        connection = pool.acquire()
+        connection.sock.shutdown(socket.SHUT_RDWR)
+        pool.release(connection)
+
+        send(smtp_server, 1)
+
+        assert smtp_server.messages == 2
+        assert smtp_server.connections == 2
+        assert pool.size == 1
+
+    def test_keepalive_closes_long_idle_connections(self, smtp_server):
+        """Idle connections are pinged with NOOP and closed after EMAIL_POOL_MAX_IDLE."""
+        pool = send(smtp_server).pool
+        pool.keepalive = 0
+        pool.ping_idle()
+        assert pool.idle == 1
+
+        pool.max_idle = 0
+        pool.ping_idle()
+
+        assert pool.idle == 0
+        assert pool.size == 0
@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.metrics import metrics
+
+User = get_user_model()
+
+ME_URL = '/api/v1/account/me/'
+
+
+def client_for(user):
+    client = APIClient()
+    # A fresh instance, as the authentication layer would load it
+    client.force_authenticate(User.objects.get(pk=user.pk))
+    return client
+
+
+def serialized():
+    return metrics.snapshot(gauges=False)['counters'].get('account_me.serialized', 0)
+
+
+@pytest.mark.django_db
+class TestAccountMeCache:
+    def test_unchanged_payload_is_not_modified(self, active_user):
+        metrics.reset()
+        client = client_for(active_user)
+        first = client.get(ME_URL)
+        assert first.status_code == status.HTTP_200_OK
+        assert first['ETag'].startswith('"')
+        assert 'private' in first['Cache-Control']
+
+        again = client.get(ME_URL, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again.content == b''
+        assert again['ETag'] == first['ETag']
+        assert client.get(ME_URL).data == first.data
+        assert serialized() == 1
+
+    def test_patch_changes_etag(self, active_user):
+        client = client_for(active_user)
+        etag = client.get(ME_URL)['ETag']
+
+        patched = client.patch(ME_URL, {'city': 'Lviv'}, format='json')
+        assert patched['ETag'] != etag
+
+        response = client_for(active_user).get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['city'] == 'Lviv'
+        assert response['ETag'] == patched['ETag']
+
+    def test_user_save_invalidates(self, active_user):
+        etag = client_for(active_user).get(ME_URL)['ETag']
+        active_user.first_name = 'Renamed'
+        active_user.save()
+
+        response = client_for(active_user).get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['first_name'] == 'Renamed'
+
+    def test_bulk_update_is_caught_by_version(self, active_user):
+        etag = client_for(active_user).get(ME_URL)['ETag']
+        User.objects.filter(pk=active_user.pk).update(experience=1500, updated_at=timezone.now())
+
+        response = client_for(active_user).get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['experience'] == 1500
+
+    def test_payload_is_per_user(self, active_user):
+        other = User.objects.create_user(
+            first_name='Other', last_name='User', email='other@example.com', password='otherpassword',
+            country='PL', is_active=True, is_email_verified=True,
+        )
+        etag = client_for(active_user).get(ME_URL)['ETag']
+
+        response = client_for(other).get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['email'] == 'other@example.com'
@@ -0,0 +1,108 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.activity import ActivityBuffer, activity_buffer
+from core.scheduler import PeriodicTask
+
+User = get_user_model()
+
+
+@pytest.fixture
+def users():
+    return User.objects.bulk_create([
+        User(first_name='User', last_name=str(index), email=f'user{index}@example.com', country='UA')
+        for index in range(3)
+    ])
+
+
+@pytest.mark.django_db
+class TestActivityBuffer:
+
+    def test_flush_is_one_update(self, users):
+        buffer = ActivityBuffer(interval=0, max_users=100)
+        for _ in range(5):
+            buffer.record_seen(users[0].pk)
+        buffer.record_login(users[1].pk)
+        buffer.record_seen(users[2].pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert buffer.flush() == 3
+
+        assert len(queries) == 1 and queries[0]['sql'].startswith('UPDATE')
+        rows = {row['last_name']: row for row in User.objects.values('last_name', 'last_logined', 'last_seen')}
+        assert rows['0']['last_seen'] and rows['0']['last_logined'] is None
+        assert rows['1']['last_logined'] == rows['1']['last_seen']
+
+    def test_merge_keeps_latest(self):
+        buffer = ActivityBuffer(interval=0, max_users=100)
+        earlier, later = timezone.now() - timedelta(minutes=1), timezone.now()
+
+        assert buffer.merge((earlier, later), (None, earlier)) == (earlier, later)
+        assert buffer.merge((None, earlier), (later, later)) == (later, later)
+
+    def test_flush_keeps_untouched_columns(self, users):
+        seen = timezone.now() - timedelta(days=1)
+        User.objects.filter(pk=users[0].pk).update(last_logined=seen)
+        buffer = ActivityBuffer(interval=0, max_users=100)
+        buffer.record_seen(users[0].pk)
+
+        buffer.flush()
+
+        assert User.objects.get(pk=users[0].pk).last_logined == seen
+
+    def test_login_records_without_writing(self, active_user):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/v1/auth/login/', {'email': active_user.email, 'password': 'testpassword'},
+                                   format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not [query for query in queries if 'UPDATE "core_user"' in query['sql']]
+        assert active_user.pk in activity_buffer.pending
+
+        activity_buffer.flush()
+        active_user.refresh_from_db()
+        assert active_user.last_logined is not None
+
+    def test_full_buffer_is_flushed_off_the_event_loop(self, active_user, monkeypatch):
+        """Filling the buffer from the async login only wakes the flusher thread."""
+        flushed = threading.Event()
+        flusher = PeriodicTask(None, flushed.set, name='activity')
+        monkeypatch.setattr(activity_buffer, 'flusher', flusher)
+        monkeypatch.setattr(activity_buffer, 'max_users', 1)
+
+        try:
+            response = Client().post('/api/v1/auth/async/login/',
+                                     {'email': active_user.email, 'password': 'testpassword'},
+                                     content_type='application/json')
+            assert response.status_code == status.HTTP_200_OK
+            assert flushed.wait(5)
+        finally:
+            flusher.stop(timeout=5)
+
+        assert active_user.pk in activity_buffer.pending
+
+    def test_authenticated_request_marks_seen(self, active_user):
+        client = APIClient()
+        access = client.post('/api/v1/auth/login/', {'email': active_user.email, 'password': 'testpassword'},
+                             format='json').data['access']
+        activity_buffer.flush()
+        active_user.refresh_from_db()
+        logged_in = active_user.last_seen
+
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        assert client.get('/api/v1/account/me/').status_code == status.HTTP_200_OK
+        activity_buffer.flush()
+
+        active_user.refresh_from_db()
+        assert active_user.last_seen > logged_in
+        assert active_user.last_logined == logged_in
@@ -0,0 +1,70 @@
+import pytest
+from asgiref.sync import SyncToAsync, async_to_sync, iscoroutinefunction
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, Client
+from rest_framework.test import APIClient
+
+from core.db_router import ReplicaPinningMiddleware
+from core.middleware import SiteMiddleware
+
+
+@pytest.mark.django_db
+class TestSiteMiddleware:
+    def test_api_skips_site_middleware(self, active_user):
+        client = APIClient()
+        client.force_authenticate(active_user)
+        response = client.get('/api/v1/account/me/')
+
+        assert response.status_code == 200
+        assert 'X-Frame-Options' not in response
+        assert not hasattr(response.wsgi_request, 'session')
+        assert response.wsgi_request.urlconf == 'aivora.api_urls'
+
+    def test_api_post_needs_no_csrf_token(self, active_user):
+        client = APIClient(enforce_csrf_checks=True)
+        response = client.post('/api/v1/auth/login/', {'email': active_user.email, 'password': 'testpassword'},
+                               format='json')
+
+        assert response.status_code == 200
+
+    def test_admin_keeps_full_stack(self):
+        response = Client().get('/admin/login/')
+
+        assert response.status_code == 200
+        assert response['X-Frame-Options'] == 'DENY'
+        assert 'csrftoken' in response.cookies
+        assert hasattr(response.wsgi_request, 'session')
+
+    def test_admin_still_checks_csrf(self, active_user):
+        response = Client(enforce_csrf_checks=True).post(
+            '/admin/login/', {'username': active_user.email, 'password': 'testpassword'}
+        )
+
+        assert response.status_code == 403
+
+    def test_async_stack_stays_async(self):
+        handler = ASGIHandler()
+        # Sync-only middleware and their hooks would be wrapped in sync_to_async, a thread hop each
+        hooks = [*handler._view_middleware, *handler._template_response_middleware]
+        assert not any(isinstance(hook, SyncToAsync) for hook in hooks)
+        assert not isinstance(handler._middleware_chain, SyncToAsync)
+
+        async def get_response(request):
+            return None
+
+        for middleware in (SiteMiddleware, ReplicaPinningMiddleware):
+            assert iscoroutinefunction(middleware(get_response))
+            assert not iscoroutinefunction(middleware(lambda request: None))
+
+    def test_async_requests(self, active_user):
+        client = AsyncClient()
+        login = async_to_sync(client.post)(
+            '/api/v1/auth/async/login/', {'email': active_user.email, 'password': 'testpassword'},
+            content_type='application/json',
+        )
+        admin = async_to_sync(client.get)('/admin/login/')
+
+        assert login.status_code == 200
+        assert not hasattr(login.asgi_request, 'session')
+        assert admin.status_code == 200
+        assert admin['X-Frame-Options'] == 'DENY'
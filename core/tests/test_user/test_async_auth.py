@@ -0,0 +1,64 @@
+import pytest
+from django.test import Client
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.hash_pool import hash_pool
+
+
+@pytest.fixture
+def client():
+    return Client(enforce_csrf_checks=True)
+
+
+@pytest.mark.django_db
+class TestAsyncAuthentication:
+
+    def test_async_login(self, client, active_user):
+        """Async login hashes on the pool and sets the same cookies as LoginView."""
+        response = client.post(
+            '/api/v1/auth/async/login/',
+            {'email': active_user.email, 'password': 'testpassword'},
+            content_type='application/json',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert 'access' in response.json()
+        assert response.cookies['refresh_token']['httponly']
+
+    def test_async_login_wrong_password(self, client, active_user):
+        response = client.post(
+            '/api/v1/auth/async/login/',
+            {'email': active_user.email, 'password': 'wrong'},
+            content_type='application/json',
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_async_login_unknown_email(self, client):
+        response = client.post(
+            '/api/v1/auth/async/login/',
+            {'email': 'nobody@example.com', 'password': 'wrong'},
+            content_type='application/json',
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_async_change_password(self, client, active_user):
+        response = client.post(
+            '/api/v1/auth/async/password/change/',
+            {'old_password': 'testpassword', 'new_password': 'newpass123'},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(active_user)}',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        active_user.refresh_from_db()
+        assert active_user.check_password('newpass123')
+
+    def test_saturated_pool_returns_503(self, client, active_user, monkeypatch):
+        """When the hashing queue is full the request is shed with 503 and Retry-After."""
+        monkeypatch.setattr(hash_pool, 'max_pending', 0)
+        response = client.post(
+            '/api/v1/auth/async/login/',
+            {'email': active_user.email, 'password': 'testpassword'},
+            content_type='application/json',
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
@@ -0,0 +1,122 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import EmailOutbox
+from core.services import Invitation
+
+User = get_user_model()
+
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(
+        first_name='Mary',
+        last_name='Manager',
+        email='manager@example.com',
+        password='testpassword',
+        country='UA',
+        role='manager',
+        is_active=True,
+        is_email_verified=True,
+    )
+
+
+@pytest.fixture(autouse=True)
+def outbox(settings):
+    settings.EMAIL_OUTBOX_ENABLED = True
+
+
+@pytest.fixture
+def client(manager):
+    client = APIClient()
+    client.force_authenticate(manager)
+    return client
+
+
+def invitee(index, **fields):
+    return {'email': f'student{index}@example.com', 'first_name': 'Student', 'last_name': str(index),
+            'country': 'UA', **fields}
+
+
+def invite(client, invitees):
+    return client.post('/api/v1/org/invites/', {'invitees': invitees}, format='json')
+
+
+@pytest.mark.django_db
+class TestBulkInvite:
+
+    def test_invite_report(self, client, manager):
+        response = invite(client, [
+            invitee(0),
+            invitee(1, role='curator', phone='+380000000001'),
+            invitee(2, email='manager@example.com'),
+            invitee(3, email='student0@example.com'),
+            invitee(4, phone='+380000000001'),
+            invitee(5, email='not-an-email'),
+            invitee(6, role='owner'),
+        ])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['invited'] == 2
+        assert [result['status'] for result in response.data['results']] == [
+            'invited', 'invited', 'duplicate', 'duplicate', 'duplicate', 'invalid', 'invalid',
+        ]
+        assert 'email' in response.data['results'][5]['errors']
+
+        student = User.objects.get(email='student1@example.com')
+        assert student.role == 'curator'
+        assert not student.is_active and not student.has_usable_password()
+
+        emails = EmailOutbox.objects.order_by('recipients')
+        assert [email.recipients for email in emails] == [['student0@example.com'], ['student1@example.com']]
+        assert 'Mary Manager invited you' in emails[0].message
+
+    def test_sent_after_commit_without_outbox(self, settings, client, mailoutbox,
+                                              django_capture_on_commit_callbacks):
+        settings.EMAIL_OUTBOX_ENABLED = False
+        with django_capture_on_commit_callbacks(execute=True):
+            response = invite(client, [invitee(0), invitee(1)])
+            assert mailoutbox == []
+
+        assert response.data['invited'] == 2
+        assert sorted(email.to[0] for email in mailoutbox) == ['student0@example.com', 'student1@example.com']
+        assert not EmailOutbox.objects.exists()
+
+    def test_round_trips_do_not_grow_with_batch(self, client):
+        def queries_for(invitees):
+            with CaptureQueriesContext(connection) as queries:
+                assert invite(client, invitees).status_code == status.HTTP_201_CREATED
+            return len(queries)
+
+        assert queries_for([invitee(index) for index in range(2)]) == \
+            queries_for([invitee(index) for index in range(100, 140)])
+
+    def test_students_cannot_invite(self, manager):
+        manager.role = 'student'
+        manager.save()
+        client = APIClient()
+        client.force_authenticate(manager)
+
+        assert invite(client, [invitee(0)]).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_empty_batch_rejected(self, client):
+        assert invite(client, []).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_accept_invitation(self, client):
+        invite(client, [invitee(0)])
+        student = User.objects.get(email='student0@example.com')
+        token, uid64 = Invitation(student).create_token()
+        url = f'/api/v1/auth/invite/accept/{token}/{uid64}/'
+
+        response = APIClient().post(url, {'password': 'strong-pass-123'}, format='json')
+        assert response.data['detail'] == 'Invitation accepted'
+
+        student.refresh_from_db()
+        assert student.is_active and student.is_email_verified
+        assert student.check_password('strong-pass-123')
+        assert APIClient().post(url, {'password': 'other-pass-456'}, format='json').data['detail'] == \
+            'Invalid Token or expired'
@@ -0,0 +1,47 @@
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from core.db_pool import connection_stats, pool_summary
+from core.metrics import metrics
+
+
+class FakePool:
+    def get_stats(self):
+        return {
+            "pool_min": 2, "pool_max": 10, "pool_size": 6, "pool_available": 1,
+            "requests_waiting": 3, "requests_num": 200, "requests_wait_ms": 500, "requests_errors": 1,
+        }
+
+
+def test_pool_summary():
+    summary = pool_summary(FakePool().get_stats())
+
+    assert summary['saturation'] == 0.5
+    assert summary['wait_ms_avg'] == 2.5
+    assert (summary['waiting'], summary['timeouts']) == (3, 1)
+
+
+def test_empty_pool_summary():
+    assert pool_summary({})['saturation'] == 0.0
+
+
+def test_stats_of_pooled_alias(monkeypatch):
+    monkeypatch.setattr(type(connections['default']), '_connection_pools', {'default': FakePool()}, raising=False)
+
+    stats = connection_stats()['default']
+    assert stats['mode'] == 'pool'
+    assert stats['size'] == 6
+
+
+def test_stats_without_pool():
+    stats = connection_stats()['default']
+
+    assert stats['mode'] == 'per_request'
+    assert stats['conn_max_age'] == 0
+
+
+def test_connects_are_counted():
+    metrics.reset()
+    connection_created.send(sender=type(connection), connection=connection)
+
+    assert metrics.snapshot(gauges=False)['counters']['db.connects.default'] == 1
@@ -0,0 +1,115 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.experience import ExperienceBuffer, experience_buffer
+from core.leaderboard import leaderboard
+from core.metrics import metrics
+
+User = get_user_model()
+
+
+@pytest.fixture
+def buffer():
+    return ExperienceBuffer(interval=0, max_users=100)
+
+
+@pytest.fixture
+def users():
+    return User.objects.bulk_create([
+        User(first_name='User', last_name=str(index), email=f'user{index}@example.com',
+             country='UA', experience=experience, is_active=True)
+        for index, experience in enumerate([0, 990, 14000])
+    ])
+
+
+@pytest.mark.django_db
+class TestExperienceBuffer:
+
+    def test_flush_groups_increments(self, buffer, users):
+        for user in users:
+            buffer.award(user.uuid, 10)
+        buffer.award(users[2].uuid, 5)
+
+        assert User.objects.get(pk=users[0].pk).experience == 0
+        assert buffer.stats() == {'pending_users': 3, 'pending_points': 35}
+
+        with CaptureQueriesContext(connection) as queries:
+            assert buffer.flush() == 3
+
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        assert len(updates) == 2
+        assert dict(User.objects.values_list('last_name', 'experience')) == {'0': 10, '1': 1000, '2': 14015}
+        assert buffer.stats()['pending_users'] == 0
+
+    def test_rank_promotion_in_same_statement(self, buffer, users):
+        buffer.award(users[1].uuid, 10)
+        buffer.award(users[2].uuid, 1000)
+        buffer.flush()
+
+        ranks = dict(User.objects.values_list('last_name', 'rank'))
+        assert ranks == {'0': 'noob', '1': 'junior', '2': 'senior'}
+
+    def test_increments_are_not_lost_to_concurrent_writes(self, buffer, users):
+        buffer.award(users[0].uuid, 7)
+        # Another process adds experience between award and flush
+        User.objects.filter(pk=users[0].pk).update(experience=100)
+
+        buffer.flush()
+
+        assert User.objects.get(pk=users[0].pk).experience == 107
+
+    def test_failed_flush_keeps_pending(self, buffer, users, monkeypatch):
+        buffer.award(users[0].uuid, 3)
+        monkeypatch.setattr(buffer, 'write', lambda pending: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            buffer.flush()
+
+        assert buffer.stats() == {'pending_users': 1, 'pending_points': 3}
+
+    def test_full_buffer_wakes_the_flusher(self, users, monkeypatch):
+        buffer = ExperienceBuffer(interval=0, max_users=2)
+        woken = []
+        monkeypatch.setattr(buffer.flusher, 'wake', lambda: woken.append(True))
+
+        buffer.award(users[0].uuid, 1)
+        assert not woken
+        buffer.award(users[1].uuid, 1)
+
+        assert woken and buffer.stats()['pending_users'] == 2
+        assert User.objects.get(pk=users[1].pk).experience == 990
+
+    def test_flush_updates_leaderboard(self, buffer, users):
+        leaderboard.ensure_loaded()
+        buffer.award(users[0].uuid, 20000)
+        metrics.reset()
+
+        buffer.flush()
+
+        assert leaderboard.position(users[0].uuid) == (1, 3)
+        assert metrics.snapshot(gauges=False)['timers']['xp.flush']['count'] == 1
+
+    def test_award_endpoint(self, users):
+        admin = User.objects.create_superuser(
+            first_name='Admin', last_name='User', email='admin@example.com', password='testpassword', country='UA',
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.post('/api/v1/experience/award/', {'awards': [
+            {'user': str(users[0].uuid), 'points': 15},
+            {'user': str(users[0].uuid), 'points': 5},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        experience_buffer.flush()
+        assert User.objects.get(pk=users[0].pk).experience == 20
+
+        client.force_authenticate(users[0])
+        response = client.post('/api/v1/experience/award/', {'awards': [{'user': str(users[0].uuid), 'points': 1}]},
+                               format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
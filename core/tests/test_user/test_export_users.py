@@ -0,0 +1,105 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.exporting import EXPORT_FIELDS, stream_users
+
+User = get_user_model()
+
+
+@pytest.fixture
+def users(settings):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+    created = []
+    for index, (role, verified) in enumerate([('student', True), ('student', False), ('curator', True)]):
+        created.append(User.objects.create_user(
+            first_name='User',
+            last_name=str(index),
+            email=f'user{index}@example.com',
+            password='testpassword',
+            country='UA',
+            role=role,
+            is_email_verified=verified,
+        ))
+    User.objects.filter(pk=created[0].pk).update(created_at=timezone.now() - timedelta(days=30))
+    return created
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_superuser(
+        first_name='Admin',
+        last_name='User',
+        email='admin@example.com',
+        password='testpassword',
+        country='UA',
+    )
+
+
+def read_csv(content: bytes) -> list:
+    return list(csv.DictReader(io.StringIO(content.decode())))
+
+
+@pytest.mark.django_db
+class TestUserExport:
+
+    def test_csv_stream(self, users):
+        rows = read_csv(b"".join(stream_users()))
+
+        assert len(rows) == 3
+        assert tuple(rows[0]) == EXPORT_FIELDS
+        row = next(row for row in rows if row['email'] == 'user2@example.com')
+        assert row['role'] == 'curator' and row['experience'] == '0' and row['is_email_verified'] == 'True'
+
+    def test_filters(self, users):
+        def emails(**filters):
+            return sorted(row['email'] for row in read_csv(b"".join(stream_users(**filters))))
+
+        assert emails(role='student') == ['user0@example.com', 'user1@example.com']
+        assert emails(verified=False) == ['user1@example.com']
+        assert emails(created_after=timezone.now() - timedelta(days=1)) == ['user1@example.com', 'user2@example.com']
+        assert emails(created_before=timezone.now() - timedelta(days=1), verified=True) == ['user0@example.com']
+
+    def test_jsonl_gzip_stream_is_chunked(self, users):
+        stats = {}
+        chunks = list(stream_users(fmt='jsonl', compress=True, chunk_size=1, stats=stats))
+
+        lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+        assert [json.loads(line)['email'] for line in lines].count('user0@example.com') == 1
+        assert stats['rows'] == 3 and stats['bytes'] == sum(map(len, chunks))
+
+    def test_command(self, users, tmp_path):
+        output = tmp_path / 'users.csv.gz'
+        err = io.StringIO()
+
+        call_command('export_users', '--output', str(output), '--gzip', '--unverified', stderr=err)
+
+        assert [row['email'] for row in read_csv(gzip.decompress(output.read_bytes()))] == ['user1@example.com']
+        assert 'Exported 1 users' in err.getvalue() and 'rows/s' in err.getvalue()
+
+    def test_endpoint(self, users, admin):
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.get('/api/v1/users/export/', {'output': 'jsonl', 'role': 'curator'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)['email'] for line in lines] == ['user2@example.com']
+
+    def test_endpoint_admin_only(self, users):
+        client = APIClient()
+        client.force_authenticate(users[0])
+
+        assert client.get('/api/v1/users/export/').status_code == status.HTTP_403_FORBIDDEN
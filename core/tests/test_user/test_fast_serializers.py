@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.fast_serializers import compile_serializer, dumps
+from core.serializers import UserDirectorySerializer, UserMeSerializer
+
+User = get_user_model()
+
+
+@pytest.fixture
+def users():
+    plain = User.objects.create_user(
+        first_name='Plain',
+        last_name='User',
+        email='plain@example.com',
+        password='testpassword',
+        country='UA',
+        is_active=True,
+    )
+    odd = User.objects.create_user(
+        first_name='Ünïcode\u2028',
+        last_name='"Quoted" </script>',
+        email='odd@example.com',
+        password='testpassword',
+        country='PL',
+        city='Kraków',
+        phone='+380000000000',
+        role='curator',
+        experience=1234,
+        is_active=True,
+    )
+    User.objects.filter(pk=odd.pk).update(photo='users/photos/odd.png')
+    return list(User.objects.order_by('email'))
+
+
+@pytest.mark.django_db
+class TestCompiledSerializer:
+    @pytest.mark.parametrize('serializer_class', [UserMeSerializer, UserDirectorySerializer])
+    def test_matches_drf_output(self, users, serializer_class):
+        plan = compile_serializer(serializer_class)
+        expected = serializer_class(users, many=True).data
+
+        assert plan.many(users) == expected
+        assert plan.rows(User.objects.order_by('email')) == expected
+        assert dumps(plan.many(users)) == JSONRenderer().render(expected)
+
+    def test_plan_is_built_once_per_class(self):
+        assert compile_serializer(UserMeSerializer) is compile_serializer(UserMeSerializer)
+        assert compile_serializer(UserDirectorySerializer).reads_rows
+
+    def test_endpoints_send_compiled_payloads(self, users):
+        admin = User.objects.create_superuser(
+            first_name='Admin',
+            last_name='User',
+            email='admin@example.com',
+            password='adminpassword',
+            country='UA',
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.get('/api/v1/users/', {'limit': 10})
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/json'
+        odd = next(item for item in response.json()['results'] if item['email'] == 'odd@example.com')
+        assert odd == UserDirectorySerializer(users[0]).data
+
+        client.force_authenticate(User.objects.get(email='odd@example.com'))
+        response = client.get('/api/v1/account/me/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == JSONRenderer().render(UserMeSerializer(users[0]).data)
@@ -0,0 +1,174 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.idempotency import IdempotencyStore
+
+User = get_user_model()
+
+
+def register_data(email='new@example.com'):
+    return {
+        'first_name': 'New',
+        'last_name': 'User',
+        'email': email,
+        'password': 'strongpassword123',
+        'country': 'UA',
+    }
+
+
+@pytest.mark.django_db
+class TestIdempotencyKeys:
+    def test_retried_register_replays_first_response(self, mailoutbox):
+        client = APIClient()
+        first = client.post('/api/v1/auth/register/', register_data(), format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        retry = client.post('/api/v1/auth/register/', register_data(), format='json', HTTP_IDEMPOTENCY_KEY='k1')
+
+        assert first.status_code == retry.status_code == status.HTTP_200_OK
+        assert retry.data == first.data
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert User.objects.filter(email='new@example.com').count() == 1
+        assert len(mailoutbox) == 1
+
+    def test_validation_errors_are_replayed(self, active_user):
+        client = APIClient()
+        responses = [
+            client.post('/api/v1/auth/register/', register_data(active_user.email), format='json',
+                        HTTP_IDEMPOTENCY_KEY='taken')
+            for _ in range(2)
+        ]
+
+        assert [response.status_code for response in responses] == [status.HTTP_400_BAD_REQUEST] * 2
+        assert responses[1]['Idempotent-Replayed'] == 'true'
+
+    def test_key_reused_for_another_body(self):
+        client = APIClient()
+        client.post('/api/v1/auth/register/', register_data(), format='json', HTTP_IDEMPOTENCY_KEY='k2')
+        response = client.post('/api/v1/auth/register/', register_data('other@example.com'), format='json',
+                               HTTP_IDEMPOTENCY_KEY='k2')
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert not User.objects.filter(email='other@example.com').exists()
+
+    def test_retried_change_password_hashes_once(self, active_user, monkeypatch):
+        calls = []
+        set_password = User.set_password
+        monkeypatch.setattr(User, 'set_password', lambda user, raw: calls.append(raw) or set_password(user, raw))
+        client = APIClient()
+        client.force_authenticate(active_user)
+        data = {'old_password': 'testpassword', 'new_password': 'anotherpassword123'}
+
+        for _ in range(2):
+            response = client.post('/api/v1/auth/password/change/', data, format='json', HTTP_IDEMPOTENCY_KEY='k3')
+            assert response.status_code == status.HTTP_200_OK
+
+        assert calls == ['anotherpassword123']
+
+    def test_keys_are_scoped_per_user(self, active_user):
+        other = User.objects.create_user(
+            first_name='Other', last_name='User', email='other@example.com', password='otherpassword',
+            country='UA', is_active=True, is_email_verified=True,
+        )
+        for user, old in ((active_user, 'testpassword'), (other, 'otherpassword')):
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.post('/api/v1/auth/password/change/',
+                                   {'old_password': old, 'new_password': 'anotherpassword123'},
+                                   format='json', HTTP_IDEMPOTENCY_KEY='same')
+            assert 'Idempotent-Replayed' not in response
+
+    def test_tokens_are_not_replayed_to_other_clients(self, active_user):
+        owner = APIClient()
+        login = owner.post('/api/v1/auth/login/', {'email': active_user.email, 'password': 'testpassword'},
+                           format='json', HTTP_IDEMPOTENCY_KEY='k4')
+        assert 'Idempotent-Replayed' not in login
+        first = owner.post('/api/v1/auth/token/refresh/', format='json', HTTP_IDEMPOTENCY_KEY='k5')
+        assert first.status_code == status.HTTP_200_OK
+
+        stranger = APIClient().post('/api/v1/auth/token/refresh/', format='json', HTTP_IDEMPOTENCY_KEY='k5')
+
+        assert stranger.status_code == status.HTTP_401_UNAUTHORIZED
+        assert 'Idempotent-Replayed' not in stranger
+        assert 'access' not in stranger.data
+
+
+class TestIdempotencyStore:
+    def test_concurrent_duplicates_run_once(self):
+        store = IdempotencyStore(ttl=60, max_size=10)
+        calls, responses = [], []
+
+        def handler():
+            calls.append(1)
+            time.sleep(0.05)
+            return Response({'n': len(calls)}, status=201)
+
+        threads = [
+            threading.Thread(target=lambda: responses.append(store.run('view::key', 'body', handler)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert [(response.status_code, response.data) for response in responses] == [(201, {'n': 1})] * 4
+        assert not store._locks
+
+    def test_response_stored_by_another_process_before_the_claim(self, settings, monkeypatch):
+        """A process finishing between our read and our in-flight add is replayed, not run again."""
+        settings.IDEMPOTENCY_CACHE_ALIAS = 'default'
+        store = IdempotencyStore(ttl=60, max_size=10)
+        store.shared.clear()
+        calls, reads = [], []
+        get = store.get
+
+        def racing_get(key):
+            reads.append(key)
+            if len(reads) == 2:
+                # The other process stores its response and deletes its in-flight marker now
+                store.set(key, {'fingerprint': 'body', 'status': 201, 'data': {'n': 0}})
+                return None
+            return get(key)
+
+        monkeypatch.setattr(store, 'get', racing_get)
+        response = store.run('race::key', 'body', lambda: calls.append(1) or Response({'n': 1}, status=201))
+
+        assert not calls
+        assert (response.status_code, response.data) == (201, {'n': 0})
+        assert response['Idempotent-Replayed'] == 'true'
+        assert store.shared.get(f'{reads[0]}:lock') is None
+
+    def test_responses_setting_cookies_are_not_stored(self):
+        store = IdempotencyStore(ttl=60, max_size=10)
+        calls = []
+
+        def handler():
+            calls.append(1)
+            response = Response({'access': 'token'})
+            response.set_cookie('access_token', 'token')
+            return response
+
+        store.run('view::key', 'body', handler)
+        replay = store.run('view::key', 'body', handler)
+
+        assert len(calls) == 2
+        assert 'Idempotent-Replayed' not in replay
+
+    def test_server_errors_are_not_stored(self):
+        store = IdempotencyStore(ttl=60, max_size=10)
+        calls = []
+
+        def handler():
+            calls.append(1)
+            return Response({'detail': 'boom'}, status=503)
+
+        store.run('view::key', 'body', handler)
+        store.run('view::key', 'body', handler)
+
+        assert len(calls) == 2
@@ -0,0 +1,138 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+User = get_user_model()
+
+HEADER = "first_name,last_name,email,password,phone,country\n"
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(settings):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+
+
+@pytest.fixture
+def existing_user():
+    return User.objects.create_user(
+        first_name='Existing',
+        last_name='User',
+        email='taken@example.com',
+        password='testpassword',
+        country='UA',
+        phone='+380000000000',
+    )
+
+
+def import_users(path, *args):
+    out = StringIO()
+    call_command('import_users', str(path), '--workers', '0', *args, stdout=out)
+    return out.getvalue()
+
+
+def write_csv(path, rows):
+    path.write_text(HEADER + "".join(f"{row}\n" for row in rows))
+    return path
+
+
+@pytest.mark.django_db
+class TestImportUsers:
+
+    def test_csv_import_with_duplicates(self, tmp_path, existing_user):
+        source = write_csv(tmp_path / 'users.csv', [
+            'Ann,One,ann@example.com,secret-ann,,UA',
+            'Bob,Two,taken@example.com,secret-bob,,UA',
+            'Cid,Three,cid@example.com,secret-cid,+380000000000,PL',
+            'Dan,Four,ann@example.com,secret-dan,,UA',
+            'Eve,,eve@example.com,secret-eve,,UA',
+            'Fay,Six,fay@example.com,,+380111111111,DE',
+        ])
+        report = tmp_path / 'skipped.csv'
+
+        output = import_users(source, '--batch-size', '4', '--report', str(report))
+
+        assert 'created 2' in output and 'rows/s' in output
+        ann = User.objects.get(email='ann@example.com')
+        assert ann.check_password('secret-ann')
+        assert not ann.is_active
+        assert not User.objects.get(email='fay@example.com').has_usable_password()
+
+        with open(report) as skipped:
+            reasons = {row['line']: row['reason'] for row in csv.DictReader(skipped)}
+        assert reasons == {
+            '3': 'duplicate email',
+            '4': 'duplicate phone',
+            '5': 'duplicate email',
+            '6': 'missing last_name',
+        }
+
+    def test_jsonl_import_activates(self, tmp_path):
+        source = tmp_path / 'users.jsonl'
+        source.write_text("\n".join([
+            json.dumps({'first_name': 'Ann', 'last_name': 'One', 'email': 'ann@example.com',
+                        'password': 'secret', 'country': 'UA', 'role': 'curator'}),
+            'not json',
+            '',
+        ]))
+
+        output = import_users(source, '--activate')
+
+        assert 'created 1' in output and '1 invalid' in output
+        ann = User.objects.get(email='ann@example.com')
+        assert ann.is_active and ann.is_email_verified and ann.role == 'curator'
+
+    def test_invalid_fields_are_skipped(self, tmp_path):
+        source = tmp_path / 'users.jsonl'
+        source.write_text("\n".join(json.dumps(row) for row in [
+            {'first_name': 'Ann', 'last_name': 'One', 'email': 'ann@example.com', 'country': 'UA'},
+            {'first_name': 'Bob', 'last_name': 'Two', 'email': 'not-an-email', 'country': 'UA'},
+            {'first_name': 'Cid' * 20, 'last_name': 'Three', 'email': 'cid@example.com', 'country': 'UA'},
+            {'first_name': 'Dan', 'last_name': 'Four', 'email': 'dan@example.com', 'country': 'UA', 'role': 'king'},
+        ]))
+        report = tmp_path / 'skipped.csv'
+
+        output = import_users(source, '--report', str(report))
+
+        assert 'created 1' in output and '3 invalid' in output
+        with open(report) as skipped:
+            reasons = {row['line']: row['reason'] for row in csv.DictReader(skipped)}
+        assert reasons == {'2': 'invalid email', '3': 'invalid first_name', '4': 'invalid role'}
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        rows = [f'User,{index},user{index}@example.com,secret,,UA' for index in range(5)]
+        source = write_csv(tmp_path / 'users.csv', rows)
+        checkpoint = tmp_path / 'import.checkpoint'
+        checkpoint.write_text('4')  # lines 2-4 (first three rows) were imported before
+
+        import_users(source, '--batch-size', '2', '--checkpoint', str(checkpoint))
+
+        assert sorted(User.objects.values_list('email', flat=True)) == ['user3@example.com', 'user4@example.com']
+        assert checkpoint.read_text() == '6'
+
+        import_users(source, '--checkpoint', str(checkpoint))
+        assert User.objects.count() == 2
+
+    def test_batch_queries_are_constant(self, tmp_path, django_assert_max_num_queries):
+        source = write_csv(tmp_path / 'users.csv', [
+            f'User,{index},user{index}@example.com,secret,+38{index:010d},UA' for index in range(50)
+        ])
+
+        # Two duplicate lookups, the savepoint pair and the insert (split in two by SQLite's parameter limit)
+        with django_assert_max_num_queries(6):
+            import_users(source, '--batch-size', '50')
+
+        assert User.objects.count() == 50
+
+    def test_process_pool_hashing(self, tmp_path):
+        source = write_csv(tmp_path / 'users.csv', [
+            f'User,{index},user{index}@example.com,secret{index},,UA' for index in range(4)
+        ])
+
+        out = StringIO()
+        call_command('import_users', str(source), '--workers', '2', stdout=out)
+
+        assert User.objects.get(email='user3@example.com').check_password('secret3')
@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import user_cache
+
+User = get_user_model()
+
+
+@pytest.fixture
+def client(active_user):
+    user_cache.clear()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(active_user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_user_resolved_from_cache(self, client, django_assert_num_queries):
+        """Second request with the same token does not query the user table."""
+        assert client.get('/api/v1/account/me/').status_code == status.HTTP_200_OK
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/account/me/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert user_cache.stats()['local_hits'] == 1
+        assert user_cache.stats()['misses'] == 1
+
+    def test_deactivation_invalidates_cache(self, client, active_user):
+        """Saving the user drops the cached copy so deactivation applies at once."""
+        assert client.get('/api/v1/account/me/').status_code == status.HTTP_200_OK
+
+        active_user.is_active = False
+        active_user.save()
+
+        assert client.get('/api/v1/account/me/').status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cached_user_is_not_shared(self, client, active_user):
+        """Mutating request.user must not leak into the cached copy."""
+        client.get('/api/v1/account/me/')
+        cached = user_cache.get(active_user.pk)
+        cached.first_name = 'Changed'
+
+        assert user_cache.get(active_user.pk).first_name == 'Test'
+
+    @pytest.mark.parametrize('alias', [None, 'default'])
+    def test_stale_read_is_not_written_back(self, settings, active_user, alias):
+        """A copy read before a concurrent save must not outlive that save's invalidation."""
+        settings.JWT_USER_CACHE_ALIAS = alias
+        generation = user_cache.generation(active_user.pk)
+        stale = User.objects.get(pk=active_user.pk)
+
+        active_user.is_active = False
+        active_user.save()
+
+        assert not user_cache.set(stale, generation)
+        assert user_cache.get(active_user.pk) is None
+        assert user_cache.set(User.objects.get(pk=active_user.pk), user_cache.generation(active_user.pk))
+        cache.clear()
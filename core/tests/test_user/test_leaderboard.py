@@ -0,0 +1,124 @@
+import random
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.leaderboard import RankedList, leaderboard
+
+User = get_user_model()
+
+
+@pytest.fixture
+def users():
+    rows = [
+        ('UA', 'student', 300),
+        ('UA', 'curator', 100),
+        ('PL', 'student', 200),
+        ('PL', 'student', 200),
+        ('DE', 'manager', 50),
+    ]
+    return User.objects.bulk_create([
+        User(first_name='User', last_name=str(index), email=f'user{index}@example.com',
+             country=country, role=role, experience=experience, is_active=True)
+        for index, (country, role, experience) in enumerate(rows)
+    ])
+
+
+def test_ranked_list_matches_sorted():
+    ranked, reference = RankedList(load=4), []
+    rng = random.Random(7)
+    for key in sorted(rng.sample(range(10_000), 50)):
+        ranked.append(key)
+        reference.append(key)
+
+    for _ in range(2000):
+        if reference and rng.random() < 0.4:
+            key = rng.choice(reference)
+            reference.remove(key)
+            assert ranked.remove(key)
+        else:
+            key = rng.randrange(10_000)
+            if key in reference:
+                continue
+            reference.append(key)
+            reference.sort()
+            ranked.add(key)
+
+    assert len(ranked) == len(reference)
+    assert ranked.slice(0, len(reference)) == reference
+    assert ranked.slice(17, 5) == reference[17:22]
+    for position in rng.sample(range(len(reference)), 30):
+        assert ranked.index(reference[position]) == position
+    assert ranked.index(-1) is None and not ranked.remove(-1)
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    def test_boards_after_load(self, users):
+        assert [(position, uuid) for position, uuid, _ in leaderboard.top(limit=3)] == [
+            (1, users[0].uuid),
+            (2, min(users[2].uuid, users[3].uuid)),
+            (3, max(users[2].uuid, users[3].uuid)),
+        ]
+        assert leaderboard.position(users[1].uuid, 'country:UA') == (2, 2)
+        assert leaderboard.position(users[4].uuid, 'role:manager') == (1, 1)
+        assert leaderboard.position(users[4].uuid, 'role:student') is None
+
+    def test_incremental_updates_from_saves(self, users):
+        leaderboard.ensure_loaded()
+        user = users[4]
+        user.experience = 1000
+        user.save()
+        assert leaderboard.position(user.uuid) == (1, 5)
+
+        user.country = 'UA'
+        user.save()
+        assert leaderboard.position(user.uuid, 'country:UA') == (1, 3)
+        assert leaderboard.position(user.uuid, 'country:DE') is None
+
+        user.is_active = False
+        user.save()
+        assert leaderboard.position(user.uuid) is None
+
+        users[0].delete()
+        assert leaderboard.top(limit=1)[0][2] == 200
+
+    def test_sync_picks_up_other_writers(self, users):
+        leaderboard.ensure_loaded()
+        # A queryset update fires no signal, as a write from another process
+        User.objects.filter(pk=users[1].pk).update(experience=999, updated_at=leaderboard.synced_at)
+
+        leaderboard.sync()
+
+        assert leaderboard.position(users[1].uuid) == (1, 5)
+
+    def test_sync_picks_up_late_commits(self, users):
+        leaderboard.ensure_loaded()
+        # Stamped before the last sync started, committed after it
+        updated_at = leaderboard.synced_at - timedelta(seconds=5)
+        User.objects.filter(pk=users[4].pk).update(experience=999, updated_at=updated_at)
+
+        leaderboard.sync()
+
+        assert leaderboard.position(users[4].uuid) == (1, 5)
+
+    def test_endpoints(self, users):
+        client = APIClient()
+        client.force_authenticate(users[2])
+
+        response = client.get('/api/v1/leaderboard/', {'country': 'PL', 'limit': 1, 'offset': 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['board'] == 'country:PL'
+        assert [row['position'] for row in response.data['results']] == [2]
+        assert response.data['results'][0]['experience'] == 200
+
+        response = client.get('/api/v1/leaderboard/me/')
+        assert response.data['boards']['global'] == {'position': leaderboard.position(users[2].uuid)[0], 'of': 5}
+        assert response.data['boards']['role:student']['of'] == 3
+
+        assert client.get('/api/v1/leaderboard/', {'country': 'PL', 'role': 'student'}).status_code == \
+            status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,57 @@
+import pytest
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.hashers import password_needs_rehash
+
+
+def login(client, user):
+    return client.post(
+        '/api/v1/auth/login/',
+        {'email': user.email, 'password': 'testpassword'},
+        format='json',
+    )
+
+
+@pytest.fixture(autouse=True)
+def iterations(settings):
+    # Set before active_user hashes its password
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+
+
+@pytest.mark.django_db
+class TestConfiguredHasher:
+
+    def test_iterations_from_settings(self, active_user):
+        assert active_user.password.startswith('pbkdf2_sha256$1000$')
+        assert not password_needs_rehash(active_user.password)
+
+    def test_login_rehashes_to_new_parameters(self, settings, active_user):
+        """A login after raising the cost upgrades the stored hash."""
+        settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+        assert password_needs_rehash(active_user.password)
+
+        assert login(APIClient(), active_user).status_code == status.HTTP_200_OK
+
+        active_user.refresh_from_db()
+        assert active_user.password.startswith('pbkdf2_sha256$2000$')
+
+    def test_login_without_upgrade_does_not_save(self, active_user):
+        """No password write when the stored hash already matches the configuration."""
+        with CaptureQueriesContext(connection) as queries:
+            assert login(APIClient(), active_user).status_code == status.HTTP_200_OK
+
+        assert not [q for q in queries if q['sql'].startswith('UPDATE "core_user"')]
+
+    def test_algorithm_switch(self, settings, active_user):
+        """Switching PASSWORD_HASHER keeps old hashes valid and upgrades them on login."""
+        settings.PASSWORD_HASHERS = ['core.hashers.ScryptPasswordHasher', 'core.hashers.PBKDF2PasswordHasher']
+        settings.PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 10
+
+        assert login(APIClient(), active_user).status_code == status.HTTP_200_OK
+
+        active_user.refresh_from_db()
+        assert active_user.password.startswith('scrypt$1024$')
+        assert active_user.check_password('testpassword')
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.metrics import metrics
+from core.services import password_reset_requests
+
+
+RESET_URL = '/api/v1/auth/password/reset/'
+DETAIL = 'Password reset confirmation was sended to email box'
+
+
+def request_reset(email):
+    return APIClient().post(RESET_URL, {'email': email}, format='json')
+
+
+@pytest.mark.django_db
+class TestPasswordResetRequests:
+    def test_repeats_within_window_send_one_email(self, active_user, mailoutbox):
+        for _ in range(3):
+            response = request_reset(active_user.email)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['detail'] == DETAIL
+
+        assert len(mailoutbox) == 1
+        assert mailoutbox[0].to == [active_user.email]
+
+    def test_repeat_skips_the_database(self, active_user, mailoutbox):
+        request_reset(active_user.email)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = request_reset(active_user.email.upper())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 0
+        assert len(mailoutbox) == 1
+
+    def test_address_case_does_not_matter(self, active_user, mailoutbox):
+        request_reset(active_user.email.capitalize())
+        request_reset(active_user.email)
+
+        assert len(mailoutbox) == 1
+        assert mailoutbox[0].to == [active_user.email]
+
+    def test_unknown_email_answers_like_a_known_one(self, active_user, mailoutbox):
+        metrics.reset()
+        known = request_reset(active_user.email)
+        unknown = request_reset('nobody@example.com')
+
+        assert (unknown.status_code, unknown.data) == (known.status_code, known.data)
+        assert len(mailoutbox) == 1
+        counters = metrics.snapshot(gauges=False)['counters']
+        assert counters['password_reset.sent'] == 1
+        assert counters['password_reset.unknown'] == 1
+
+    def test_new_window_sends_again(self, active_user, mailoutbox):
+        request_reset(active_user.email)
+        password_reset_requests.clear()  # the window has passed
+        request_reset(active_user.email)
+
+        assert len(mailoutbox) == 2
+
+    def test_missing_email(self, mailoutbox):
+        response = APIClient().post(RESET_URL, {}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(mailoutbox) == 0
@@ -0,0 +1,110 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.authentication import user_cache
+from core.db_router import read_stats, recent_writers, use_primary, use_replicas
+from core.tokens import RefreshToken
+
+User = get_user_model()
+
+ME_URL = '/api/v1/account/me/'
+DIRECTORY_URL = '/api/v1/users/'
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    read_stats.reset()
+    recent_writers.clear()
+    yield
+    recent_writers.clear()
+
+
+@pytest.fixture
+def user_fields():
+    # Staff, to read the user directory
+    return {'is_staff': True}
+
+
+@pytest.fixture
+def replicated_user(active_user):
+    # Replication, as of the moment the user was created
+    User.objects.using('replica').bulk_create([User.objects.using('default').get(pk=active_user.pk)])
+    return active_user
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def listed_country(client, **headers):
+    response = client.get(DIRECTORY_URL, **headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()['results'][0]['country']
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+class TestReplicaRouting:
+    def test_reads_go_to_replica(self, replica):
+        User.objects.create_user(first_name='Only', last_name='Primary', email='primary@example.com',
+                                 password='x', country='UA')
+
+        with use_replicas():
+            assert User.objects.filter(email='primary@example.com').db == 'replica'
+            assert not User.objects.filter(email='primary@example.com').exists()
+            with use_primary():
+                assert User.objects.filter(email='primary@example.com').exists()
+
+        stats = read_stats.stats()
+        assert (stats['replica_reads'], stats['primary_reads']) == (2, 1)
+
+    def test_reads_outside_requests_use_primary(self, replica):
+        """Background jobs and commands re-read what they just wrote."""
+        User.objects.create_user(first_name='Only', last_name='Primary', email='primary@example.com',
+                                 password='x', country='UA')
+
+        assert User.objects.filter(email='primary@example.com').exists()
+        assert read_stats.stats()['replica_reads'] == 0
+
+    def test_no_replicas_reads_primary(self):
+        assert User.objects.all().db == 'default'
+
+    def test_get_after_patch_reads_primary(self, replica, replicated_user):
+        client = client_for(replicated_user)
+        assert listed_country(client) == 'UA'
+
+        response = client.patch(ME_URL, {'country': 'PL'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert listed_country(client) == 'PL'
+
+        # Replication lag outlived the sticky window
+        recent_writers.clear()
+        assert listed_country(client) == 'UA'
+
+    def test_other_credentials_are_not_pinned(self, replica, replicated_user):
+        client_for(replicated_user).patch(ME_URL, {'country': 'PL'}, format='json')
+
+        assert listed_country(client_for(replicated_user)) == 'UA'
+
+    def test_consistency_header_reads_primary(self, replica, replicated_user):
+        User.objects.filter(pk=replicated_user.pk).update(country='PL')
+        client = client_for(replicated_user)
+
+        assert listed_country(client) == 'UA'
+        assert listed_country(client, HTTP_X_READ_CONSISTENCY='strong') == 'PL'
+
+    def test_authenticated_user_is_read_from_primary(self, replica, replicated_user):
+        """A user deactivated while the replica lags is not cached, or served, as active."""
+        client = client_for(replicated_user)
+        assert client.get(ME_URL).status_code == status.HTTP_200_OK
+
+        replicated_user.is_active = False
+        replicated_user.save(update_fields=['is_active'])
+        assert User.objects.using('replica').get(pk=replicated_user.pk).is_active
+
+        assert client.get(ME_URL).status_code == status.HTTP_401_UNAUTHORIZED
+        assert user_cache.get(replicated_user.pk).is_active is False
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.revocation import RevocationIndex, revocation_index
+from core.tokens import RefreshToken
+
+
+@pytest.mark.django_db
+class TestRevocationIndex:
+
+    def test_logout_revokes_without_blacklist_reads(self, active_user, django_assert_num_queries):
+        """After logout the refresh token is rejected from memory, without token_blacklist queries."""
+        client = APIClient()
+        client.force_authenticate(user=active_user)
+        refresh = RefreshToken.for_user(active_user)
+        client.cookies['refresh_token'] = str(refresh)
+        revocation_index.load()
+
+        client.get('/api/v1/auth/logout/')
+
+        with django_assert_num_queries(0):
+            response = client.post('/api/v1/auth/token/refresh/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_other_worker_sees_revocation_through_cache(self, active_user):
+        """A second index (another worker) learns about revocations from the shared cache."""
+        refresh = RefreshToken.for_user(active_user)
+        other_worker = RevocationIndex()
+        other_worker.load()
+
+        refresh.blacklist()
+
+        assert other_worker.is_revoked(refresh['jti'])
+        assert other_worker.stats()['shared_hits'] == 1
+
+    def test_lost_shared_entry_falls_back_to_database(self, active_user):
+        """A worker loaded before the revocation still rejects the token once the cache lost it."""
+        refresh = RefreshToken.for_user(active_user)
+        other_worker = RevocationIndex()
+        other_worker.load()
+
+        refresh.blacklist()
+        cache.clear()
+
+        assert other_worker.is_revoked(refresh['jti'])
+        assert other_worker.stats()['db_checks'] == 1
+
+    def test_database_miss_is_kept_briefly(self, active_user, django_assert_num_queries):
+        jti = RefreshToken.for_user(active_user)['jti']
+        index = RevocationIndex()
+        index._loaded = True
+
+        assert not index.is_revoked(jti)
+        with django_assert_num_queries(0):
+            assert not index.is_revoked(jti)
+
+    def test_index_seeded_from_database(self, active_user):
+        """Blacklisted tokens survive a cache flush through the startup load."""
+        refresh = RefreshToken.for_user(active_user)
+        refresh.blacklist()
+        cache.clear()
+
+        fresh_worker = RevocationIndex()
+        assert fresh_worker.is_revoked(refresh['jti'])
+        assert fresh_worker.stats()['local_hits'] == 1
+
+    def test_entries_age_out(self):
+        """Entries leave the index once the token would have expired anyway."""
+        index = RevocationIndex()
+        index._loaded = True
+        index.revoke('expired-jti', time.time() - 1)
+        index.revoke('live-jti', time.time() + 60)
+
+        assert not index.is_revoked('expired-jti')
+        assert index.is_revoked('live-jti')
+        assert index.stats()['size'] == 1
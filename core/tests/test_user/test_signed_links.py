@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.services import MailConfirmation, PasswordReset
+
+
+@pytest.fixture
+def user_fields():
+    # Links go out before the account is confirmed
+    return {'is_active': False, 'is_email_verified': False}
+
+
+def confirm(client, token, uid64):
+    return client.get(f'/api/v1/auth/confirm/{token}/{uid64}/')
+
+
+@pytest.mark.django_db
+class TestSignedLinks:
+
+    def test_confirmation_link(self, active_user):
+        token, uid64 = MailConfirmation(active_user).create_token()
+
+        response = confirm(APIClient(), token, uid64)
+
+        assert response.data['detail'] == 'Email confirmed'
+        active_user.refresh_from_db()
+        assert active_user.is_email_verified
+
+    @pytest.mark.parametrize('token', ['invalid-token', 'abc.def.ghi', ''])
+    def test_forged_token_rejected_without_queries(self, active_user, token):
+        """A bad signature is answered before any database access."""
+        _, uid64 = MailConfirmation(active_user).create_token()
+
+        with CaptureQueriesContext(connection) as queries:
+            result = MailConfirmation.verify_email(token, uid64)
+
+        assert result['detail'] == 'Invalid Token or expired'
+        assert len(queries) == 0
+
+    @pytest.mark.parametrize('uid64', ['!!!', 'not base64', 'Zm9v'])
+    def test_malformed_uid_does_not_raise(self, active_user, uid64):
+        token, _ = MailConfirmation(active_user).create_token()
+
+        assert MailConfirmation.verify_email(token, uid64)['status'] == 400
+
+    def test_malformed_signed_uid_does_not_raise(self):
+        signed = MailConfirmation.signer().sign('Zm9v.0123')
+
+        assert MailConfirmation.verify_email(signed[len('Zm9v.'):], 'Zm9v')['detail'] == 'Invalid link'
+
+    def test_expired_link(self, settings, active_user):
+        token, uid64 = MailConfirmation(active_user).create_token()
+        settings.PASSWORD_RESET_TIMEOUT = -1
+
+        assert MailConfirmation.verify_email(token, uid64)['detail'] == 'Invalid Token or expired'
+
+    def test_confirmation_link_single_use(self, active_user):
+        """Verifying the email changes the bound state, so the link can't be replayed."""
+        token, uid64 = MailConfirmation(active_user).create_token()
+        client = APIClient()
+
+        assert confirm(client, token, uid64).data['detail'] == 'Email confirmed'
+        assert confirm(client, token, uid64).data['detail'] == 'Invalid Token or expired'
+
+    def test_reset_link_invalid_after_password_change(self, active_user):
+        token, uid64 = PasswordReset(active_user).create_token()
+        active_user.set_password('changedpassword')
+        active_user.save()
+
+        assert PasswordReset.reset_password(token, uid64, 'newpass123')['detail'] == 'Invalid Token or expired'
+
+    def test_links_are_not_interchangeable(self, active_user):
+        token, uid64 = MailConfirmation(active_user).create_token()
+
+        response = APIClient().post(
+            f'/api/v1/auth/password/reset/confirm/{token}/{uid64}/',
+            {'new_password': 'newpass123'},
+            format='json',
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['detail'] == 'Invalid Token or expired'
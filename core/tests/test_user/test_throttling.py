@@ -0,0 +1,120 @@
+import pytest
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.metrics import metrics
+from core.throttling import local_buckets, parse_rate, take
+
+
+@pytest.fixture
+def rates(settings):
+    def configure(ip='', email='', global_=''):
+        settings.REST_FRAMEWORK = {
+            **django_settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'auth_ip': ip, 'auth_email': email, 'auth_global': global_},
+        }
+    return configure
+
+
+def login(client, email, address='10.0.0.1'):
+    return client.post(
+        '/api/v1/auth/login/',
+        {'email': email, 'password': 'wrongpassword'},
+        format='json',
+        REMOTE_ADDR=address,
+    )
+
+
+def test_token_bucket_refill():
+    capacity, refill = parse_rate('2/s')
+
+    tokens, wait = take(0.0, 0.0, 0.25, capacity, refill)
+    assert wait == pytest.approx(0.25)
+    tokens, wait = take(tokens, 0.25, 0.5, capacity, refill)
+    assert wait == 0.0 and tokens == pytest.approx(0.0)
+    assert take(0.0, 0.0, 60.0, capacity, refill) == (1, 0.0)
+
+
+@pytest.mark.django_db
+class TestAuthRateThrottle:
+
+    def test_ip_bucket_sheds_before_any_query(self, rates, active_user):
+        """Once the IP bucket is empty the request is rejected without touching the database."""
+        rates(ip='3/min')
+        client = APIClient()
+        for _ in range(3):
+            assert login(client, active_user.email).status_code == status.HTTP_401_UNAUTHORIZED
+
+        with CaptureQueriesContext(connection) as queries:
+            response = login(client, active_user.email)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+        assert len(queries) == 0
+        assert login(client, active_user.email, address='10.0.0.2').status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_email_bucket_across_addresses(self, rates, active_user):
+        rates(email='2/min')
+        client = APIClient()
+
+        assert login(client, active_user.email, '10.0.0.1').status_code == status.HTTP_401_UNAUTHORIZED
+        assert login(client, active_user.email.upper(), '10.0.0.2').status_code == status.HTTP_401_UNAUTHORIZED
+        assert login(client, active_user.email, '10.0.0.3').status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert login(client, 'other@example.com', '10.0.0.4').status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_global_bucket_and_shed_counters(self, rates, active_user):
+        rates(global_='2/min')
+        metrics.reset()
+        client = APIClient()
+        for address in ('10.0.0.1', '10.0.0.2'):
+            login(client, f'{address}@example.com', address)
+
+        assert login(client, active_user.email, '10.0.0.3').status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        response = client.post('/api/v1/auth/password/reset/', {'email': active_user.email}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        counters = metrics.snapshot(gauges=False)['counters']
+        assert counters['throttle.shed.login'] == 1
+        assert counters['throttle.shed.login.global'] == 1
+        assert 'throttle.shed.password_reset' not in counters
+
+    def test_rejected_ip_does_not_drain_later_buckets(self, rates, active_user):
+        rates(ip='1/min', global_='3/min')
+        client = APIClient()
+        login(client, active_user.email)
+        for _ in range(5):
+            assert login(client, active_user.email).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        for address in ('10.0.0.2', '10.0.0.3'):
+            assert login(client, active_user.email, address).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_shared_store_spans_workers(self, settings, rates, active_user):
+        """With a shared cache the limit holds even when a worker's local buckets are fresh."""
+        settings.THROTTLE_CACHE_ALIAS = 'default'
+        cache.clear()
+        rates(ip='2/min')
+        client = APIClient()
+        for _ in range(2):
+            login(client, active_user.email)
+        local_buckets.clear()
+
+        assert login(client, active_user.email).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_async_login_shares_buckets(self, rates, active_user):
+        rates(ip='1/min')
+        client = APIClient()
+        login(client, active_user.email)
+
+        response = client.post(
+            '/api/v1/auth/async/login/',
+            {'email': active_user.email, 'password': 'wrongpassword'},
+            format='json',
+            REMOTE_ADDR='10.0.0.1',
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response['Retry-After'] == '60'
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.pruning import prune_expired_tokens
+
+User = get_user_model()
+
+
+@pytest.fixture
+def tokens():
+    now = timezone.now()
+    user = User.objects.create_user(
+        first_name='Test', last_name='User', email='prune@example.com',
+        password='testpassword', country='UA',
+    )
+    for index in range(7):
+        expires_at = now - timedelta(hours=1) if index < 5 else now + timedelta(days=1)
+        token = OutstandingToken.objects.create(
+            user=user, jti=f'jti-{index}', token='token', created_at=now, expires_at=expires_at,
+        )
+        if index % 2 == 0:
+            BlacklistedToken.objects.create(token=token)
+
+
+@pytest.mark.django_db
+class TestTokenPruning:
+
+    def test_prunes_only_expired_in_chunks(self, tokens):
+        """Expired rows are removed in bounded chunks, live tokens stay."""
+        result = prune_expired_tokens(chunk_size=2, pause=0)
+
+        assert result['outstanding'] == 5
+        assert result['blacklisted'] == 3
+        assert result['chunks'] == 3
+        assert set(OutstandingToken.objects.values_list('jti', flat=True)) == {'jti-5', 'jti-6'}
+        assert BlacklistedToken.objects.count() == 1
+
+    def test_prune_tokens_command(self, tokens, capsys):
+        call_command('prune_tokens', '--chunk-size', '10', '--pause', '0')
+
+        assert 'Deleted 5 outstanding and 3 blacklisted tokens' in capsys.readouterr().out
@@ -0,0 +1,73 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.settings import api_settings
+
+from core.revocation import revocation_index
+from core.tokens import RefreshToken
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+class TestTokenRefresh:
+
+    def test_refresh_from_login_cookie(self, client, active_user, django_assert_num_queries):
+        """Refresh cookie set by login yields a new access token, reading only the user and the blacklist."""
+        login = client.post(
+            '/api/v1/auth/login/',
+            {'email': active_user.email, 'password': 'testpassword'},
+            format='json',
+        )
+        assert login.status_code == status.HTTP_200_OK
+        revocation_index.load()
+
+        with django_assert_num_queries(2):
+            response = client.post('/api/v1/auth/token/refresh/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'access' in response.data
+        assert response.cookies['access_token'].value == response.data['access']
+
+    def test_refresh_from_body(self, client, active_user):
+        """Refresh token may also be sent in the request body."""
+        refresh = RefreshToken.for_user(active_user)
+        response = client.post('/api/v1/auth/token/refresh/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_refresh_blacklisted_token(self, client, active_user):
+        """Blacklisted refresh token is rejected."""
+        refresh = RefreshToken.for_user(active_user)
+        refresh.blacklist()
+        response = client.post('/api/v1/auth/token/refresh/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_inactive_user(self, client, active_user):
+        """Deactivated user cannot refresh."""
+        refresh = RefreshToken.for_user(active_user)
+        active_user.is_active = False
+        active_user.save()
+        response = client.post('/api/v1/auth/token/refresh/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_rotation(self, client, active_user, monkeypatch):
+        """With rotation enabled a new refresh token is issued and the old one is blacklisted."""
+        monkeypatch.setattr(api_settings, 'ROTATE_REFRESH_TOKENS', True)
+        monkeypatch.setattr(api_settings, 'BLACKLIST_AFTER_ROTATION', True)
+        refresh = str(RefreshToken.for_user(active_user))
+
+        response = client.post('/api/v1/auth/token/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['refresh'] != refresh
+        assert response.cookies['refresh_token'].value == response.data['refresh']
+
+        client.cookies.clear()
+        replay = client.post('/api/v1/auth/token/refresh/', {'refresh': refresh}, format='json')
+        assert replay.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_missing_token(self, client):
+        response = client.post('/api/v1/auth/token/refresh/')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.pagination import KeysetPagination
+
+User = get_user_model()
+
+
+@pytest.fixture
+def users():
+    base = timezone.now()
+    users = User.objects.bulk_create([
+        User(
+            first_name='User',
+            last_name=str(index),
+            email=f'user{index}@example.com',
+            country='UA' if index % 2 else 'PL',
+            role='curator' if index % 3 == 0 else 'student',
+        )
+        for index in range(12)
+    ])
+    # Pairs of users share a timestamp, so pages have to break ties on uuid
+    for index, user in enumerate(users):
+        User.objects.filter(pk=user.pk).update(created_at=base - timedelta(minutes=index // 2))
+    return users
+
+
+@pytest.fixture
+def client():
+    admin = User.objects.create_superuser(
+        first_name='Admin',
+        last_name='User',
+        email='admin@example.com',
+        password='testpassword',
+        country='UA',
+    )
+    User.objects.filter(pk=admin.pk).update(created_at=timezone.now() - timedelta(days=1))
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def walk(client, params):
+    pages, url = [], '/api/v1/users/'
+    while url:
+        response = client.get(url, params if not pages else None)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.data['results'])
+        url = response.data['next']
+    return pages
+
+
+def explain(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+class TestUserDirectory:
+
+    def test_pages_cover_every_user_once_in_order(self, users, client):
+        pages = walk(client, {'limit': 5})
+
+        assert [len(page) for page in pages] == [5, 5, 3]
+        rows = [row for page in pages for row in page]
+        assert len({row['uuid'] for row in rows}) == 13
+        keys = [(row['created_at'], row['uuid']) for row in rows]
+        assert keys == sorted(keys, reverse=True)
+        assert set(rows[0]) == {'uuid', 'first_name', 'last_name', 'email', 'country', 'role', 'rank',
+                                'experience', 'created_at'}
+
+    def test_filters(self, users, client):
+        rows = [row for page in walk(client, {'role': 'curator', 'country': 'UA', 'limit': 1}) for row in page]
+
+        assert sorted(row['email'] for row in rows) == ['user3@example.com', 'user9@example.com']
+
+    def test_no_count_query(self, users, client):
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/v1/users/', {'limit': 5})
+
+        assert not [query for query in queries if 'COUNT(' in query['sql'].upper()]
+
+    def test_invalid_cursor(self, client):
+        assert client.get('/api/v1/users/', {'cursor': 'not-a-cursor'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_non_staff_forbidden(self, users):
+        client = APIClient()
+        client.force_authenticate(users[0])
+
+        assert client.get('/api/v1/users/').status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.parametrize('filters, index', [
+        ({}, 'user_created_uuid_idx'),
+        ({'role': 'student'}, 'user_role_created_uuid_idx'),
+        ({'rank': 'noob'}, 'user_rank_created_uuid_idx'),
+        ({'country': 'UA'}, 'user_country_created_uuid_idx'),
+    ])
+    def test_page_is_index_range_scan(self, users, filters, index):
+        """A cursor page searches its composite index and needs neither a table scan nor a sort."""
+        cursor = (users[5].created_at, users[5].uuid)
+        queryset = KeysetPagination().after(User.objects.filter(**filters), cursor)
+
+        plan = explain(queryset[:6])
+
+        assert f'SEARCH core_user USING INDEX {index}' in plan, plan
+        assert 'SCAN core_user' not in plan and 'TEMP B-TREE' not in plan, plan
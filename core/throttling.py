@@ -0,0 +1,119 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import LRUCache
+from .metrics import metrics
+
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"20/min"`` -> (capacity 20, refill 20 tokens per 60 s). Empty rate disables the bucket."""
+    if not rate:
+        return None
+    num, period = rate.split("/")
+    return int(num), int(num) / DURATIONS[period[0]]
+
+
+class LocalBucketStore:
+    """Token buckets kept in process memory, bounded to ``max_size`` keys."""
+
+    def __init__(self, max_size: int):
+        self._buckets = LRUCache(max_size, ttl=0)
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill: float) -> float:
+        """Take one token; return 0 if granted, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key) or (capacity, now)
+            tokens, wait = take(tokens, updated, now, capacity, refill)
+            # An untouched bucket is full again after capacity / refill seconds
+            self._buckets.set(key, (tokens, now), ttl=capacity / refill)
+        return wait
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class SharedBucketStore:
+    """
+    Token buckets in a Django cache shared by all workers. Read and write are not
+    atomic, so concurrent workers may both spend the same token; the local buckets
+    in front of it keep that overshoot to one burst per worker.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def consume(self, key: str, capacity: int, refill: float) -> float:
+        cache = caches[self.alias]
+        now = time.time()
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens, wait = take(tokens, updated, now, capacity, refill)
+        cache.set(key, (tokens, now), max(int(capacity / refill), 1))
+        return wait
+
+
+def take(tokens: float, updated: float, now: float, capacity: int, refill: float) -> tuple:
+    tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / refill
+
+
+local_buckets = LocalBucketStore(settings.THROTTLE_STORE_SIZE)
+
+
+class AuthRateThrottle(BaseThrottle):
+    """
+    Token buckets for the unauthenticated auth endpoints, checked in order by
+    client IP, by submitted email and for the endpoint as a whole. The first
+    empty bucket rejects the request, so a throttled client does not drain the
+    buckets after it. DRF runs throttles before the handler, so a rejected
+    request never reaches password hashing, the database or SMTP.
+
+    Views set ``throttle_scope``; rates are REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    entries ``auth_ip``, ``auth_email`` and ``auth_global``.
+    """
+
+    kinds = ("ip", "email", "global")
+
+    def __init__(self):
+        self.wait_seconds = 0.0
+        alias = settings.THROTTLE_CACHE_ALIAS
+        self.shared = SharedBucketStore(alias) if alias else None
+
+    def allow_request(self, request, view) -> bool:
+        data = getattr(request, "data", None)
+        email = data.get("email") if hasattr(data, "get") else None
+        return self.allow(view.throttle_scope, self.get_ident(request), email)
+
+    def allow(self, scope: str, ident: str, email=None) -> bool:
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        idents = {"ip": ident, "email": str(email).strip().lower() if email else None, "global": "all"}
+
+        for kind in self.kinds:
+            rate = parse_rate(rates.get(f"auth_{kind}"))
+            if rate is None or idents[kind] is None:
+                continue
+
+            key = f"throttle:{scope}:{kind}:{idents[kind]}"
+            wait = local_buckets.consume(key, *rate)
+            if not wait and self.shared is not None:
+                wait = self.shared.consume(key, *rate)
+            if wait:
+                self.wait_seconds = wait
+                metrics.incr(f"throttle.shed.{scope}")
+                metrics.incr(f"throttle.shed.{scope}.{kind}")
+                return False
+        return True
+
+    def wait(self) -> float:
+        return self.wait_seconds
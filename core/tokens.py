@@ -0,0 +1,19 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .revocation import revocation_index
+
+
+class RefreshToken(BaseRefreshToken):
+    """Refresh token that checks and records revocation through ``revocation_index``."""
+
+    def check_blacklist(self):
+        if revocation_index.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        revocation_index.revoke(self.payload[api_settings.JTI_CLAIM], self.payload["exp"])
+        return result
@@ -1,7 +1,10 @@
 from django.urls import path
+from .async_views import AsyncLoginView, AsyncChangePasswordView
 from .views import (
     RegisterView, EmailConfirmationView, LoginView, ChangePasswordView, PasswordResetConfirmView, PasswordResetView,
-    LogoutView, UserMeView
+    LogoutView, UserMeView, MetricsView, TokenRefreshView, BulkInviteView, InvitationAcceptView,
+    UserExportView, UserDirectoryView, LeaderboardView, LeaderboardMeView,
+    ExperienceAwardView
 )
 
 
@@ -9,10 +12,21 @@ urlpatterns = [
     path("auth/register/", RegisterView.as_view(), name="auth_register"),
     path("auth/login/", LoginView.as_view(), name="login"),
     path("auth/login/", LoginView.as_view(), name="login"),
+    path("auth/async/login/", AsyncLoginView.as_view(), name="async_login"),
+    path("auth/async/password/change/", AsyncChangePasswordView.as_view(), name="async_change_password"),
+    path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("auth/logout/", LogoutView.as_view(), name="logout"),
     path("auth/confirm/<str:token>/<str:uid64>/", EmailConfirmationView.as_view(), name="email_confirmation"),
     path("auth/password/change/", ChangePasswordView.as_view(), name="change_password"),
     path("auth/password/reset/", PasswordResetView.as_view(), name="password_reset"),
     path("auth/password/reset/confirm/<str:token>/<str:uid64>/", PasswordResetConfirmView.as_view(), name="password_reset_confirm"),
+    path("auth/invite/accept/<str:token>/<str:uid64>/", InvitationAcceptView.as_view(), name="invitation_accept"),
+    path("org/invites/", BulkInviteView.as_view(), name="bulk_invite"),
     path("account/me/", UserMeView.as_view(), name="account_me"),
+    path("users/", UserDirectoryView.as_view(), name="user_directory"),
+    path("users/export/", UserExportView.as_view(), name="user_export"),
+    path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
+    path("leaderboard/me/", LeaderboardMeView.as_view(), name="leaderboard_me"),
+    path("experience/award/", ExperienceAwardView.as_view(), name="experience_award"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
\ No newline at end of file
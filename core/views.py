@@ -1,17 +1,62 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
-from .serializers import UserSerializer, ChangePasswordSerializer, UserMeSerializer
+from rest_framework import generics, status, permissions
+from .serializers import (
+    UserSerializer, ChangePasswordSerializer, UserMeSerializer, BulkInviteSerializer, UserExportSerializer,
+    UserDirectorySerializer, UserDirectoryFilterSerializer, LeaderboardQuerySerializer,
+    BulkExperienceAwardSerializer
+)
 from .models import User
-from .services import MailConfirmation, PasswordReset, send_email_core
-from rest_framework_simplejwt.tokens import RefreshToken
+from .services import (
+    MailConfirmation, PasswordReset, Invitation, invite_users, notify_login, refresh_tokens, request_password_reset,
+)
+from .permissions import IsOwnerOrManager
+from .pagination import KeysetPagination
+from .metrics import metrics
+from .exporting import stream_users
+from .leaderboard import leaderboard
+from .experience import award_experience
+from .activity import activity_buffer
+from .throttling import AuthRateThrottle
+from .idempotency import idempotent
+from .account_cache import account_payload, add_validators, etag_matches, store_payload
+from .fast_serializers import EncodedJSONResponse, compile_serializer, dumps
+from .tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import authenticate
-from django.utils.timezone import now
 from django.conf import settings
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.utils.timezone import now
+
+
+logger = logging.getLogger(__name__)
+
+
+def set_auth_cookies(response, access, refresh=None):
+    response.set_cookie(
+        "access_token",
+        str(access),
+        httponly=True,
+        secure=settings.SECURE_COOKIES,
+        samesite="Lax",
+    )
+    if refresh is not None:
+        response.set_cookie(
+            "refresh_token",
+            str(refresh),
+            httponly=True,
+            secure=settings.SECURE_COOKIES,
+            samesite="Lax",
+        )
 
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = "login"
 
     def post(self, request):
         user: User = authenticate(
@@ -29,49 +74,58 @@ class LoginView(APIView):
         if not user.is_active:
             return Response({'detail': 'User is deactivated'}, status=status.HTTP_403_FORBIDDEN)
         
+        activity_buffer.record_login(user.pk)
         refresh = RefreshToken.for_user(user)
+        access = refresh.access_token
         response = Response(
             {
-                "access": str(refresh.access_token),
+                "access": str(access),
                 "refresh": str(refresh),
             },
             status=status.HTTP_200_OK
         )
 
-        response.set_cookie(
-            "access_token",
-            str(refresh.access_token),
-            httponly=True,
-            secure=settings.SECURE_COOKIES,
-            samesite="Lax",
-        )
-        response.set_cookie(
-            "refresh_token",
-            str(refresh),
-            httponly=True,
-            secure=settings.SECURE_COOKIES,
-            samesite="Lax",
-        )
+        set_auth_cookies(response, access, refresh)
 
-        
         try:
-            send_email_core(
-                subject="New login into accout",
-                message=(
-                        f"Dear {user.first_name},\n"
-                        f"New login detected at {now().strftime('%H:%M')} UTC"
-                    ),
-                recipient=user.email
-            )
+            notify_login(user, request)
         except Exception:
-            pass
+            logger.exception("Could not send the login notification to %s", user.email)
 
         return response
     
 
+class TokenRefreshView(APIView):
+    permission_classes = [permissions.AllowAny]
+    # The access token in the header is usually the expired one being replaced
+    authentication_classes = []
+
+    def post(self, request):
+        raw_refresh = request.COOKIES.get("refresh_token") or request.data.get("refresh")
+        if not raw_refresh:
+            return Response({'detail': 'Refresh token is missing'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            access, refresh = refresh_tokens(raw_refresh)
+        except TokenError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+
+        data = {"access": str(access)}
+        if refresh is not None:
+            data["refresh"] = str(refresh)
+
+        response = Response(data, status=status.HTTP_200_OK)
+        set_auth_cookies(response, access, refresh)
+
+        return response
+
+
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = "register"
 
+    @idempotent
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -94,7 +148,11 @@ class LogoutView(APIView):
     def get(self, request):
         refresh = request.COOKIES.get("refresh_token")
         if refresh:
-            RefreshToken(refresh).blacklist()
+            try:
+                RefreshToken(refresh).blacklist()
+            except TokenError:
+                # Already expired or revoked, nothing left to invalidate
+                pass
 
         response = Response({"detail": "logout"})
         response.delete_cookie("access_token")
@@ -114,6 +172,7 @@ class ChangePasswordView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
+    @idempotent
     def post(self, request):
         serializer = ChangePasswordSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -133,18 +192,12 @@ class ChangePasswordView(APIView):
 
 class PasswordResetView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = "password_reset"
 
+    @idempotent
     def post(self, request):
-        try:
-            user: User = User.objects.get(email=request.data.get('email'))
-        except Exception:
-            return {'details': 'User does\'nt exist'}
-        password_manager = PasswordReset(user)
-        try:
-            password_manager.send_email(user.email)
-        except Exception:
-            pass
-
+        request_password_reset(request.data.get('email'))
         return Response({'detail': 'Password reset confirmation was sended to email box'}, status=200)
     
 
@@ -157,13 +210,45 @@ class PasswordResetConfirmView(APIView):
         return Response(response)
 
 
+class BulkInviteView(APIView):
+    permission_classes = [IsOwnerOrManager]
+
+    @idempotent
+    def post(self, request):
+        serializer = BulkInviteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            results = invite_users(serializer.validated_data['invitees'], request.user)
+        except IntegrityError:
+            return Response({'detail': 'Invitees were registered concurrently, please retry'},
+                            status=status.HTTP_409_CONFLICT)
+
+        invited = sum(result['status'] == 'invited' for result in results)
+        return Response(
+            {'invited': invited, 'skipped': len(results) - invited, 'results': results},
+            status=status.HTTP_201_CREATED if invited else status.HTTP_200_OK,
+        )
+
+
+class InvitationAcceptView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, token, uid64):
+        response = Invitation.accept(token, uid64, request.data.get('password'))
+
+        return Response(response)
+
+
 class UserMeView(APIView):
     permission_classes=[permissions.IsAuthenticated]
 
     def get(self, request):
-        serializer=UserMeSerializer(request.user)
+        etag, body = account_payload(request.user)
+        if etag_matches(request, etag):
+            return add_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
 
-        return Response(serializer.data)
+        return add_validators(EncodedJSONResponse(body), etag)
     
     def patch(self, request):
         serializer=UserMeSerializer(
@@ -174,4 +259,120 @@ class UserMeView(APIView):
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
-        return Response(serializer.data)
\ No newline at end of file
+        # The save dropped the cached payload, the response is the new one
+        etag, body = store_payload(request.user, serializer.data)
+        return add_validators(EncodedJSONResponse(body), etag)
+
+
+class MetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+class UserExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        serializer = UserExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+
+        fmt, compress = options.pop("output"), options.pop("gzip")
+        filename = f"users-{now():%Y%m%d%H%M%S}.{fmt}{'.gz' if compress else ''}"
+        response = StreamingHttpResponse(
+            stream_users(fmt=fmt, compress=compress, **options),
+            content_type="application/gzip" if compress else (
+                "text/csv" if fmt == "csv" else "application/x-ndjson"
+            ),
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class UserDirectoryView(generics.ListAPIView):
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = UserDirectorySerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        serializer = UserDirectoryFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+
+        queryset = User.objects.only(*UserDirectorySerializer.Meta.fields)
+        for field in ("role", "rank", "country"):
+            if field in filters:
+                queryset = queryset.filter(**{field: filters[field]})
+        if "created_after" in filters:
+            queryset = queryset.filter(created_at__gte=filters["created_after"])
+        if "created_before" in filters:
+            queryset = queryset.filter(created_at__lt=filters["created_before"])
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginator.paginate_queryset(self.get_queryset(), request, view=self)
+        results = compile_serializer(self.serializer_class).many(page)
+        return EncodedJSONResponse(dumps({"next": self.paginator.get_next_link(), "results": results}))
+
+
+class LeaderboardView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        serializer = LeaderboardQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        entries = leaderboard.top(
+            serializer.board,
+            limit=serializer.validated_data['limit'],
+            offset=serializer.validated_data['offset'],
+        )
+        users = User.objects.only("first_name", "last_name", "country", "rank").in_bulk(
+            [uuid for _, uuid, _ in entries]
+        )
+
+        return Response({
+            'board': serializer.board,
+            'results': [
+                {
+                    'position': position,
+                    'uuid': uuid,
+                    'first_name': users[uuid].first_name,
+                    'last_name': users[uuid].last_name,
+                    'country': users[uuid].country,
+                    'rank': users[uuid].rank,
+                    'experience': experience,
+                }
+                for position, uuid, experience in entries
+                if uuid in users
+            ],
+        })
+
+
+class LeaderboardMeView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user: User = request.user
+        positions = {}
+        for board in leaderboard.board_names(user.country, user.role):
+            found = leaderboard.position(user.uuid, board)
+            positions[board] = {'position': found[0], 'of': found[1]} if found else None
+
+        return Response({'experience': user.experience, 'boards': positions})
+
+
+class ExperienceAwardView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @idempotent
+    def post(self, request):
+        serializer = BulkExperienceAwardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        for award in serializer.validated_data['awards']:
+            award_experience(award['user'], award['points'])
+
+        return Response({'detail': 'Experience will be applied shortly'}, status=status.HTTP_202_ACCEPTED)
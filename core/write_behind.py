@@ -0,0 +1,103 @@
+import atexit
+import threading
+import time
+
+from django.db import close_old_connections
+
+from .metrics import metrics
+from .scheduler import PeriodicTask
+
+
+class WriteBehindBuffer:
+    """
+    Per-process buffer of pending row changes keyed by user id, written by
+    ``flush`` every ``interval`` seconds from a background thread, and at
+    interpreter exit. Once ``max_users`` users are pending ``add`` wakes that
+    thread (started on demand when ``interval`` is 0) instead of writing on the
+    caller's thread, which may be a request thread or an event loop. Subclasses define
+    how a new value coalesces with a pending one (``merge``) and how a batch is
+    written (``write``). A failed write puts its batch back. With
+    ``drop_when_full`` a full buffer drops new users instead, for writes that
+    should only ever happen on schedule.
+    """
+
+    name = "write_behind"
+    drop_when_full = False
+
+    def __init__(self, interval: float, max_users: int):
+        self.max_users = max_users
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._started = False
+        self.interval = interval
+        self.flusher = PeriodicTask(interval if interval > 0 else None, self._scheduled_flush, name=self.name)
+
+    def merge(self, current, value):
+        raise NotImplementedError
+
+    def write(self, pending: dict):
+        raise NotImplementedError
+
+    def after_flush(self, pending: dict):
+        pass
+
+    def add(self, user_id, value):
+        if not self._started:
+            self.start()
+
+        with self._lock:
+            current = self.pending.get(user_id)
+            if current is None and self.drop_when_full and len(self.pending) >= self.max_users:
+                metrics.incr(f"{self.name}.dropped")
+                return
+            self.pending[user_id] = value if current is None else self.merge(current, value)
+            full = len(self.pending) >= self.max_users and not self.drop_when_full
+
+        if full:
+            metrics.incr(f"{self.name}.full")
+            self.flusher.wake()
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        atexit.register(self.flush)
+        if self.interval > 0:
+            self.flusher.start()
+
+    def flush(self) -> int:
+        """Write pending changes; returns the number of users written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self.pending = self.pending, {}
+            if not pending:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                self.write(pending)
+            except Exception:
+                with self._lock:
+                    for user_id, value in pending.items():
+                        current = self.pending.get(user_id)
+                        self.pending[user_id] = value if current is None else self.merge(value, current)
+                metrics.incr(f"{self.name}.flush_failures")
+                raise
+            finally:
+                metrics.observe(f"{self.name}.flush", time.perf_counter() - started)
+
+        metrics.incr(f"{self.name}.flushed_users", len(pending))
+        self.after_flush(pending)
+        return len(pending)
+
+    def _scheduled_flush(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def stats(self) -> dict:
+        return {"pending_users": len(self.pending)}